@@ -1,21 +1,42 @@
 """BanCheck cog for Red-DiscordBot ported and enhanced by PhasecoreX."""
 import asyncio
+import io
+import logging
 import time
-from typing import Any, Dict, Union
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple, Union
 
+import aiohttp
 import discord
 from redbot.core import Config, checks, commands
-from redbot.core.utils.chat_formatting import error, info, question, warning
+from redbot.core.data_manager import cog_data_path
+from redbot.core.utils.chat_formatting import (
+    error,
+    humanize_timedelta,
+    info,
+    question,
+    warning,
+)
 from redbot.core.utils.predicates import MessagePredicate
 
+from .circuit_breaker import CircuitBreaker
+from .dto.guild_settings import GuildSettings
+from .dto.lookup_result import LookupResult
+from .join_throttle import JoinThrottle
+from .lookup_cache import LookupCache
+from .mirror import BanListMirror
+from .raid import JoinRateTracker, RaidSummary
 from .pcx_lib import checkmark, delete
+from .scan import ScanProgress, ServiceRateLimiter
 from .services.alertbot import AlertBot
+from .services.base import LOOKUP, REPORT, SYNC, BanService
 from .services.globan import Globan
 from .services.imgur import Imgur
 from .services.ksoftsi import KSoftSi
 
 __author__ = "PhasecoreX"
 
+log = logging.getLogger("red.pcxcogs.bancheck")
+
 
 class BanCheck(commands.Cog):
     """Look up users on various ban lists.
@@ -28,15 +49,50 @@ class BanCheck(commands.Cog):
     check out [the readme](https://github.com/PhasecoreX/PCXCogs/tree/master/bancheck/README.md)
     """
 
-    default_global_settings = {"schema_version": 0, "total_bans": 0}
+    default_global_settings = {
+        "schema_version": 0,
+        "total_bans": 0,
+        "join_throttle_seconds": 0,
+        "mirror": False,
+    }
     default_guild_settings: Any = {
         "notify_channel": None,
         "total_bans": 0,
         "services": {},
+        "join_throttle_seconds": 300,
+        "scan": None,
     }
     supported_global_services = {"ksoftsi": KSoftSi}
     supported_guild_services = {"alertbot": AlertBot, "globan": Globan}
     all_supported_services = {**supported_global_services, **supported_guild_services}
+    # One HTTP session is shared by all services, so connections (and TLS sessions) get reused
+    HTTP_CONNECTION_LIMIT = 100
+    HTTP_CONNECTION_LIMIT_PER_HOST = 10
+    HTTP_KEEPALIVE_SECONDS = 60
+    HTTP_DNS_CACHE_SECONDS = 300
+    # How long lookup results are reused for, per kind of result
+    LOOKUP_CACHE_TTLS = {"clear": 30 * 60, "ban": 6 * 60 * 60, "error": 60}
+    LOOKUP_CACHE_SIZE = 10000
+    # A guild is being raided while this many members joined within the window,
+    # and AutoCheck results are then posted as one summary every RAID_SUMMARY_SECONDS
+    RAID_JOIN_THRESHOLD = 10
+    RAID_WINDOW_SECONDS = 30
+    RAID_SUMMARY_SECONDS = 15
+    # During raids, lookups to services that can look up many users at once are pooled this long
+    RAID_BATCH_SECONDS = 1
+    MAX_JOIN_THROTTLE_SECONDS = 24 * 60 * 60
+    # A service is skipped after this many failed lookups in a row, and probed again after a backoff
+    CIRCUIT_FAILURE_THRESHOLD = 3
+    CIRCUIT_BASE_BACKOFF_SECONDS = 30
+    CIRCUIT_MAX_BACKOFF_SECONDS = 30 * 60
+    # Scans look up this many members at a time, saving their progress after each batch,
+    # and stay under each services rate limit (shared by all scans)
+    SCAN_BATCH_SIZE = 100
+    SCAN_PAUSE_SECONDS = 60
+    # Global services that can sync their ban list are mirrored locally (if enabled), and the
+    # mirror is only trusted to answer "clear" while its last sync is recent enough
+    MIRROR_SYNC_SECONDS = 10 * 60
+    MIRROR_MAX_AGE_SECONDS = 3 * MIRROR_SYNC_SECONDS
 
     def __init__(self, bot):
         """Set up the cog."""
@@ -47,11 +103,71 @@ class BanCheck(commands.Cog):
         )
         self.config.register_global(**self.default_global_settings)
         self.config.register_guild(**self.default_guild_settings)
-        self.member_join_cache: Dict[int, int] = {}
+        self.join_throttle = JoinThrottle()
+        self.global_join_throttle_seconds = 0
+        self.guild_settings_cache: Dict[int, GuildSettings] = {}
+        self.guild_settings_generation = 0
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.services: Dict[str, BanService] = {}
+        self.imgur: Optional[Imgur] = None
+        self.lookup_cache = LookupCache(
+            self.LOOKUP_CACHE_TTLS, max_size=self.LOOKUP_CACHE_SIZE
+        )
+        self.lookups_in_flight: Dict[Tuple[str, int, Any], asyncio.Future] = {}
+        self.pending_lookup_batches: Dict[
+            Tuple[str, Any], Dict[int, asyncio.Future]
+        ] = {}
+        self.circuit_breakers: Dict[Tuple[str, Any], CircuitBreaker] = {}
+        self.probe_tasks: Set[asyncio.Task] = set()
+        self.scan_rate_limiter = ServiceRateLimiter()
+        self.scan_progress: Dict[int, ScanProgress] = {}
+        self.scan_tasks: Dict[int, asyncio.Task] = {}
+        self.scan_resume_task: Optional[asyncio.Task] = None
+        self.mirror: Optional[BanListMirror] = None
+        self.mirror_task: Optional[asyncio.Task] = None
+        self.join_rate = JoinRateTracker(
+            self.RAID_JOIN_THRESHOLD, self.RAID_WINDOW_SECONDS
+        )
+        self.raid_summaries: Dict[int, RaidSummary] = {}
+        self.raid_summary_tasks: Dict[int, asyncio.Task] = {}
 
     async def initialize(self):
         """Perform setup actions before loading cog."""
         await self._migrate_config()
+        self.global_join_throttle_seconds = await self.config.join_throttle_seconds()
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=self.HTTP_CONNECTION_LIMIT,
+                limit_per_host=self.HTTP_CONNECTION_LIMIT_PER_HOST,
+                keepalive_timeout=self.HTTP_KEEPALIVE_SECONDS,
+                ttl_dns_cache=self.HTTP_DNS_CACHE_SECONDS,
+            )
+        )
+        # One long-lived client per service, which limits and times out its own requests
+        self.services = {
+            service_name: service_class(self.session)
+            for service_name, service_class in self.all_supported_services.items()
+        }
+        self.imgur = Imgur(self.session)
+        self.scan_resume_task = asyncio.create_task(self._resume_scans())
+        if await self.config.mirror():
+            self._start_mirror()
+
+    def cog_unload(self):
+        """Clean up when cog shuts down."""
+        for task in self.raid_summary_tasks.values():
+            # Cancelling a pending summary posts it immediately
+            task.cancel()
+        if self.scan_resume_task:
+            self.scan_resume_task.cancel()
+        for task in self.scan_tasks.values():
+            # Progress is saved after every batch, so the scan resumes from there when loaded again
+            task.cancel()
+        for task in self.probe_tasks:
+            task.cancel()
+        self._stop_mirror()
+        if self.session:
+            asyncio.create_task(self.session.close())
 
     async def _migrate_config(self):
         """Perform some configuration migrations."""
@@ -104,9 +220,16 @@ class BanCheck(commands.Cog):
             await self.config.clear_raw("version")
             await self.config.schema_version.set(1)
 
-    async def red_delete_data_for_user(self, **kwargs):
-        """Nothing to delete."""
-        return
+    async def red_delete_data_for_user(self, *, requester, user_id: int):
+        """Remove a member from the saved progress of member scans."""
+        for guild_id, guild_config in (await self.config.all_guilds()).items():
+            if not guild_config["scan"]:
+                continue
+            progress = self.scan_progress.get(guild_id) or ScanProgress.from_config(
+                guild_config["scan"]
+            )
+            progress.remove_member(user_id)
+            await self.config.guild_from_id(guild_id).scan.set(progress.to_config())
 
     @commands.group()
     @checks.is_owner()
@@ -156,8 +279,63 @@ class BanCheck(commands.Cog):
             embed.add_field(
                 name=error("API Keys Not Set"), value=disabled_services, inline=False
             )
+        if self.mirror:
+            embed.add_field(
+                name=checkmark("Local Ban List Mirrors"),
+                value=await self._get_mirror_status(),
+                inline=False,
+            )
         await self.send_embed(ctx, embed)
 
+    @banchecksetglobal.command(name="throttle")
+    async def global_throttle(self, ctx: commands.Context, seconds: int):
+        """Set how long a user joining any server isn't AutoChecked again in any other server.
+
+        Set to `0` (default) to only throttle per server, with `[p]bancheckset autocheck throttle`.
+        """
+        if not 0 <= seconds <= self.MAX_JOIN_THROTTLE_SECONDS:
+            await ctx.send(
+                error(
+                    f"The throttle must be between 0 and {self.MAX_JOIN_THROTTLE_SECONDS} seconds."
+                )
+            )
+            return
+        await self.config.join_throttle_seconds.set(seconds)
+        self.global_join_throttle_seconds = seconds
+        if seconds:
+            await ctx.send(
+                checkmark(
+                    f"Users will not be AutoChecked again in any server for {humanize_timedelta(seconds=seconds)} after joining one."
+                )
+            )
+        else:
+            await ctx.send(checkmark("Users will only be throttled per server."))
+
+    @banchecksetglobal.command(name="mirror")
+    async def global_mirror(self, ctx: commands.Context, enabled: bool = None):
+        """Keep a local copy of the ban lists of global services that allow it.
+
+        Members that aren't on a mirrored ban list are then reported clear without asking the service.
+        Mirrors are refreshed every 10 minutes, and aren't used if they haven't been refreshed for 30.
+        The first refresh downloads the whole ban list, so it may take a while.
+        """
+        if enabled is None:
+            if self.mirror:
+                await ctx.send(
+                    info(f"Local ban list mirrors:\n{await self._get_mirror_status()}")
+                )
+            else:
+                await ctx.send(info("Local ban list mirrors are disabled."))
+            return
+        await self.config.mirror.set(enabled)
+        if enabled:
+            if not self.mirror:
+                self._start_mirror()
+            await ctx.send(checkmark("Local ban list mirrors are now enabled."))
+        else:
+            self._stop_mirror()
+            await ctx.send(checkmark("Local ban list mirrors are now disabled."))
+
     @banchecksetglobal.command(name="api")
     async def global_api(
         self, ctx: commands.Context, service: str, api_key: str = None
@@ -194,6 +372,41 @@ class BanCheck(commands.Cog):
         response = f"API key for the {self.get_nice_service_name(service)} BanCheck service has been {action}."
         await ctx.send(checkmark(response))
 
+    @banchecksetglobal.group(name="cache")
+    async def global_cache(self, ctx: commands.Context):
+        """Manage the cache of lookup results, which is shared by all servers."""
+        pass
+
+    @global_cache.command(name="stats")
+    async def global_cache_stats(self, ctx: commands.Context):
+        """Show how often lookups were answered from the cache."""
+        hit_rate = self.lookup_cache.hit_rate
+        hits = self.lookup_cache.hits
+        ttls = ", ".join(
+            f"{result} {humanize_timedelta(seconds=ttl)}"
+            for result, ttl in self.lookup_cache.ttls.items()
+        )
+        await ctx.send(
+            info(
+                f"**Cached results:** {len(self.lookup_cache)} (at most {self.lookup_cache.max_size})\n"
+                f"**Kept for:** {ttls}\n"
+                f"**Hit rate:** {'N/A' if hit_rate is None else f'{hit_rate:.1%}'} "
+                f"({sum(hits.values())} hits, {self.lookup_cache.misses} misses)\n"
+                f"**Hits by result:** "
+                f"{', '.join(f'{result} {count}' for result, count in hits.items()) or 'None'}"
+            )
+        )
+
+    @global_cache.command(name="flush")
+    async def global_cache_flush(self, ctx: commands.Context):
+        """Remove all cached lookup results, so that every user is looked up again."""
+        count = self.lookup_cache.clear()
+        await ctx.send(
+            checkmark(
+                f"Removed {count} cached lookup {'result' if count == 1 else 'results'}."
+            )
+        )
+
     @commands.group()
     @commands.guild_only()
     @checks.admin_or_permissions(manage_guild=True)
@@ -343,13 +556,14 @@ class BanCheck(commands.Cog):
         disabled_services = ""
         disabled_services_api = ""
         disabled_services_global_api = ""
-        for service_name in self.all_supported_services:
+        for service_name, service_class in self.all_supported_services.items():
             api_key = await self.get_api_key(service_name, config_services)
             enabled = config_services.get(service_name, {}).get("enabled", False)
             show_help = service_name in self.supported_guild_services and not api_key
-            service_name_formatted = (
-                f"{await self.format_service_name_url(service_name, show_help)}\n"
-            )
+            health = ""
+            if enabled and api_key:
+                health = self._get_service_health(service_class.SERVICE_NAME, api_key)
+            service_name_formatted = f"{await self.format_service_name_url(service_name, show_help)}{health}\n"
             if enabled and api_key:
                 enabled_services += service_name_formatted
             elif enabled and service_name in self.supported_global_services:
@@ -575,6 +789,102 @@ class BanCheck(commands.Cog):
             await self.config.guild(ctx.guild).notify_channel.set(None)
             await ctx.send(checkmark("AutoCheck is now disabled."))
 
+    @autocheck.command(name="throttle")
+    async def throttle_autocheck(self, ctx: commands.Context, seconds: int):
+        """Set how long a user that joined isn't AutoChecked again, if they leave and join again.
+
+        Defaults to 300 seconds (5 minutes). Set to `0` to check every join.
+        """
+        if not 0 <= seconds <= self.MAX_JOIN_THROTTLE_SECONDS:
+            await ctx.send(
+                error(
+                    f"The throttle must be between 0 and {self.MAX_JOIN_THROTTLE_SECONDS} seconds."
+                )
+            )
+            return
+        await self.config.guild(ctx.guild).join_throttle_seconds.set(seconds)
+        if seconds:
+            await ctx.send(
+                checkmark(
+                    f"Users that rejoin within {humanize_timedelta(seconds=seconds)} will not be AutoChecked again."
+                )
+            )
+        else:
+            await ctx.send(checkmark("Users will be AutoChecked every time they join."))
+
+    @bancheckset.group()
+    async def scan(self, ctx: commands.Context):
+        """Check all existing members of this server against the ban lists."""
+
+    @scan.command(name="start")
+    async def scan_start(self, ctx: commands.Context, attach_csv: bool = False):
+        """Start checking all members of this server, posting a report in this channel once done.
+
+        Set `attach_csv` to `true` to also get a CSV file of the members that were found on a ban
+        list or couldn't be checked (up to 500 of each). Members are never banned by a scan. While a
+        service is unavailable the scan waits for it. If the bot restarts, the scan continues where
+        it left off.
+        """
+        if ctx.guild.id in self.scan_tasks:
+            await ctx.send(
+                info(
+                    "A scan is already running. See `[p]bancheckset scan status` for its progress."
+                )
+            )
+            return
+        if not (await self._get_guild_settings(ctx.guild)).lookup_services:
+            await ctx.send(
+                error(
+                    "No services have been set up. Please check `[p]bancheckset service settings` for more details."
+                )
+            )
+            return
+        progress = ScanProgress(
+            ctx.channel.id,
+            sum(not member.bot for member in ctx.guild.members),
+            attach_csv=attach_csv,
+        )
+        await self.config.guild(ctx.guild).scan.set(progress.to_config())
+        self._start_scan(ctx.guild, progress)
+        await ctx.send(
+            checkmark(
+                f"Scanning {progress.total} {'member' if progress.total == 1 else 'members'}. "
+                "I will post a report here once done."
+            )
+        )
+
+    @scan.command(name="status")
+    async def scan_status(self, ctx: commands.Context):
+        """Show the progress of the running scan."""
+        progress = self.scan_progress.get(ctx.guild.id)
+        if not progress:
+            await ctx.send(info("No scan is running."))
+            return
+        await ctx.send(
+            info(
+                f"Checked {progress.checked} of {progress.total} members "
+                f"({progress.ban_count} banned elsewhere, {progress.error_count} with errors), "
+                f"started {humanize_timedelta(seconds=max(int(time.time() - progress.started), 1))} ago."
+            )
+        )
+
+    @scan.command(name="cancel")
+    async def scan_cancel(self, ctx: commands.Context):
+        """Stop the running scan, posting a report of the members checked so far."""
+        task = self.scan_tasks.get(ctx.guild.id)
+        if not task:
+            await ctx.send(info("No scan is running."))
+            return
+        progress = self.scan_progress[ctx.guild.id]
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        await self.config.guild(ctx.guild).scan.clear()
+        await ctx.send(checkmark("The scan has been cancelled."))
+        await self._post_scan_report(ctx.guild, progress, cancelled=True)
+
     @commands.command()
     @commands.guild_only()
     # Only the owner for now, until I do some research on who to open it up to
@@ -643,17 +953,15 @@ class BanCheck(commands.Cog):
         for service_name, service_config in config_services.items():
             if not service_config.get("enabled", False):
                 continue  # This service is not enabled
-            service_class = self.all_supported_services.get(service_name, None)
-            if not service_class:
+            service = self.services.get(service_name, None)
+            if not service:
                 continue  # This service is not supported
-            try:
-                service_class().report
-            except AttributeError:
+            if not service.supports(REPORT):
                 continue  # This service does not support reporting
             api_key = await self.get_api_key(service_name, config_services)
             if not api_key:
                 continue  # This service needs an API key set to work
-            report_services.append((service_class(), api_key))
+            report_services.append((service, api_key))
 
         # Send error if there are no services to send to
         if not report_services:
@@ -679,7 +987,7 @@ class BanCheck(commands.Cog):
                     )
                 )
                 return
-            image_proof_url = await Imgur.upload(image_proof_url, imgur_client_id)
+            image_proof_url = await self.imgur.upload(image_proof_url, imgur_client_id)
             if not image_proof_url:
                 await ctx.send(
                     error(
@@ -766,39 +1074,45 @@ class BanCheck(commands.Cog):
         """If enabled, will check users against ban lists when joining the guild."""
         if await self.bot.cog_disabled_in_guild(self, member.guild):
             return
-        channel_id = await self.config.guild(member.guild).notify_channel()
-        if channel_id:
-            channel = self.bot.get_channel(channel_id)
+        guild_settings = await self._get_guild_settings(member.guild)
+        if guild_settings.notify_channel_id:
+            channel = self.bot.get_channel(guild_settings.notify_channel_id)
             if channel:
+                now = time.monotonic()
+                raid = self.join_rate.record_join(member.guild.id, now)
                 # Only do auto lookup if the user isn't repeatedly leaving and joining the server
-                current_time = int(time.time())
-                past_time = current_time - 300  # 5 minutes ago
-                if (
-                    member.id not in self.member_join_cache
-                    or self.member_join_cache[member.id] < past_time
-                ):
-                    await self._user_lookup(channel, member, True)
-                self.member_join_cache[member.id] = current_time
-                # Clear old entries out of the cache
-                cache_clear = []
-                for user_id, join_time in self.member_join_cache.items():
-                    if join_time < past_time:
-                        cache_clear.append(user_id)
-                for user_id in cache_clear:
-                    del self.member_join_cache[user_id]
+                # (or, if the bot owner set a global throttle, joining any server)
+                guild_throttled = self.join_throttle.record_join(
+                    (member.guild.id, member.id),
+                    now,
+                    guild_settings.join_throttle_seconds,
+                )
+                global_throttled = self.join_throttle.record_join(
+                    (None, member.id), now, self.global_join_throttle_seconds
+                )
+                if not guild_throttled and not global_throttled:
+                    await self._user_lookup(channel, member, True, summarize=raid)
 
     async def _user_lookup(
         self,
         channel: discord.TextChannel,
         member: Union[discord.Member, int],
         on_member_join: bool,
+        *,
+        summarize: bool = False,
     ):
-        """Perform user lookup, and send results to a specific channel."""
-        config_services = await self.config.guild(channel.guild).services()
+        """Perform user lookup, and send results to a specific channel.
+
+        If summarize is set (during raids), the result is added to the next raid summary instead.
+        """
+        lookup_services = (
+            await self._get_guild_settings(channel.guild)
+        ).lookup_services
         banned_services: Dict[str, str] = {}
         auto_banned = False
         is_error = False
         checked = []
+        skipped = []
         if isinstance(member, discord.Member):
             description = f"**Name:** {member.name}\n**ID:** {member.id}\n\n"
             member_id = member.id
@@ -808,22 +1122,22 @@ class BanCheck(commands.Cog):
             member_id = member
             member_avatar_url = None
 
-        # Get results
-        for service_name, service_config in config_services.items():
-            if not service_config.get("enabled", False):
-                continue
-            autoban = service_config.get("autoban", False)
-            service_class = self.all_supported_services.get(service_name, None)
-            if not service_class:
-                continue
-            api_key = await self.get_api_key(service_name, config_services)
-            if not api_key:
+        # Get results (all services at once, listed in the same order every time)
+        responses = await asyncio.gather(
+            *(
+                self._batched_service_lookup(service, member_id, api_key)
+                if summarize and service.BATCH_SIZE > 1
+                else self._service_lookup(service, member_id, api_key)
+                for service, api_key, _ in lookup_services
+            )
+        )
+        for (_, _, autoban), response in zip(lookup_services, responses):
+            if response.result == "skipped":
+                skipped.append(response.service)
+                description += warning(
+                    f"**{response.service}:** Skipped - {response.reason}\n"
+                )
                 continue
-            try:
-                service_class().lookup
-            except AttributeError:
-                continue  # This service does not support lookup
-            response = await service_class().lookup(member_id, api_key)
             checked.append(response.service)
 
             if response.result == "ban":
@@ -855,6 +1169,9 @@ class BanCheck(commands.Cog):
                     f"You should probably let PhasecoreX know about this -> `{response.result}`.\n"
                 )
 
+        if skipped and not checked:
+            is_error = True  # Every service is down, so nothing was checked
+
         # Display result
         if banned_services:
             title = "Ban Found"
@@ -895,12 +1212,28 @@ class BanCheck(commands.Cog):
                     title += " - Auto Banned"
                 except (discord.Forbidden, discord.HTTPException):
                     title += " - Not allowed to Auto Ban"
+            if summarize:
+                summary = self._get_raid_summary(channel)
+                summary.bans.append(
+                    error(
+                        f"**{member}** ({member_id}): {title} - "
+                        f"{', '.join(f'{name} ({reason})' for name, reason in banned_services.items())}"
+                    )
+                )
+                summary.auto_banned += title.endswith("Auto Banned")
+                return
             await self.send_embed(
                 channel,
                 self.embed_maker(
                     title, discord.Colour.red(), description, member_avatar_url
                 ),
             )
+        elif is_error and summarize:
+            self._get_raid_summary(channel).errors.append(
+                warning(
+                    f"**{member}** ({member_id}): Error (but no ban found otherwise)"
+                )
+            )
         elif is_error:
             await self.send_embed(
                 channel,
@@ -913,6 +1246,8 @@ class BanCheck(commands.Cog):
             )
         elif not checked and on_member_join:
             pass  # No services have been enabled when auto checking
+        elif summarize:
+            self._get_raid_summary(channel).clear += 1
         elif not checked:
             await self.send_embed(
                 channel,
@@ -929,11 +1264,527 @@ class BanCheck(commands.Cog):
                 self.embed_maker(
                     f"No ban found for **{member}**",
                     discord.Colour.green(),
-                    f"Checked: {', '.join(checked)}",
+                    f"Checked: {', '.join(checked)}"
+                    + (
+                        f"\nSkipped (unavailable): {', '.join(skipped)}"
+                        if skipped
+                        else ""
+                    ),
                     member_avatar_url,
                 ),
             )
 
+    def _get_raid_summary(self, channel: discord.TextChannel) -> RaidSummary:
+        """Get the pending raid summary for a guild, starting one (to be posted in a bit) if needed."""
+        guild_id = channel.guild.id
+        if guild_id not in self.raid_summaries:
+            self.raid_summaries[guild_id] = RaidSummary()
+            self.raid_summary_tasks[guild_id] = asyncio.create_task(
+                self._post_raid_summary(channel)
+            )
+        return self.raid_summaries[guild_id]
+
+    async def _post_raid_summary(self, channel: discord.TextChannel):
+        """Wait for more AutoCheck results to pile up, then post them all as one embed.
+
+        If cancelled while waiting (cog unload), posts immediately.
+        """
+        try:
+            await asyncio.sleep(self.RAID_SUMMARY_SECONDS)
+        finally:
+            summary = self.raid_summaries.pop(channel.guild.id)
+            del self.raid_summary_tasks[channel.guild.id]
+            if summary.bans:
+                colour = discord.Colour.red()
+            elif summary.errors:
+                colour = discord.Colour.gold()
+            else:
+                colour = discord.Colour.green()
+            await self.send_embed(
+                channel,
+                self.embed_maker(
+                    "AutoCheck Raid Summary", colour, summary.description(2048)
+                ),
+            )
+
+    async def _resume_scans(self):
+        """Continue the scans that were running when the cog was unloaded."""
+        await self.bot.wait_until_red_ready()
+        for guild_id, guild_config in (await self.config.all_guilds()).items():
+            guild = self.bot.get_guild(guild_id)
+            if guild and guild_config["scan"] and guild_id not in self.scan_tasks:
+                self._start_scan(guild, ScanProgress.from_config(guild_config["scan"]))
+
+    def _start_scan(self, guild: discord.Guild, progress: ScanProgress):
+        """Start scanning the members of a guild in the background."""
+        self.scan_progress[guild.id] = progress
+        self.scan_tasks[guild.id] = asyncio.create_task(
+            self._scan_members(guild, progress)
+        )
+
+    async def _scan_members(self, guild: discord.Guild, progress: ScanProgress):
+        """Look up all members of a guild after the checkpoint in batches, then post the report."""
+        try:
+            members = sorted(
+                (
+                    member
+                    for member in guild.members
+                    if member.id > progress.checkpoint and not member.bot
+                ),
+                key=lambda member: member.id,
+            )
+            for start in range(0, len(members), self.SCAN_BATCH_SIZE):
+                batch = members[start : start + self.SCAN_BATCH_SIZE]
+                results = await self._scan_batch(guild, batch)
+                if results is None:
+                    break
+                for member in batch:
+                    progress.add(
+                        member.id,
+                        str(member),
+                        [responses[member.id] for responses in results],
+                    )
+                progress.checkpoint = batch[-1].id
+                await self.config.guild(guild).scan.set(progress.to_config())
+            await self.config.guild(guild).scan.clear()
+            await self._post_scan_report(guild, progress)
+        finally:
+            self.scan_progress.pop(guild.id, None)
+            self.scan_tasks.pop(guild.id, None)
+
+    async def _scan_batch(
+        self, guild: discord.Guild, batch: list
+    ) -> Optional[List[Dict[int, LookupResult]]]:
+        """Look up a batch of members on every service, waiting while any service is unavailable.
+
+        Returns None if the guild no longer has any services set up.
+        """
+        while True:
+            # Services may have been changed during the scan
+            lookup_services = (await self._get_guild_settings(guild)).lookup_services
+            if not lookup_services:
+                return None
+            # All services at once, each looking up the whole batch
+            results = await asyncio.gather(
+                *(
+                    self._scan_service(service, batch, api_key)
+                    for service, api_key, _ in lookup_services
+                )
+            )
+            if all(
+                response.result != "skipped"
+                for responses in results
+                for response in responses.values()
+            ):
+                return results
+            # Otherwise every member would count as an error during an outage
+            await asyncio.sleep(self.SCAN_PAUSE_SECONDS)
+
+    async def _scan_service(
+        self, service: BanService, members: list, api_key
+    ) -> Dict[int, LookupResult]:
+        """Look up a batch of members on a single service for a scan.
+
+        Every member gets a result, even if the service didn't answer for them.
+        """
+        responses = {
+            member_id: response
+            async for member_id, response in self._service_lookup_many(
+                service, (member.id for member in members), api_key, rate_limited=True
+            )
+        }
+        return {
+            member.id: responses.get(member.id)
+            or LookupResult(service.SERVICE_NAME, "error", reason="No response")
+            for member in members
+        }
+
+    async def _post_scan_report(
+        self, guild: discord.Guild, progress: ScanProgress, *, cancelled: bool = False
+    ):
+        """Post the results of a scan to the channel it was started in."""
+        channel = guild.get_channel(progress.channel_id)
+        if not channel:
+            return  # The channel was deleted during the scan
+        if progress.bans:
+            colour = discord.Colour.red()
+        elif progress.errors or cancelled or progress.checked < progress.total:
+            colour = discord.Colour.gold()
+        else:
+            colour = discord.Colour.green()
+        embed = self.embed_maker(
+            "BanCheck Scan Report" + (" (Cancelled)" if cancelled else ""),
+            colour,
+            progress.description(2048),
+        )
+        csv_file = None
+        if progress.attach_csv:
+            csv_file = discord.File(
+                io.BytesIO(progress.to_csv()), filename=f"bancheck-scan-{guild.id}.csv"
+            )
+        try:
+            await channel.send(embed=embed, file=csv_file)
+        except discord.HTTPException:
+            await channel.send(
+                error(
+                    "I need the `Embed links` and `Attach files` permissions to post the scan report"
+                )
+            )
+
+    def _start_mirror(self):
+        """Start mirroring the ban lists of global services that can sync them."""
+        self.mirror = BanListMirror(
+            str(cog_data_path(self) / "ban_mirror.sqlite3"),
+            self.MIRROR_MAX_AGE_SECONDS,
+        )
+        self.mirror_task = asyncio.create_task(self._mirror_loop(self.mirror))
+        self.mirror_task.add_done_callback(self._log_task_error("ban list mirroring"))
+
+    @staticmethod
+    def _log_task_error(description: str):
+        """Get a done callback that logs the exception a background task ended with, if any."""
+
+        def error_handler(task: asyncio.Task):
+            if not task.cancelled() and task.exception():
+                log.error(
+                    "Unexpected error in %s", description, exc_info=task.exception()
+                )
+
+        return error_handler
+
+    def _stop_mirror(self):
+        """Stop mirroring ban lists, and stop using the mirrors."""
+        if self.mirror_task:
+            self.mirror_task.cancel()
+            self.mirror_task = None
+        if self.mirror:
+            asyncio.create_task(self.mirror.close())
+            self.mirror = None
+
+    async def _mirror_loop(self, mirror: BanListMirror):
+        """Load the mirrored ban lists, then refresh them every MIRROR_SYNC_SECONDS."""
+        sync_services = [
+            (service_name, self.services[service_name])
+            for service_name, service_class in self.supported_global_services.items()
+            if service_class.supports(SYNC)
+        ]
+        await self.bot.wait_until_red_ready()
+        while True:
+            for service_name, service in sync_services:
+                try:
+                    if service.SERVICE_NAME not in mirror.filters:
+                        await mirror.load(service.SERVICE_NAME)
+                    api_key = await self.get_api_key(service_name)
+                    if not api_key:
+                        continue
+                    result = await service.sync(
+                        api_key, mirror.cursors.get(service.SERVICE_NAME)
+                    )
+                    if result.error:
+                        mirror.mark_failed(service.SERVICE_NAME)
+                        log.warning(
+                            "Could not sync the %s ban list: %s",
+                            service.SERVICE_NAME,
+                            result.error,
+                        )
+                        continue
+                    await mirror.apply(service.SERVICE_NAME, result)
+                except Exception:
+                    # Lookups go to the service itself until the mirror is synced again
+                    mirror.mark_failed(service.SERVICE_NAME)
+                    log.exception(
+                        "Could not sync the %s ban list", service.SERVICE_NAME
+                    )
+            await asyncio.sleep(self.MIRROR_SYNC_SECONDS)
+
+    async def _get_mirror_status(self) -> str:
+        """Describe the state of each mirrored ban list."""
+        status = ""
+        for service_class in self.supported_global_services.values():
+            if not service_class.supports(SYNC):
+                continue
+            synced_at = self.mirror.synced_at.get(service_class.SERVICE_NAME)
+            if not synced_at:
+                status += f"**{service_class.SERVICE_NAME}:** Not synced yet\n"
+                continue
+            ago = humanize_timedelta(seconds=max(int(time.time() - synced_at), 1))
+            if service_class.SERVICE_NAME in self.mirror.failed:
+                not_used = " (last sync failed, not used)"
+            elif not self.mirror.is_fresh(service_class.SERVICE_NAME):
+                not_used = " (too old, not used)"
+            else:
+                not_used = ""
+            status += (
+                f"**{service_class.SERVICE_NAME}:** {await self.mirror.count(service_class.SERVICE_NAME)} bans, "
+                f"synced {ago} ago{not_used}\n"
+            )
+        return status or "No global services can be mirrored."
+
+    async def _get_guild_settings(self, guild: discord.Guild) -> GuildSettings:
+        """Get a guilds lookup settings, with API keys resolved and services ready to use.
+
+        They are cached until any BanCheck settings of the guild change (see cog_after_invoke),
+        or any API tokens change, so that member joins don't need to read Config.
+        """
+        guild_settings = self.guild_settings_cache.get(guild.id)
+        if guild_settings:
+            return guild_settings
+        generation = self.guild_settings_generation
+        guild_config = await self.config.guild(guild).all()
+        lookup_services = []
+        for service_name, service_config in guild_config["services"].items():
+            if not service_config.get("enabled", False):
+                continue
+            service = self.services.get(service_name, None)
+            if not service:
+                continue
+            api_key = await self.get_api_key(service_name, guild_config["services"])
+            if not api_key:
+                continue
+            if not service.supports(LOOKUP):
+                continue  # This service does not support lookup
+            lookup_services.append(
+                (
+                    service,
+                    api_key,
+                    service_config.get("autoban", False),
+                )
+            )
+        guild_settings = GuildSettings(
+            guild_config["notify_channel"],
+            guild_config["join_throttle_seconds"],
+            lookup_services,
+        )
+        if generation == self.guild_settings_generation:
+            # Nothing was invalidated while resolving them
+            self.guild_settings_cache[guild.id] = guild_settings
+        return guild_settings
+
+    def _invalidate_guild_settings(self, guild_id: Optional[int] = None):
+        """Forget the cached lookup settings of a guild, or of all guilds."""
+        self.guild_settings_generation += 1
+        if guild_id is None:
+            self.guild_settings_cache.clear()
+        else:
+            self.guild_settings_cache.pop(guild_id, None)
+
+    async def cog_after_invoke(self, ctx: commands.Context):
+        """Forget the cached lookup settings of a guild after any of its BanCheck settings may have changed."""
+        if ctx.guild and (ctx.command.root_parent or ctx.command).name == "bancheckset":
+            self._invalidate_guild_settings(ctx.guild.id)
+
+    @commands.Cog.listener()
+    async def on_red_api_tokens_update(self, service_name: str, api_tokens):
+        """Forget all cached lookup settings when the API key of a global service changes."""
+        if service_name in self.all_supported_services:
+            self._invalidate_guild_settings()
+
+    async def _service_lookup(self, service, member_id: int, api_key):
+        """Look up a user on a single service.
+
+        Users that a local mirror says are definitely not banned are clear without asking the service.
+        Recent results are reused from the lookup cache, and a lookup that is already in progress
+        for the same user (joining several servers at once, for example) is shared.
+        """
+        if self.mirror and self.mirror.is_clear(service.SERVICE_NAME, member_id):
+            return LookupResult(service.SERVICE_NAME, "clear")
+        response = self.lookup_cache.get(service.SERVICE_NAME, member_id, api_key)
+        if response:
+            return response
+        key = (service.SERVICE_NAME, member_id, api_key)
+        if key not in self.lookups_in_flight:
+            skipped = self._check_service_available(service, api_key)
+            if skipped:
+                return skipped
+            self.lookups_in_flight[key] = asyncio.ensure_future(
+                self._uncached_service_lookup(service, member_id, api_key)
+            )
+            self.lookups_in_flight[key].add_done_callback(
+                lambda _: self.lookups_in_flight.pop(key, None)
+            )
+        # Shielded, so that one waiter being cancelled doesn't cancel the lookup for the others
+        return await asyncio.shield(self.lookups_in_flight[key])
+
+    async def _uncached_service_lookup(self, service, member_id: int, api_key):
+        """Look up a user on a single service, recording the outcome in the services circuit breaker."""
+        response = None
+        try:
+            response = await service.lookup(member_id, api_key)
+        finally:
+            self._record_lookup(service, member_id, api_key, response)
+        return response
+
+    async def _service_lookup_many(
+        self,
+        service: BanService,
+        member_ids: Iterable[int],
+        api_key,
+        *,
+        rate_limited: bool = False,
+    ) -> AsyncIterator[Tuple[int, LookupResult]]:
+        """Look up many users on a single service, yielding (user ID, result) as each result comes in.
+
+        Like _service_lookup, but the users that need a request are looked up together with the
+        services lookup_many, which uses a batch endpoint if the service has one. Lookups that are
+        already in progress are not shared. If rate_limited is set (for scans), each request waits
+        for the scan rate limit first.
+        """
+        to_look_up = []
+        for member_id in member_ids:
+            if self.mirror and self.mirror.is_clear(service.SERVICE_NAME, member_id):
+                yield member_id, LookupResult(service.SERVICE_NAME, "clear")
+                continue
+            response = self.lookup_cache.get(service.SERVICE_NAME, member_id, api_key)
+            if response:
+                yield member_id, response
+            else:
+                to_look_up.append(member_id)
+        if not to_look_up:
+            return
+        skipped = self._check_service_available(service, api_key)
+        if skipped:
+            for member_id in to_look_up:
+                yield member_id, skipped
+            return
+
+        async def before_request():
+            await self.scan_rate_limiter.wait(service)
+
+        async for member_id, response in service.lookup_many(
+            to_look_up, api_key, before_request if rate_limited else None
+        ):
+            self._record_lookup(service, member_id, api_key, response)
+            yield member_id, response
+
+    async def _batched_service_lookup(
+        self, service: BanService, member_id: int, api_key
+    ):
+        """Look up a user on a single service, together with the other users looked up in the next RAID_BATCH_SECONDS."""
+        key = (service.SERVICE_NAME, api_key)
+        if key not in self.pending_lookup_batches:
+            self.pending_lookup_batches[key] = {}
+            asyncio.create_task(
+                self._run_lookup_batch(service, api_key)
+            ).add_done_callback(self._log_task_error("a batched lookup"))
+        batch = self.pending_lookup_batches[key]
+        if member_id not in batch:
+            batch[member_id] = asyncio.get_running_loop().create_future()
+        # Shielded, so that one waiter being cancelled doesn't cancel the lookup for the others
+        return await asyncio.shield(batch[member_id])
+
+    async def _run_lookup_batch(self, service: BanService, api_key):
+        """Wait for lookups to pile up, then look them all up at once.
+
+        Every waiting lookup gets a result, even if the batch fails or is cancelled.
+        """
+        key = (service.SERVICE_NAME, api_key)
+        batch = self.pending_lookup_batches[key]
+        try:
+            await asyncio.sleep(self.RAID_BATCH_SECONDS)
+            del self.pending_lookup_batches[key]
+            async for member_id, response in self._service_lookup_many(
+                service, list(batch), api_key
+            ):
+                if member_id in batch and not batch[member_id].done():
+                    batch[member_id].set_result(response)
+        finally:
+            if self.pending_lookup_batches.get(key) is batch:
+                del self.pending_lookup_batches[key]
+            for future in batch.values():
+                if not future.done():
+                    future.set_result(
+                        LookupResult(
+                            service.SERVICE_NAME, "error", reason="Lookup failed"
+                        )
+                    )
+
+    def _check_service_available(
+        self, service: BanService, api_key
+    ) -> Optional[LookupResult]:
+        """Get the "skipped" result for a service that its circuit breaker says is unavailable, or None if it is available.
+
+        If it is time to check if the service is back, a health probe is started in the background,
+        so that no lookup waits on a service that may still be down.
+        """
+        circuit_breaker = self._get_circuit_breaker(service.SERVICE_NAME, api_key)
+        if circuit_breaker.state == CircuitBreaker.CLOSED:
+            return None
+        if circuit_breaker.allow():
+            probe_task = asyncio.create_task(
+                self._probe_service(service, api_key, circuit_breaker)
+            )
+            # Kept, so that the probe isn't garbage collected while running
+            self.probe_tasks.add(probe_task)
+            probe_task.add_done_callback(self.probe_tasks.discard)
+            probe_task.add_done_callback(self._log_task_error("a service health probe"))
+        retry_in = circuit_breaker.retry_in
+        return LookupResult(
+            service.SERVICE_NAME,
+            "skipped",
+            reason="Service unavailable, "
+            + (
+                f"trying again in {humanize_timedelta(seconds=max(int(retry_in), 1))}"
+                if retry_in
+                else "checking if it is back"
+            ),
+        )
+
+    def _record_lookup(
+        self,
+        service: BanService,
+        member_id: int,
+        api_key,
+        response: Optional[LookupResult],
+    ):
+        """Record the outcome of a lookup request in the services circuit breaker, and cache the result."""
+        circuit_breaker = self._get_circuit_breaker(service.SERVICE_NAME, api_key)
+        if response and response.result != "error":
+            circuit_breaker.record_success()
+        else:
+            circuit_breaker.record_failure()
+        if response:
+            self.lookup_cache.add(service.SERVICE_NAME, member_id, api_key, response)
+
+    @staticmethod
+    async def _probe_service(
+        service: BanService, api_key, circuit_breaker: CircuitBreaker
+    ):
+        """Check if an unavailable service is back, closing its circuit breaker if so."""
+        healthy = False
+        try:
+            healthy = await service.health(api_key)
+        finally:
+            if healthy:
+                circuit_breaker.record_success()
+            else:
+                circuit_breaker.record_failure()
+
+    def _get_circuit_breaker(self, service_name: str, api_key) -> CircuitBreaker:
+        """Get the circuit breaker of a service.
+
+        Guild services have an API key per guild, and a bad API key shouldn't make the
+        service get skipped in every guild, so there is one circuit breaker per API key.
+        """
+        key = (service_name, api_key)
+        if key not in self.circuit_breakers:
+            self.circuit_breakers[key] = CircuitBreaker(
+                self.CIRCUIT_FAILURE_THRESHOLD,
+                self.CIRCUIT_BASE_BACKOFF_SECONDS,
+                self.CIRCUIT_MAX_BACKOFF_SECONDS,
+            )
+        return self.circuit_breakers[key]
+
+    def _get_service_health(self, service_name: str, api_key) -> str:
+        """Describe the circuit breaker state of a service, or an empty string if it is healthy."""
+        circuit_breaker = self.circuit_breakers.get((service_name, api_key))
+        if not circuit_breaker or circuit_breaker.state == CircuitBreaker.CLOSED:
+            return ""
+        retry_in = circuit_breaker.retry_in
+        if retry_in is None:
+            return " - **Unavailable** (checking if it is back)"
+        retry_in = humanize_timedelta(seconds=max(int(retry_in), 1))
+        return f" - **Unavailable** (skipped for {retry_in}, after {circuit_breaker.failures} failed lookups)"
+
     async def format_service_name_url(self, service_name, show_help=False):
         """Format BanCheck services."""
         service_class = self.all_supported_services.get(service_name, None)
@@ -972,7 +1823,7 @@ class BanCheck(commands.Cog):
                 return api_key
         # API not required
         service_class = self.all_supported_services.get(service_name, False)
-        if service_class and not service_class().SERVICE_API_KEY_REQUIRED:
+        if service_class and not service_class.SERVICE_API_KEY_REQUIRED:
             return True
         # Fail
         return False
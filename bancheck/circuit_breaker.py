@@ -0,0 +1,79 @@
+"""Circuit breakers for ban services that stop responding."""
+import time
+from typing import Optional
+
+
+class CircuitBreaker:
+    """Health of a ban service, so that lookups can skip it while it is down.
+
+    Closed: lookups go through. After failure_threshold failed lookups in a row, the circuit opens.
+    Open: lookups are skipped until the backoff is over, and each time the circuit opens again
+    without a lookup succeeding in between, the backoff doubles (up to max_backoff_seconds).
+    Half-open: after the backoff, a single health probe is allowed. If it succeeds the circuit
+    closes, otherwise it opens again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        base_backoff_seconds: int = 30,
+        max_backoff_seconds: int = 30 * 60,
+    ):
+        """Start closed, with no failures."""
+        self.failure_threshold = failure_threshold
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.failures = 0
+        self.backoff_seconds = 0
+        self.open_until = 0.0
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        """Get the current state."""
+        if not self.open_until:
+            return self.CLOSED
+        if self.probing or self.open_until <= time.monotonic():
+            return self.HALF_OPEN
+        return self.OPEN
+
+    @property
+    def retry_in(self) -> Optional[float]:
+        """Get how many seconds until the next health probe, or None if not open."""
+        if self.state != self.OPEN:
+            return None
+        return self.open_until - time.monotonic()
+
+    def allow(self) -> bool:
+        """Return if a lookup should be made now. When half-open, only the first caller is allowed to probe."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self):
+        """Record a lookup (or probe) that succeeded, closing the circuit."""
+        self.failures = 0
+        self.backoff_seconds = 0
+        self.open_until = 0.0
+        self.probing = False
+
+    def record_failure(self):
+        """Record a lookup that failed, opening the circuit if there were too many (or if it was a probe)."""
+        if self.state == self.OPEN:
+            return  # A lookup that was already in progress when the circuit opened
+        self.failures += 1
+        if self.probing or self.failures >= self.failure_threshold:
+            self.backoff_seconds = min(
+                self.backoff_seconds * 2 or self.base_backoff_seconds,
+                self.max_backoff_seconds,
+            )
+            self.open_until = time.monotonic() + self.backoff_seconds
+            self.probing = False
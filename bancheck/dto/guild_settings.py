@@ -0,0 +1,17 @@
+"""A guilds resolved lookup settings."""
+from typing import Any, List, Optional, Tuple
+
+
+class GuildSettings:
+    """A guilds resolved lookup settings."""
+
+    def __init__(
+        self,
+        notify_channel_id: Optional[int],
+        join_throttle_seconds: int,
+        lookup_services: List[Tuple[Any, Any, bool]],
+    ):
+        """Create the resolved settings, with the (service instance, API key, autoban) of each usable lookup service."""
+        self.notify_channel_id = notify_channel_id
+        self.join_throttle_seconds = join_throttle_seconds
+        self.lookup_services = lookup_services
@@ -0,0 +1,28 @@
+"""A ban list sync result."""
+from typing import Any, Iterable
+
+
+class SyncResult:
+    """A ban list sync result."""
+
+    def __init__(
+        self,
+        service: str,
+        *,
+        banned_ids: Iterable[int] = (),
+        unbanned_ids: Iterable[int] = (),
+        cursor: Any = None,
+        full: bool = False,
+        error: str = "",
+    ):
+        """Create the base sync result.
+
+        If full is set, banned_ids is the whole ban list. Otherwise it (and unbanned_ids) are the
+        changes since the cursor given to sync. The new cursor is passed to the next sync.
+        """
+        self.service = service
+        self.banned_ids = list(banned_ids)
+        self.unbanned_ids = list(unbanned_ids)
+        self.cursor = cursor
+        self.full = full
+        self.error = error
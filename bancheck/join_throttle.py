@@ -0,0 +1,43 @@
+"""Throttling of repeated member joins."""
+from collections import OrderedDict
+from typing import Hashable, Tuple
+
+
+class JoinThrottle:
+    """When members last joined, so that members repeatedly leaving and joining aren't looked up every time.
+
+    Entries are kept in the order they were last updated, so expired entries are removed from the
+    front, and recording a join is amortized O(1). Entries with a shorter window than an older entry
+    are still checked when looked up, and the throttle never grows past max_size.
+    """
+
+    def __init__(self, max_size: int = 100000):
+        """Create an empty throttle."""
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+
+    def record_join(self, key: Hashable, now: float, window: float) -> bool:
+        """Record a join, and return if the same key already joined within the last window seconds.
+
+        Every join restarts the window, so a member that keeps leaving and joining stays throttled.
+        """
+        self.expire(now)
+        entry = self._entries.pop(key, None)
+        throttled = entry is not None and entry[1] > now
+        if window > 0:
+            self._entries[key] = (now, now + window)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return throttled
+
+    def expire(self, now: float):
+        """Remove expired entries from the front of the throttle."""
+        while self._entries:
+            _, expires = next(iter(self._entries.values()))
+            if expires > now:
+                break
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        """Get the number of entries (including expired ones that haven't been removed yet)."""
+        return len(self._entries)
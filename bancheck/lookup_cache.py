@@ -0,0 +1,71 @@
+"""Cache of user lookup results."""
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .dto.lookup_result import LookupResult
+
+
+class LookupCache:
+    """Recent lookup results per service and user, shared by all guilds.
+
+    Each kind of result ("clear", "ban", "error") is kept for its own amount of time, and the least
+    recently used results are evicted once max_size is reached. Errors are often caused by the
+    API key used (guild services have one per guild), so they are only reused for the same API key.
+    """
+
+    def __init__(self, ttls: Dict[str, int], max_size: int = 10000):
+        """Create an empty cache, keeping each kind of result for ttls[result] seconds."""
+        self.ttls = ttls
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, LookupResult, str]]" = (
+            OrderedDict()
+        )
+        self.hits: Counter = Counter()
+        self.misses = 0
+
+    def get(self, service: str, user_id: int, api_key) -> Optional[LookupResult]:
+        """Get a cached lookup result, or None if there isn't a fresh one."""
+        key = (service, user_id)
+        entry = self._entries.get(key)
+        if entry:
+            expires, result, entry_api_key = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+            elif result.result != "error" or entry_api_key == api_key:
+                self._entries.move_to_end(key)
+                self.hits[result.result] += 1
+                return result
+        self.misses += 1
+        return None
+
+    def add(self, service: str, user_id: int, api_key, result: LookupResult):
+        """Cache a lookup result (unless its kind of result isn't cached), evicting the least recently used if full."""
+        ttl = self.ttls.get(result.result, 0)
+        if ttl <= 0:
+            return
+        key = (service, user_id)
+        self._entries[key] = (time.monotonic() + ttl, result, api_key)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> int:
+        """Remove all cached results, returning how many there were. Statistics are reset too."""
+        count = len(self._entries)
+        self._entries.clear()
+        self.hits.clear()
+        self.misses = 0
+        return count
+
+    @property
+    def hit_rate(self) -> Optional[float]:
+        """Get the fraction of lookups that were answered from the cache, or None if there were none."""
+        lookups = sum(self.hits.values()) + self.misses
+        if not lookups:
+            return None
+        return sum(self.hits.values()) / lookups
+
+    def __len__(self) -> int:
+        """Get the number of cached results (including expired ones that haven't been removed yet)."""
+        return len(self._entries)
@@ -0,0 +1,219 @@
+"""Local mirrors of ban lists, for services that can sync them."""
+import asyncio
+import hashlib
+import json
+import math
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Set
+
+from .dto.sync_result import SyncResult
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS banned (
+    service TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    PRIMARY KEY (service, user_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sync_state (
+    service TEXT PRIMARY KEY,
+    cursor TEXT,
+    synced_at REAL NOT NULL
+);
+"""
+
+
+class BloomFilter:
+    """A set of user IDs that can have false positives, but no false negatives.
+
+    About 10 bits per ID are enough for a 1% false positive rate, so even a large ban list fits
+    in a few megabytes. IDs can't be removed; build a new filter instead.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.01):
+        """Create an empty filter that stays under false_positive_rate with up to capacity IDs."""
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.size = max(
+            int(-capacity * math.log(false_positive_rate) / math.log(2) ** 2), 8
+        )
+        self.hash_count = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, user_id: int) -> Iterable[int]:
+        """Get the bit positions of a user ID (double hashing of one 128-bit hash)."""
+        digest = hashlib.blake2b(
+            user_id.to_bytes(8, "big", signed=False), digest_size=16
+        ).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        return (
+            (first + index * second) % self.size for index in range(self.hash_count)
+        )
+
+    def add(self, user_id: int):
+        """Add a user ID."""
+        for position in self._positions(user_id):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, user_id: int) -> bool:
+        """Return if a user ID might have been added (always True if it was)."""
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(user_id)
+        )
+
+
+class BanListMirror:
+    """Local copies of ban lists, kept in a SQLite database, with a Bloom filter of each in memory.
+
+    A user that isn't in a services Bloom filter is definitely not on its ban list, so they can be
+    reported clear without asking the service. Users that might be on it still need a real lookup,
+    for the reason and proof. A mirror is only trusted while its last sync is recent enough,
+    and stops being trusted as soon as a sync fails.
+    """
+
+    def __init__(self, path: str, max_age_seconds: int):
+        """Use the SQLite database at path (created if needed)."""
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+        self.filters: Dict[str, BloomFilter] = {}
+        self.cursors: Dict[str, Any] = {}
+        self.synced_at: Dict[str, float] = {}
+        self.failed: Set[str] = set()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="bancheck_mirror"
+        )
+        self._connection = None
+
+    async def _run(self, function, *args):
+        """Run a function on the database thread."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, function, *args
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get the database connection, opening it the first time."""
+        if not self._connection:
+            self._connection = sqlite3.connect(
+                self.path, isolation_level=None, check_same_thread=False
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(SQLITE_SCHEMA)
+        return self._connection
+
+    def _build_filter(self, service: str) -> BloomFilter:
+        """Build the Bloom filter of a service from its mirrored ban list."""
+        connection = self._connect()
+        (count,) = connection.execute(
+            "SELECT COUNT(*) FROM banned WHERE service = ?", (service,)
+        ).fetchone()
+        # Room to grow, so that incremental syncs don't need a rebuild every time
+        bloom_filter = BloomFilter(count * 2 + 1000)
+        for (user_id,) in connection.execute(
+            "SELECT user_id FROM banned WHERE service = ?", (service,)
+        ):
+            bloom_filter.add(user_id)
+        return bloom_filter
+
+    def _load(self, service: str):
+        row = (
+            self._connect()
+            .execute(
+                "SELECT cursor, synced_at FROM sync_state WHERE service = ?", (service,)
+            )
+            .fetchone()
+        )
+        return row, self._build_filter(service)
+
+    def _apply(self, service: str, result: SyncResult, synced_at: float) -> bool:
+        """Write a sync result, returning if the Bloom filter needs to be rebuilt."""
+        connection = self._connect()
+        connection.execute("BEGIN")
+        try:
+            if result.full:
+                connection.execute("DELETE FROM banned WHERE service = ?", (service,))
+            connection.executemany(
+                "DELETE FROM banned WHERE service = ? AND user_id = ?",
+                ((service, user_id) for user_id in result.unbanned_ids),
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO banned VALUES (?, ?)",
+                ((service, user_id) for user_id in result.banned_ids),
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)",
+                (service, json.dumps(result.cursor), synced_at),
+            )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return bool(result.full or result.unbanned_ids)
+
+    async def load(self, service: str):
+        """Load the mirrored ban list of a service (if there is one) into memory."""
+        row, bloom_filter = await self._run(self._load, service)
+        self.filters[service] = bloom_filter
+        if row:
+            self.cursors[service] = json.loads(row[0])
+            self.synced_at[service] = row[1]
+
+    async def apply(self, service: str, result: SyncResult):
+        """Apply a sync result to the mirrored ban list of a service."""
+        synced_at = time.time()
+        rebuild = await self._run(self._apply, service, result, synced_at)
+        bloom_filter = self.filters.get(service)
+        if bloom_filter:
+            # Added right away, so that new bans are never missed while a new filter is built
+            for user_id in result.banned_ids:
+                bloom_filter.add(user_id)
+        if rebuild or not bloom_filter or bloom_filter.count > bloom_filter.capacity:
+            # Bloom filters can't forget IDs, so unbans need a new one
+            self.filters[service] = await self._run(self._build_filter, service)
+        self.cursors[service] = result.cursor
+        self.synced_at[service] = synced_at
+        self.failed.discard(service)
+
+    def mark_failed(self, service: str):
+        """Stop trusting the mirrored ban list of a service until its next successful sync."""
+        self.failed.add(service)
+
+    def is_fresh(self, service: str) -> bool:
+        """Return if the mirrored ban list of a service was synced recently enough to be trusted."""
+        return (
+            service in self.filters
+            and service not in self.failed
+            and time.time() - self.synced_at.get(service, 0) < self.max_age_seconds
+        )
+
+    def is_clear(self, service: str, user_id: int) -> bool:
+        """Return if a user is definitely not on the ban list of a service, according to a fresh mirror."""
+        return self.is_fresh(service) and user_id not in self.filters[service]
+
+    async def count(self, service: str) -> int:
+        """Get the number of users on the mirrored ban list of a service."""
+
+        def query():
+            (count,) = (
+                self._connect()
+                .execute("SELECT COUNT(*) FROM banned WHERE service = ?", (service,))
+                .fetchone()
+            )
+            return count
+
+        return await self._run(query)
+
+    async def close(self):
+        """Close the database once everything queued has been written."""
+
+        def close_connection():
+            if self._connection:
+                self._connection.close()
+                self._connection = None
+
+        await self._run(close_connection)
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,62 @@
+"""Raid detection and AutoCheck summaries."""
+from collections import OrderedDict, deque
+from typing import Deque, List
+
+
+class JoinRateTracker:
+    """Recent member joins per guild, to tell when a guild is being raided.
+
+    Guilds are kept in the order they last had a member join, so quiet guilds are forgotten from the
+    front. Recording a join is amortized O(1), no matter how many guilds there are.
+    """
+
+    def __init__(self, threshold: int, window_seconds: int):
+        """Consider a guild raided while at least threshold members joined in the last window_seconds."""
+        self.threshold = threshold
+        self.window_seconds = window_seconds
+        self._joins: "OrderedDict[int, Deque[float]]" = OrderedDict()
+
+    def record_join(self, guild_id: int, now: float) -> bool:
+        """Record a member joining a guild, and return if the guild is being raided."""
+        joins = self._joins.setdefault(guild_id, deque())
+        self._joins.move_to_end(guild_id)
+        joins.append(now)
+        while joins[0] <= now - self.window_seconds:
+            joins.popleft()
+        while self._joins:
+            oldest_joins = next(iter(self._joins.values()))
+            if oldest_joins[-1] > now - self.window_seconds:
+                break
+            self._joins.popitem(last=False)
+        return len(joins) >= self.threshold
+
+
+class RaidSummary:
+    """AutoCheck results for a raided guild, waiting to be posted as a single embed."""
+
+    def __init__(self):
+        """Start with no results."""
+        self.clear = 0
+        self.auto_banned = 0
+        self.bans: List[str] = []
+        self.errors: List[str] = []
+
+    @property
+    def checked(self) -> int:
+        """Get the number of members checked."""
+        return self.clear + len(self.bans) + len(self.errors)
+
+    def description(self, max_length: int) -> str:
+        """Describe the results, listing members with bans first, then members with errors, within max_length."""
+        description = (
+            f"Checked {self.checked} new {'member' if self.checked == 1 else 'members'}: "
+            f"{len(self.bans)} banned elsewhere ({self.auto_banned} auto banned), "
+            f"{len(self.errors)} with errors, {self.clear} clear.\n\n"
+        )
+        lines = self.bans + self.errors
+        for index, line in enumerate(lines):
+            more = f"...and {len(lines) - index} more"
+            if len(description) + len(line) + 1 + len(more) > max_length:
+                return description + more
+            description += line + "\n"
+        return description
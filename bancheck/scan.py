@@ -0,0 +1,150 @@
+"""Bulk scans of existing guild members."""
+import asyncio
+import csv
+import io
+import time
+from typing import Dict, List, Optional
+
+from redbot.core.utils.chat_formatting import error, warning
+
+
+class ServiceRateLimiter:
+    """Spaces out the requests made to each service, so that scans stay within its REQUESTS_PER_SECOND."""
+
+    def __init__(self):
+        """Start with no requests made."""
+        self._next_request: Dict[str, float] = {}
+
+    async def wait(self, service):
+        """Wait until a request can be made to a service. Waiting requests go in the order they arrived."""
+        now = time.monotonic()
+        request_at = max(self._next_request.get(service.SERVICE_NAME, now), now)
+        self._next_request[service.SERVICE_NAME] = (
+            request_at + 1 / service.REQUESTS_PER_SECOND
+        )
+        if request_at > now:
+            await asyncio.sleep(request_at - now)
+
+
+class ScanProgress:
+    """Progress and results of a scan, saved to Config after every batch so that a scan can resume.
+
+    Members are scanned in order of their ID, so the checkpoint is the ID of the last member scanned.
+    Only members that were found on a ban list or couldn't be checked are remembered individually,
+    and only the first MAX_LISTED of each, so that saving the progress doesn't grow with the guild.
+    """
+
+    MAX_LISTED = 500
+
+    def __init__(
+        self,
+        channel_id: int,
+        total: int,
+        *,
+        attach_csv: bool = False,
+        checkpoint: int = 0,
+        clear: int = 0,
+        ban_count: int = 0,
+        error_count: int = 0,
+        bans: Optional[List[list]] = None,
+        errors: Optional[List[list]] = None,
+        started: Optional[float] = None,
+    ):
+        """Start a scan (or continue one from its saved progress)."""
+        self.channel_id = channel_id
+        self.total = total
+        self.attach_csv = attach_csv
+        self.checkpoint = checkpoint
+        self.clear = clear
+        self.ban_count = ban_count
+        self.error_count = error_count
+        self.bans = bans or []
+        self.errors = errors or []
+        self.started = started or time.time()
+
+    @classmethod
+    def from_config(cls, data: dict) -> "ScanProgress":
+        """Load saved progress."""
+        return cls(**data)
+
+    def to_config(self) -> dict:
+        """Get the progress as something that can be saved to Config."""
+        return {
+            "channel_id": self.channel_id,
+            "total": self.total,
+            "attach_csv": self.attach_csv,
+            "checkpoint": self.checkpoint,
+            "clear": self.clear,
+            "ban_count": self.ban_count,
+            "error_count": self.error_count,
+            "bans": self.bans,
+            "errors": self.errors,
+            "started": self.started,
+        }
+
+    @property
+    def checked(self) -> int:
+        """Get the number of members scanned so far."""
+        return self.clear + self.ban_count + self.error_count
+
+    def add(self, member_id: int, member_name: str, responses: list):
+        """Add the lookup results of a member. Bans take precedence over errors."""
+        bans = [
+            f"{response.service} ({response.reason})"
+            for response in responses
+            if response.result == "ban"
+        ]
+        errors = [
+            f"{response.service} ({response.reason or 'No reason given'})"
+            for response in responses
+            if response.result != "ban" and response.result != "clear"
+        ]
+        if bans:
+            self.ban_count += 1
+            if len(self.bans) < self.MAX_LISTED:
+                self.bans.append([member_id, member_name, ", ".join(bans)])
+        elif errors:
+            self.error_count += 1
+            if len(self.errors) < self.MAX_LISTED:
+                self.errors.append([member_id, member_name, ", ".join(errors)])
+        else:
+            self.clear += 1
+
+    def remove_member(self, member_id: int):
+        """Forget the ID and name of a member (they still count towards the totals)."""
+        self.bans = [entry for entry in self.bans if entry[0] != member_id]
+        self.errors = [entry for entry in self.errors if entry[0] != member_id]
+
+    def description(self, max_length: int) -> str:
+        """Describe the results, listing members with bans first, then members with errors, within max_length."""
+        description = (
+            f"Checked {self.checked} of {self.total} {'member' if self.total == 1 else 'members'}: "
+            f"{self.ban_count} banned elsewhere, {self.error_count} with errors, {self.clear} clear.\n\n"
+        )
+        unlisted = self.ban_count - len(self.bans) + self.error_count - len(self.errors)
+        lines = [
+            error(f"**{name}** ({member_id}): {details}")
+            for member_id, name, details in self.bans
+        ] + [
+            warning(f"**{name}** ({member_id}): {details}")
+            for member_id, name, details in self.errors
+        ]
+        for index, line in enumerate(lines):
+            more = f"...and {len(lines) - index + unlisted} more"
+            if len(description) + len(line) + 1 + len(more) > max_length:
+                return description + more
+            description += line + "\n"
+        if unlisted:
+            description += f"...and {unlisted} more"
+        return description
+
+    def to_csv(self) -> bytes:
+        """Get the listed members with bans or errors as a CSV file."""
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(["member_id", "member", "result", "details"])
+        for member_id, name, details in self.bans:
+            writer.writerow([member_id, name, "ban", details])
+        for member_id, name, details in self.errors:
+            writer.writerow([member_id, name, "error", details])
+        return output.getvalue().encode("utf-8")
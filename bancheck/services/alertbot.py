@@ -3,45 +3,44 @@ import aiohttp
 from redbot.core import __version__ as redbot_version
 
 from ..dto.lookup_result import LookupResult
+from .base import BanService
 
 user_agent = (
     f"Red-DiscordBot/{redbot_version} BanCheck (https://github.com/PhasecoreX/PCXCogs)"
 )
 
 
-class AlertBot:
+class AlertBot(BanService):
     """Ban lookup for AlertBot."""
 
     SERVICE_NAME = "AlertBot"
     SERVICE_API_KEY_REQUIRED = True
     SERVICE_URL = "https://api.alertbot.services"
 
-    @staticmethod
-    async def lookup(user_id: int, api_key: str):
+    async def _lookup(self, user_id: int, api_key: str):
         """Perform user lookup on AlertBot."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"https://api.alertbot.services/v1/?action=bancheck&userid={user_id}",
-                    headers={"AuthKey": api_key, "user-agent": user_agent},
-                ) as resp:
-                    data = await resp.json()
-                    if int(data["code"]) != 200:
-                        return LookupResult(
-                            AlertBot.SERVICE_NAME,
-                            "error",
-                            reason=data["desc"],
-                        )
-                    if data["data"]["result"]["banned"]:
-                        return LookupResult(
-                            AlertBot.SERVICE_NAME,
-                            "ban",
-                            reason=data["data"]["result"]["reason"],
-                            proof_url=data["data"]["result"]["proof"]
-                            if "proof" in data["data"]["result"]
-                            else None,
-                        )
-                    return LookupResult(AlertBot.SERVICE_NAME, "clear")
+            async with self.session.get(
+                f"https://api.alertbot.services/v1/?action=bancheck&userid={user_id}",
+                headers={"AuthKey": api_key, "user-agent": user_agent},
+            ) as resp:
+                data = await resp.json()
+                if int(data["code"]) != 200:
+                    return LookupResult(
+                        AlertBot.SERVICE_NAME,
+                        "error",
+                        reason=data["desc"],
+                    )
+                if data["data"]["result"]["banned"]:
+                    return LookupResult(
+                        AlertBot.SERVICE_NAME,
+                        "ban",
+                        reason=data["data"]["result"]["reason"],
+                        proof_url=data["data"]["result"]["proof"]
+                        if "proof" in data["data"]["result"]
+                        else None,
+                    )
+                return LookupResult(AlertBot.SERVICE_NAME, "clear")
         except aiohttp.ClientConnectionError:
             return LookupResult(
                 AlertBot.SERVICE_NAME,
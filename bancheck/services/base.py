@@ -0,0 +1,131 @@
+"""The protocol all ban services follow."""
+import asyncio
+from abc import ABC, abstractmethod
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    FrozenSet,
+    Iterable,
+    Optional,
+    Tuple,
+)
+
+import aiohttp
+
+from ..dto.lookup_result import LookupResult
+from ..dto.report_result import ReportResult
+
+LOOKUP = "lookup"
+REPORT = "report"
+SYNC = "sync"
+
+
+class BanService(ABC):
+    """A ban service client.
+
+    One client per service is created when the cog loads, and lives as long as the cog does.
+    Each service declares what it can do and how hard it can be used up front, and the client
+    takes care of limiting concurrent requests and timing them out, so callers don't have to.
+
+    Services implement _lookup (and _report or sync, if they declare those capabilities).
+    A service with a batch endpoint can also override lookup_many (awaiting before_request before
+    each request), and set BATCH_SIZE.
+    """
+
+    SERVICE_NAME: str
+    SERVICE_API_KEY_REQUIRED: bool
+    SERVICE_URL: str
+    CAPABILITIES: FrozenSet[str] = frozenset({LOOKUP})
+    # Requests allowed at once, seconds before a request is given up on,
+    # requests per second allowed for bulk work (like scans), and users per lookup_many request
+    CONCURRENCY = 5
+    TIMEOUT_SECONDS = 10
+    REQUESTS_PER_SECOND = 5
+    BATCH_SIZE = 1
+    # Looked up by the default health check: Discord's own system account, which no ban list has
+    HEALTH_CHECK_USER_ID = 643945264868098049
+
+    def __init__(self, session: aiohttp.ClientSession):
+        """Use a shared HTTP session for all requests."""
+        self.session = session
+        self.semaphore = asyncio.Semaphore(self.CONCURRENCY)
+
+    @classmethod
+    def supports(cls, capability: str) -> bool:
+        """Return if this service has a capability (LOOKUP, REPORT or SYNC)."""
+        return capability in cls.CAPABILITIES
+
+    @abstractmethod
+    async def _lookup(self, user_id: int, api_key) -> LookupResult:
+        """Perform a single user lookup request."""
+        raise NotImplementedError()
+
+    async def _report(
+        self, user_id: int, api_key, mod_id: int, reason: str, proof: str
+    ) -> ReportResult:
+        """Perform a single ban report request."""
+        raise NotImplementedError()
+
+    async def lookup(self, user_id: int, api_key) -> LookupResult:
+        """Look up a user, waiting for a free request slot and giving up after TIMEOUT_SECONDS."""
+        async with self.semaphore:
+            try:
+                return await asyncio.wait_for(
+                    self._lookup(user_id, api_key), timeout=self.TIMEOUT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                return LookupResult(
+                    self.SERVICE_NAME,
+                    "error",
+                    reason=f"No response within {self.TIMEOUT_SECONDS} seconds",
+                )
+
+    async def lookup_many(
+        self,
+        user_ids: Iterable[int],
+        api_key,
+        before_request: Optional[Callable[[], Awaitable]] = None,
+    ) -> AsyncIterator[Tuple[int, LookupResult]]:
+        """Look up many users, yielding (user ID, result) as each result comes in.
+
+        By default each user is a separate lookup, made as many at a time as CONCURRENCY allows
+        over the kept-alive connections of the shared session.
+        If given, before_request is awaited before each request is made (to rate limit them).
+        """
+
+        async def keyed_lookup(user_id: int):
+            if before_request:
+                await before_request()
+            return user_id, await self.lookup(user_id, api_key)
+
+        for next_result in asyncio.as_completed(
+            [keyed_lookup(user_id) for user_id in user_ids]
+        ):
+            yield await next_result
+
+    async def report(
+        self, user_id: int, api_key, mod_id: int, reason: str, proof: str
+    ) -> ReportResult:
+        """Report a user, waiting for a free request slot and giving up after TIMEOUT_SECONDS."""
+        async with self.semaphore:
+            try:
+                return await asyncio.wait_for(
+                    self._report(user_id, api_key, mod_id, reason, proof),
+                    timeout=self.TIMEOUT_SECONDS,
+                )
+            except asyncio.TimeoutError:
+                return ReportResult(
+                    self.SERVICE_NAME,
+                    False,
+                    reason=f"No response within {self.TIMEOUT_SECONDS} seconds",
+                )
+
+    async def sync(self, api_key, cursor=None):
+        """Get the whole ban list, or the changes to it since the cursor, as a SyncResult."""
+        raise NotImplementedError()
+
+    async def health(self, api_key) -> bool:
+        """Return if the service is answering lookups properly."""
+        result = await self.lookup(self.HEALTH_CHECK_USER_ID, api_key)
+        return result.result != "error"
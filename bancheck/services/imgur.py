@@ -10,23 +10,25 @@ user_agent = (
 class Imgur:
     """Imgur uploader."""
 
-    @staticmethod
-    async def upload(url: str, client_id: str):
+    def __init__(self, session: aiohttp.ClientSession):
+        """Use a shared HTTP session for all requests."""
+        self.session = session
+
+    async def upload(self, url: str, client_id: str):
         """Upload an image to Imgur anonymously."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://api.imgur.com/3/upload",
-                    data={"image": url},
-                    headers={
-                        "Authorization": "Client-ID " + client_id,
-                        "user-agent": user_agent,
-                    },
-                ) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        if data and data["success"]:
-                            return data["data"]["link"]
+            async with self.session.post(
+                "https://api.imgur.com/3/upload",
+                data={"image": url},
+                headers={
+                    "Authorization": "Client-ID " + client_id,
+                    "user-agent": user_agent,
+                },
+            ) as resp:
+                if resp.status == 200:
+                    data = await resp.json()
+                    if data and data["success"]:
+                        return data["data"]["link"]
         except aiohttp.ClientError:
             pass  # All aiohttp exceptions
         except TypeError:
@@ -1,16 +1,22 @@
 """Ban lookup for KSoft.Si."""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
 import aiohttp
 from redbot.core import __version__ as redbot_version
 
 from ..dto.lookup_result import LookupResult
 from ..dto.report_result import ReportResult
+from ..dto.sync_result import SyncResult
+from .base import LOOKUP, REPORT, SYNC, BanService
 
 user_agent = (
     f"Red-DiscordBot/{redbot_version} BanCheck (https://github.com/PhasecoreX/PCXCogs)"
 )
 
 
-class KSoftSi:
+class KSoftSi(BanService):
     """Ban lookup for KSoft.Si."""
 
     SERVICE_NAME = "KSoft.Si Bans"
@@ -18,94 +24,91 @@ class KSoftSi:
     SERVICE_URL = "https://api.ksoft.si/#get-started"
     SERVICE_HINT = "You only need to do Step 1 in order to get an API key"
     BASE_URL = "https://api.ksoft.si/bans"
+    SYNC_PAGE_SIZE = 1000
+    CAPABILITIES = frozenset({LOOKUP, REPORT, SYNC})
+    BATCH_SIZE = 100
 
-    @staticmethod
-    async def lookup(user_id: int, api_key: str):
+    async def _lookup(self, user_id: int, api_key: str):
         """Perform user lookup on KSoft.Si."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    KSoftSi.BASE_URL + "/check",
-                    params={"user": str(user_id)},
-                    headers={
-                        "Authorization": "NANI " + api_key,
-                        "user-agent": user_agent,
-                    },
-                ) as resp:
-                    """Response 200 example:
-                    {
-                        "is_banned": true
-                    }
-                    """
-                    """ Response 401 example:
-                    {
-                        "detail": "Invalid token."
-                    }
-                    """
-                    data = await resp.json()
-                    if resp.status != 200:
-                        reason = ""
-                        if "detail" in data:
-                            reason = data["detail"]
-                        if "message" in data:
-                            reason = data["message"]
-                        return LookupResult(
-                            KSoftSi.SERVICE_NAME, "error", reason=reason
-                        )
-                    # Successful lookup
-                    if not data["is_banned"]:
-                        return LookupResult(KSoftSi.SERVICE_NAME, "clear")
+            async with self.session.get(
+                KSoftSi.BASE_URL + "/check",
+                params={"user": str(user_id)},
+                headers={
+                    "Authorization": "NANI " + api_key,
+                    "user-agent": user_agent,
+                },
+            ) as resp:
+                """Response 200 example:
+                {
+                    "is_banned": true
+                }
+                """
+                """ Response 401 example:
+                {
+                    "detail": "Invalid token."
+                }
+                """
+                data = await resp.json()
+                if resp.status != 200:
+                    reason = ""
+                    if "detail" in data:
+                        reason = data["detail"]
+                    if "message" in data:
+                        reason = data["message"]
+                    return LookupResult(KSoftSi.SERVICE_NAME, "error", reason=reason)
+                # Successful lookup
+                if not data["is_banned"]:
+                    return LookupResult(KSoftSi.SERVICE_NAME, "clear")
 
-                async with session.get(
-                    KSoftSi.BASE_URL + "/info",
-                    params={"user": user_id},
-                    headers={
-                        "Authorization": "NANI " + api_key,
-                        "user-agent": user_agent,
-                    },
-                ) as resp:
-                    """Response 200 example:
-                    {
-                        "id": 492811511081861130,
-                        "name": "󐂪 discord.gg/bYNTxCJ 󐂪",
-                        "discriminator": "3334",
-                        "moderator_id": 205680187394752512,
-                        "reason": "Anarchy Raider",
-                        "proof": "https://imgur.com/a/eiOgTjS",
-                        "is_ban_active": true,
-                        "can_be_appealed": false,
-                        "timestamp": "2018-09-21T23:58:32.743",
-                        "appeal_reason": "",
-                        "appeal_date": null,
-                        "requested_by": "205680187394752512",
-                        "exists": true
-                    }
-                    """
-                    """ Response 404 example:
-                    {
-                        "code": 404,
-                        "error": true,
-                        "exists": false,
-                        "message": "specified user does not exist"
-                    }
-                    """
-                    data = await resp.json()
-                    if resp.status != 200:
-                        reason = ""
-                        if "detail" in data:
-                            reason = data["detail"]
-                        if "message" in data:
-                            reason = data["message"]
-                        return LookupResult(
-                            KSoftSi.SERVICE_NAME, "error", reason=reason
-                        )
-                    # Successful lookup
-                    return LookupResult(
-                        KSoftSi.SERVICE_NAME,
-                        "ban",
-                        reason=data["reason"],
-                        proof_url=data["proof"] if "proof" in data else None,
-                    )
+            async with self.session.get(
+                KSoftSi.BASE_URL + "/info",
+                params={"user": user_id},
+                headers={
+                    "Authorization": "NANI " + api_key,
+                    "user-agent": user_agent,
+                },
+            ) as resp:
+                """Response 200 example:
+                {
+                    "id": 492811511081861130,
+                    "name": "󐂪 discord.gg/bYNTxCJ 󐂪",
+                    "discriminator": "3334",
+                    "moderator_id": 205680187394752512,
+                    "reason": "Anarchy Raider",
+                    "proof": "https://imgur.com/a/eiOgTjS",
+                    "is_ban_active": true,
+                    "can_be_appealed": false,
+                    "timestamp": "2018-09-21T23:58:32.743",
+                    "appeal_reason": "",
+                    "appeal_date": null,
+                    "requested_by": "205680187394752512",
+                    "exists": true
+                }
+                """
+                """ Response 404 example:
+                {
+                    "code": 404,
+                    "error": true,
+                    "exists": false,
+                    "message": "specified user does not exist"
+                }
+                """
+                data = await resp.json()
+                if resp.status != 200:
+                    reason = ""
+                    if "detail" in data:
+                        reason = data["detail"]
+                    if "message" in data:
+                        reason = data["message"]
+                    return LookupResult(KSoftSi.SERVICE_NAME, "error", reason=reason)
+                # Successful lookup
+                return LookupResult(
+                    KSoftSi.SERVICE_NAME,
+                    "ban",
+                    reason=data["reason"],
+                    proof_url=data["proof"] if "proof" in data else None,
+                )
         except aiohttp.ClientConnectionError:
             return LookupResult(
                 KSoftSi.SERVICE_NAME,
@@ -124,42 +127,132 @@ class KSoftSi:
             reason="Response data malformed",
         )
 
-    @staticmethod
-    async def report(user_id: int, api_key: str, mod_id: int, reason: str, proof: str):
+    async def lookup_many(
+        self,
+        user_ids: Iterable[int],
+        api_key: str,
+        before_request: Optional[Callable[[], Awaitable]] = None,
+    ):
+        """Perform user lookups on KSoft.Si, BATCH_SIZE users per request with /bulkcheck.
+
+        If a bulk check fails for some other reason than timing out, its users are looked up one at a time instead.
+        """
+        user_ids = list(user_ids)
+        for start in range(0, len(user_ids), KSoftSi.BATCH_SIZE):
+            chunk = user_ids[start : start + KSoftSi.BATCH_SIZE]
+            timed_out = False
+            if before_request:
+                await before_request()
+            async with self.semaphore:
+                try:
+                    bans = await asyncio.wait_for(
+                        self._bulk_check(chunk, api_key), timeout=self.TIMEOUT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    bans = None
+                    timed_out = True
+            if timed_out:
+                for user_id in chunk:
+                    yield user_id, LookupResult(
+                        KSoftSi.SERVICE_NAME,
+                        "error",
+                        reason=f"No response within {self.TIMEOUT_SECONDS} seconds",
+                    )
+            elif bans is None:
+                async for user_id, result in super().lookup_many(
+                    chunk, api_key, before_request
+                ):
+                    yield user_id, result
+            else:
+                for user_id in chunk:
+                    yield user_id, bans.get(user_id) or LookupResult(
+                        KSoftSi.SERVICE_NAME, "clear"
+                    )
+
+    async def _bulk_check(
+        self, user_ids: List[int], api_key: str
+    ) -> Optional[Dict[int, LookupResult]]:
+        """Check many users on KSoft.Si with one request, returning the bans found (or None if it failed)."""
+        try:
+            async with self.session.post(
+                KSoftSi.BASE_URL + "/bulkcheck",
+                data={
+                    "users": ",".join(str(user_id) for user_id in user_ids),
+                    "more_info": "true",
+                },
+                headers={
+                    "Authorization": "NANI " + api_key,
+                    "user-agent": user_agent,
+                },
+            ) as resp:
+                """Response 200 example (only users that are banned are listed):
+                [
+                    {
+                        "id": 492811511081861130,
+                        ...
+                        "reason": "Anarchy Raider",
+                        "proof": "https://imgur.com/a/eiOgTjS",
+                        "is_ban_active": true
+                    }
+                ]
+                """
+                data = await resp.json()
+                if resp.status != 200:
+                    return None
+                return {
+                    int(ban["id"]): LookupResult(
+                        KSoftSi.SERVICE_NAME,
+                        "ban",
+                        reason=ban["reason"],
+                        proof_url=ban["proof"] if "proof" in ban else None,
+                    )
+                    for ban in data
+                    if ban.get("is_ban_active", True)
+                }
+        except aiohttp.ClientError:
+            pass  # Includes ClientConnectionError, which the single lookups will report
+        except (AttributeError, TypeError):
+            pass  # resp.json() is None or not a list of objects (malformed data)
+        except (KeyError, ValueError):
+            pass  # json element does not exist or isn't an ID (malformed data)
+        return None
+
+    async def _report(
+        self, user_id: int, api_key: str, mod_id: int, reason: str, proof: str
+    ):
         """Perform ban report on KSoft.Si."""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    KSoftSi.BASE_URL + "/add",
-                    data={
-                        "user": user_id,
-                        "mod": mod_id,
-                        "reason": reason,
-                        "proof": proof,
-                    },
-                    headers={
-                        "Authorization": "NANI " + api_key,
-                        "user-agent": user_agent,
-                    },
-                ) as resp:
-                    data = await resp.json()
-                    # User already banned
-                    if resp.status == 409:
-                        return ReportResult(
-                            KSoftSi.SERVICE_NAME,
-                            True,
-                            reason=data["message"],
-                        )
-                    # Some other error
-                    if resp.status != 200:
-                        reason = ""
-                        if "detail" in data:
-                            reason = data["detail"]
-                        if "message" in data:
-                            reason = data["message"]
-                        return ReportResult(KSoftSi.SERVICE_NAME, False, reason=reason)
-                    # Successful report
-                    return ReportResult(KSoftSi.SERVICE_NAME, True)
+            async with self.session.post(
+                KSoftSi.BASE_URL + "/add",
+                data={
+                    "user": user_id,
+                    "mod": mod_id,
+                    "reason": reason,
+                    "proof": proof,
+                },
+                headers={
+                    "Authorization": "NANI " + api_key,
+                    "user-agent": user_agent,
+                },
+            ) as resp:
+                data = await resp.json()
+                # User already banned
+                if resp.status == 409:
+                    return ReportResult(
+                        KSoftSi.SERVICE_NAME,
+                        True,
+                        reason=data["message"],
+                    )
+                # Some other error
+                if resp.status != 200:
+                    reason = ""
+                    if "detail" in data:
+                        reason = data["detail"]
+                    if "message" in data:
+                        reason = data["message"]
+                    return ReportResult(KSoftSi.SERVICE_NAME, False, reason=reason)
+                # Successful report
+                return ReportResult(KSoftSi.SERVICE_NAME, True)
         except aiohttp.ClientConnectionError:
             return ReportResult(
                 KSoftSi.SERVICE_NAME,
@@ -177,3 +270,99 @@ class KSoftSi:
             False,
             reason="Response data malformed",
         )
+
+    async def sync(self, api_key: str, cursor=None):
+        """Get the KSoft.Si ban list, or the changes to it since the last sync.
+
+        The cursor is the timestamp of the last sync. Without one, the whole list is paged through.
+        """
+        headers = {"Authorization": "NANI " + api_key, "user-agent": user_agent}
+        started = int(time.time())
+        try:
+            if cursor is not None:
+                async with self.session.get(
+                    KSoftSi.BASE_URL + "/updates",
+                    params={"timestamp": str(cursor)},
+                    headers=headers,
+                ) as resp:
+                    """Response 200 example:
+                    {
+                        "data": [
+                            {
+                                "id": 492811511081861130,
+                                ...
+                                "is_ban_active": false
+                            }
+                        ],
+                        "current_timestamp": 1568221225
+                    }
+                    """
+                    data = await resp.json()
+                    if resp.status != 200:
+                        return SyncResult(
+                            KSoftSi.SERVICE_NAME,
+                            error=data.get("detail") or data.get("message") or "",
+                        )
+                    return SyncResult(
+                        KSoftSi.SERVICE_NAME,
+                        banned_ids=(
+                            int(ban["id"])
+                            for ban in data["data"]
+                            if ban["is_ban_active"]
+                        ),
+                        unbanned_ids=(
+                            int(ban["id"])
+                            for ban in data["data"]
+                            if not ban["is_ban_active"]
+                        ),
+                        cursor=data.get("current_timestamp", started),
+                    )
+
+            banned_ids = []
+            page = 1
+            while page:
+                async with self.session.get(
+                    KSoftSi.BASE_URL + "/list",
+                    params={"page": str(page), "per_page": str(KSoftSi.SYNC_PAGE_SIZE)},
+                    headers=headers,
+                ) as resp:
+                    """Response 200 example:
+                    {
+                        "ban_count": 1337,
+                        "page_count": 2,
+                        "per_page": 1000,
+                        "page": 1,
+                        "on_page": 1000,
+                        "next_page": 2,
+                        "previous_page": null,
+                        "data": [
+                            {
+                                "id": 492811511081861130,
+                                ...
+                                "is_ban_active": true
+                            }
+                        ]
+                    }
+                    """
+                    data = await resp.json()
+                    if resp.status != 200:
+                        return SyncResult(
+                            KSoftSi.SERVICE_NAME,
+                            error=data.get("detail") or data.get("message") or "",
+                        )
+                    banned_ids.extend(
+                        int(ban["id"]) for ban in data["data"] if ban["is_ban_active"]
+                    )
+                    page = data["next_page"]
+            return SyncResult(
+                KSoftSi.SERVICE_NAME, banned_ids=banned_ids, cursor=started, full=True
+            )
+        except aiohttp.ClientConnectionError:
+            return SyncResult(KSoftSi.SERVICE_NAME, error="Could not connect to host")
+        except aiohttp.ClientError:
+            pass  # All non-ClientConnectionError aiohttp exceptions are treated as malformed data
+        except (AttributeError, TypeError):
+            pass  # resp.json() is None or not an object (malformed data)
+        except (KeyError, ValueError):
+            pass  # json element does not exist or isn't an ID (malformed data)
+        return SyncResult(KSoftSi.SERVICE_NAME, error="Response data malformed")
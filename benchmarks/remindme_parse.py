@@ -0,0 +1,161 @@
+"""Micro-benchmark: RemindMe reminder text parsing.
+
+Compares the single-pass parser in remindme.reminder_parse against the previous
+incremental parser (re-running Red's parse_timedelta on an ever growing prefix).
+
+Run from the repository root, in an environment with Red-DiscordBot installed:
+
+    python -m benchmarks.remindme_parse
+"""
+import re
+import timeit
+from datetime import time, timedelta
+
+from discord.ext.commands import BadArgument
+from redbot.core import commands
+from redbot.core.commands import parse_timedelta
+
+from remindme.reminder_parse import (
+    TIMEDELTA_BEGIN,
+    TIMEDELTA_END,
+    process_reminder_text,
+)
+
+# The previous implementation, kept here as the baseline
+LEGACY_TIMEDELTA_BEGIN = re.compile(r"^" + TIMEDELTA_BEGIN.pattern)
+LEGACY_TIMEDELTA_END = TIMEDELTA_END
+
+
+def legacy_process_reminder_text(reminder_text):
+    reminder_time = None
+    reminder_time_repeat = None
+    (
+        reminder_time,
+        reminder_time_repeat,
+        reminder_text,
+    ) = legacy_process_reminder_text_from_ends(
+        reminder_time, reminder_time_repeat, reminder_text, LEGACY_TIMEDELTA_BEGIN
+    )
+    (
+        reminder_time,
+        reminder_time_repeat,
+        reminder_text,
+    ) = legacy_process_reminder_text_from_ends(
+        reminder_time, reminder_time_repeat, reminder_text, LEGACY_TIMEDELTA_END
+    )
+    reminder_time = reminder_time or reminder_time_repeat
+    if len(reminder_text) > 1 and reminder_text[0:2] == "to":
+        reminder_text = reminder_text[2:].strip()
+    return reminder_time, reminder_time_repeat, reminder_text
+
+
+def legacy_process_reminder_text_from_ends(
+    reminder_time, reminder_time_repeat, reminder_text, search_regex
+):
+    while regex_result := search_regex.search(reminder_text):
+        repeating = regex_result[1] and regex_result[1].strip() == "every"
+        if (repeating and reminder_time_repeat) or (not repeating and reminder_time):
+            break
+        parsed_timedelta = legacy_parse_timedelta(regex_result[2], repeating)
+        if not parsed_timedelta:
+            break
+        reminder_text = (
+            reminder_text[0 : regex_result.span()[0]]
+            + reminder_text[regex_result.span()[1] + 1 :]
+        ).strip()
+        if repeating:
+            reminder_time_repeat = parsed_timedelta
+        else:
+            reminder_time = parsed_timedelta
+    return reminder_time, reminder_time_repeat, reminder_text
+
+
+def legacy_parse_timedelta(timedelta_string, repeating):
+    result = None
+    testing_text = ""
+    for chunk in timedelta_string.split():
+        if chunk == "and":
+            continue
+        if chunk.isdigit():
+            testing_text += chunk
+            continue
+        testing_text += chunk.rstrip(",")
+        if repeating:
+            try:
+                parsed = parse_timedelta(
+                    testing_text,
+                    minimum=timedelta(days=1),
+                    allowed_units=["weeks", "days"],
+                )
+            except commands.BadArgument as ba:
+                orig_message = str(ba)[0].lower() + str(ba)[1:]
+                raise BadArgument(
+                    f"For the repeating portion of this reminder, {orig_message}. "
+                    "You must only use `days` or `weeks` when dealing with repeating reminders."
+                )
+        else:
+            parsed = parse_timedelta(testing_text, minimum=timedelta(minutes=1))
+        if parsed != result:
+            result = parsed
+        else:
+            return None
+    return result
+
+
+CASES = {
+    "short": "in 2 hours to check the oven",
+    "full": "in 2 weeks 3 days and 4 hours to renew the domain every 2 weeks, 1 day",
+    "long text": "in 1 week, 2 days, 3 hours, 4 minutes and 5 seconds to "
+    + "do that thing I keep forgetting about " * 40
+    + "every 1 week and 6 days",
+    "many chunks": "in "
+    + " and ".join(
+        f"{amount} {unit}"
+        for amount, unit in zip(
+            range(1, 6), ["weeks", "days", "hours", "minutes", "seconds"]
+        )
+    )
+    + " to stretch",
+}
+
+# Time of day expressions, and durations that only look like one
+AT_CASES = {
+    "at 5pm to stretch": (time(17), "stretch"),
+    "to stretch at 17:30": (time(17, 30), "stretch"),
+    "meet at 2 hrs": (None, "meet at"),
+    "at 2 hrs to stretch": (None, "at 2 hrs to stretch"),
+    "in 2 days at 2 hrs to stretch": (None, "at 2 hrs to stretch"),
+    "at 2 to stretch": (time(2), "stretch"),
+}
+
+
+def relative_reminder_text(text):
+    """Run the single-pass parser, returning the same values the previous parser did."""
+    reminder_time, reminder_text = process_reminder_text(text)
+    return (
+        reminder_time.relative or reminder_time.repeat,
+        reminder_time.repeat,
+        reminder_text,
+    )
+
+
+def main():
+    for text, expected in AT_CASES.items():
+        reminder_time, reminder_text = process_reminder_text(text)
+        assert (reminder_time.at, reminder_text) == expected, text
+    for name, text in CASES.items():
+        assert relative_reminder_text(text) == legacy_process_reminder_text(text), name
+        number = 2000
+        legacy = timeit.timeit(
+            lambda: legacy_process_reminder_text(text), number=number
+        )
+        single_pass = timeit.timeit(lambda: relative_reminder_text(text), number=number)
+        print(
+            f"{name:<12} legacy {legacy / number * 1e6:8.1f} us   "
+            f"single pass {single_pass / number * 1e6:8.1f} us   "
+            f"({legacy / single_pass:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Benchmark: RemindMe reminder storage backends.
+
+Compares remindme.reminder_store.SQLiteReminderStore against Config with Red's JSON driver, at
+10k, 100k and 1M reminders (or the sizes given on the command line). Red's JSON driver keeps
+all data in memory and rewrites the whole file on every change, which is reproduced here by
+JsonFileBackend so that no Red instance is needed.
+
+Run from the repository root, in an environment with Red-DiscordBot installed:
+
+    python -m benchmarks.remindme_store [size ...]
+"""
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from remindme.reminder_store import SQLiteReminderStore
+
+SIZES = [10_000, 100_000, 1_000_000]
+REMINDERS_PER_USER = 5
+CHANGED_USERS = 100
+
+
+class JsonFileBackend:
+    """The relevant behaviour of Config with Red's JSON driver, for the REMINDER custom group."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.data = {}
+
+    def _save(self):
+        # Like redbot.core.drivers.json._save_json: write a temporary file, fsync, then replace
+        temporary_path = self.path.with_suffix(".tmp")
+        with temporary_path.open("w", encoding="utf-8") as fp:
+            json.dump(self.data, fp)
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(temporary_path, self.path)
+
+    def load_all(self):
+        with self.path.open(encoding="utf-8") as fp:
+            self.data = json.load(fp)
+        return [
+            reminder
+            for users_reminders in self.data.values()
+            for reminder in users_reminders.values()
+        ]
+
+    def write_user(self, user_id, reminders):
+        self.data[str(user_id)] = {
+            str(reminder["USER_REMINDER_ID"]): reminder for reminder in reminders
+        }
+        self._save()
+
+    def replace_all(self, reminders):
+        self.data = {}
+        for reminder in reminders:
+            self.data.setdefault(str(reminder["USER_ID"]), {})[
+                str(reminder["USER_REMINDER_ID"])
+            ] = reminder
+        self._save()
+
+    def due_reminders(self, before):
+        return sorted(
+            (
+                reminder
+                for users_reminders in self.data.values()
+                for reminder in users_reminders.values()
+                if reminder["FUTURE"] <= before
+            ),
+            key=lambda reminder: reminder["FUTURE"],
+        )
+
+    def load_user(self, user_id):
+        return list(self.data.get(str(user_id), {}).values())
+
+
+def make_reminders(count):
+    rng = random.Random(14)
+    return [
+        {
+            "USER_REMINDER_ID": number % REMINDERS_PER_USER + 1,
+            "USER_ID": 10 ** 17 + number // REMINDERS_PER_USER,
+            "REMINDER": f"do thing number {rng.randrange(10 ** 6)}",
+            "REPEAT": None,
+            "FUTURE": 1_700_000_000 + rng.randrange(10 ** 7),
+            "FUTURE_TEXT": "1 day",
+            "JUMP_LINK": None,
+            "RRULE": None,
+            "TIMEZONE": None,
+            "CATCH_UP": "once",
+        }
+        for number in range(count)
+    ]
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+async def atimed(coroutine):
+    start = time.perf_counter()
+    result = await coroutine
+    return result, time.perf_counter() - start
+
+
+async def benchmark(size, directory: Path):
+    reminders = make_reminders(size)
+    user_ids = sorted({reminder["USER_ID"] for reminder in reminders})
+    changed = {
+        user_id: [
+            dict(reminder, FUTURE=reminder["FUTURE"] + 60)
+            for reminder in reminders[
+                (user_id - 10 ** 17)
+                * REMINDERS_PER_USER : (user_id - 10 ** 17 + 1)
+                * REMINDERS_PER_USER
+            ]
+        ]
+        for user_id in random.Random(1).sample(user_ids, CHANGED_USERS)
+    }
+    due_before = 1_700_000_000 + 10 ** 7 // 1000  # About 0.1% of reminders
+    listed_user = user_ids[len(user_ids) // 2]
+    results = {}
+
+    json_backend = JsonFileBackend(directory / f"settings-{size}.json")
+    _, results[("json", "save all")] = timed(
+        lambda: json_backend.replace_all(reminders)
+    )
+    _, results[("json", "load all")] = timed(json_backend.load_all)
+    # Every changed user is a separate Config write, and each one rewrites the whole file
+    user_id, users_reminders = next(iter(changed.items()))
+    _, elapsed = timed(lambda: json_backend.write_user(user_id, users_reminders))
+    results[("json", f"write {CHANGED_USERS} users")] = elapsed * CHANGED_USERS
+    due, results[("json", "due query")] = timed(
+        lambda: json_backend.due_reminders(due_before)
+    )
+    _, results[("json", "list user")] = timed(
+        lambda: json_backend.load_user(listed_user)
+    )
+
+    store = SQLiteReminderStore(str(directory / f"reminders-{size}.sqlite3"))
+    _, results[("sqlite", "save all")] = await atimed(store.replace_all(reminders))
+    _, results[("sqlite", "load all")] = await atimed(store.load_all())
+    _, results[("sqlite", f"write {CHANGED_USERS} users")] = await atimed(
+        store.write_users(changed)
+    )
+    sqlite_due, results[("sqlite", "due query")] = await atimed(
+        store.due_reminders(due_before)
+    )
+    _, results[("sqlite", "list user")] = await atimed(store.load_users([listed_user]))
+    await store.close()
+    assert len(due) == len(sqlite_due)
+
+    print(f"\n{size} reminders ({len(due)} due)")
+    for operation in (
+        "save all",
+        "load all",
+        f"write {CHANGED_USERS} users",
+        "due query",
+        "list user",
+    ):
+        json_time = results[("json", operation)]
+        sqlite_time = results[("sqlite", operation)]
+        print(
+            f"  {operation:>16}: json {json_time * 1000:10.2f}ms, "
+            f"sqlite {sqlite_time * 1000:10.2f}ms ({json_time / sqlite_time:8.1f}x)"
+        )
+
+
+async def main():
+    sizes = [int(size) for size in sys.argv[1:]] or SIZES
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            await benchmark(size, Path(directory))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+"""Benchmark: RemindMe bulk reminder export and import.
+
+Exports 100k reminders with remindme.reminder_transfer (JSONL, and msgpack if installed) and
+streams them back into an empty ReminderIndex with the same validation and duplicate checks as
+`[p]remindmeset import`. Peak memory is compared against dumping all reminders as one JSON list.
+
+Run from the repository root, in an environment with Red-DiscordBot installed:
+
+    python -m benchmarks.remindme_transfer
+"""
+import io
+import json
+import random
+import time
+import tracemalloc
+
+from remindme.reminder_index import ReminderIndex
+from remindme.reminder_transfer import (
+    available_formats,
+    export_reminders,
+    read_reminders,
+)
+
+REMINDER_COUNT = 100_000
+USER_COUNT = 5_000
+
+
+def make_reminders(count):
+    rng = random.Random(12)
+    next_ids = {}
+    for _ in range(count):
+        user_id = rng.randrange(10 ** 17, 10 ** 17 + USER_COUNT)
+        next_ids[user_id] = next_ids.get(user_id, 0) + 1
+        repeat = rng.choice([None, None, 86400, 604800])
+        yield {
+            "USER_REMINDER_ID": next_ids[user_id],
+            "USER_ID": user_id,
+            "REMINDER": f"do thing number {rng.randrange(10 ** 6)}",
+            "REPEAT": repeat,
+            "FUTURE": 1_700_000_000 + rng.randrange(10 ** 7),
+            "FUTURE_TEXT": "1 day",
+            "JUMP_LINK": None,
+            "RRULE": None,
+            "TIMEZONE": None,
+            "CATCH_UP": "once",
+        }
+
+
+def import_into(index, records):
+    """The same steps as RemindMe.import_reminders, without Config or the scheduler."""
+    imported = duplicates = invalid = 0
+    for reminder in records:
+        if not reminder:
+            invalid += 1
+            continue
+        if index.exists(reminder):
+            duplicates += 1
+            continue
+        if not reminder["USER_REMINDER_ID"] or index.get(
+            reminder["USER_ID"], reminder["USER_REMINDER_ID"]
+        ):
+            reminder["USER_REMINDER_ID"] = index.next_reminder_id(reminder["USER_ID"])
+        index.add(reminder)
+        imported += 1
+    return imported, duplicates, invalid
+
+
+class ByteCounter:
+    """A write-only file that throws away everything but the size."""
+
+    def __init__(self):
+        self.written = 0
+
+    def write(self, data):
+        self.written += len(data)
+
+
+def measure(function):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    source = ReminderIndex()
+    source.load(make_reminders(REMINDER_COUNT))
+    print(f"{len(source)} reminders for {len(source.user_ids())} users")
+
+    def dump_list():
+        return len(json.dumps(list(source)).encode("utf-8"))
+
+    size, elapsed, peak = measure(dump_list)
+    print(
+        f"{'json list':>8} export: {elapsed:6.2f}s, {size / 1e6:6.1f}MB, "
+        f"peak {peak / 1e6:6.1f}MB"
+    )
+
+    for file_format in available_formats():
+        # The export is measured writing to a file that only counts bytes, so that
+        # the peak memory is the exporter's own and not that of an in-memory file
+        counter = ByteCounter()
+        _, elapsed, peak = measure(
+            lambda: export_reminders(source, counter, file_format)
+        )
+        print(
+            f"{file_format:>8} export: {elapsed:6.2f}s, {counter.written / 1e6:6.1f}MB, "
+            f"peak {peak / 1e6:6.1f}MB"
+        )
+
+        fp = io.BytesIO()
+        export_reminders(source, fp, file_format)
+        fp.seek(0)
+        counts, elapsed, _ = measure(
+            lambda: import_into(ReminderIndex(), read_reminders(fp, file_format))
+        )
+        print(
+            f"{file_format:>8} import: {elapsed:6.2f}s "
+            f"(imported {counts[0]}, duplicates {counts[1]}, invalid {counts[2]})"
+        )
+
+        fp.seek(0)
+        counts, elapsed, _ = measure(
+            lambda: import_into(source, read_reminders(fp, file_format))
+        )
+        print(
+            f"{file_format:>8} reimport: {elapsed:6.2f}s "
+            f"(imported {counts[0]}, duplicates {counts[1]}, invalid {counts[2]})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,15 @@
 from abc import ABC, abstractmethod
+from typing import Optional
+
 from redbot.core import commands, Config
 from redbot.core.bot import Red
 
+from .me_too_registry import MeTooRegistry
+from .partition import PartitionLeases
+from .reminder_index import ReminderIndex
+from .reminder_store import ReminderStore
+from .stats import DeliveryStats
+
 
 class CompositeMetaClass(type(commands.Cog), type(ABC)):
     """This allows the metaclass used for proper type detection to coexist with discord.py's metaclass."""
@@ -15,14 +23,51 @@ class MixinMeta(ABC):
 
     bot: Red
     config: Config
-    me_too_reminders: dict
+    me_too_reminders: MeTooRegistry
+    partition_leases: Optional[PartitionLeases]
+    reminder_index: ReminderIndex
+    reminder_store: ReminderStore
+    reminder_heap: list
+    stats: DeliveryStats
+    pending_total_sent: int
     reminder_emoji: str
 
     @abstractmethod
     async def get_user_reminders(self, user_id: int):
         raise NotImplementedError()
 
-    @staticmethod
     @abstractmethod
-    def get_next_user_reminder_id(reminder_list):
+    async def _save_reminder(self, reminder):
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _mark_dirty(self, user_id: int):
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def _switch_reminder_store(self, storage: str):
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def _configure_partitions(self):
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _storage_is_shared(self, storage: str) -> bool:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _add_me_too_reminder(self, message_id: int, reminder, timeout: int):
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def import_reminders(self, reminders):
+        raise NotImplementedError()
+
+    @abstractmethod
+    def get_next_user_reminder_id(self, user_id: int):
+        raise NotImplementedError()
+
+    @abstractmethod
+    def _schedule_reminder(self, reminder):
         raise NotImplementedError()
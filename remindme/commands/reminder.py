@@ -1,50 +1,34 @@
 import asyncio
-import re
 import time as current_time
 from abc import ABC
 from datetime import timedelta
 
 import discord
-from discord.ext.commands import BadArgument
 from redbot.core import commands
 from redbot.core.commands import parse_timedelta
 from redbot.core.utils.chat_formatting import humanize_timedelta
-from redbot.core.utils.predicates import MessagePredicate
+from redbot.core.utils.menus import start_adding_reactions
+from redbot.core.utils.predicates import MessagePredicate, ReactionPredicate
 
 from ..abc import CompositeMetaClass, MixinMeta
-from ..pcx_lib import delete, embed_splitter
+from ..pcx_lib import delete
+from ..recurrence import (
+    CATCH_UP_POLICIES,
+    DEFAULT_TIMEZONE,
+    complete_rule,
+    describe_repeat,
+    describe_time,
+    get_timezone,
+    resolve_reminder_time,
+)
+from ..reminder_index import is_repeating
+from ..reminder_parse import process_reminder_text
 
 
 class ReminderCommands(MixinMeta, ABC, metaclass=CompositeMetaClass):
-    def __init__(self):
-        optional_in_every = r"(in\s+|every\s+)?"
-        amount_and_time = r"\d+\s*(weeks?|w|days?|d|hours?|hrs|hr?|minutes?|mins?|m(?!o)|seconds?|secs?|s)"
-        optional_comma_space_and = r"[\s,]*(and)?\s*"
-
-        self.timedelta_begin = re.compile(
-            r"^"
-            + optional_in_every
-            + r"("
-            + amount_and_time
-            + r"("
-            + optional_comma_space_and
-            + amount_and_time
-            + r")*"
-            + r")"
-            + r"\b"
-        )
-        self.timedelta_end = re.compile(
-            r"\b"
-            + optional_in_every
-            + r"("
-            + amount_and_time
-            + r"("
-            + optional_comma_space_and
-            + amount_and_time
-            + r")*"
-            + r")"
-            + r"$"
-        )
+    LIST_PAGE_SIZE = 5
+    LIST_TEXT_LENGTH = 800
+    LIST_TIMEOUT = 60
 
     @commands.group()
     async def reminder(self, ctx: commands.Context):
@@ -60,31 +44,57 @@ class ReminderCommands(MixinMeta, ABC, metaclass=CompositeMetaClass):
         `id` for ordering by ID
         """
         author = ctx.message.author
-        to_send = await self.get_user_reminders(author.id)
-        if sort == "time":
-            to_send.sort(key=lambda reminder_info: reminder_info["FUTURE"])
-        elif sort == "added":
-            pass
-        elif sort == "id":
-            to_send.sort(key=lambda reminder_info: reminder_info["USER_REMINDER_ID"])
-        else:
+        if sort not in ["time", "added", "id"]:
             await self._send_message(
                 ctx,
                 "That is not a valid sorting option. Choose from `time` (default), `added`, or `id`.",
             )
             return
-
+        to_send = self.reminder_index.get_sorted_user_reminders(author.id, sort)
         if not to_send:
             await self._send_message(ctx, "You don't have any upcoming reminders.")
             return
 
+        embed_color = await ctx.embed_color()
+        page_count = (len(to_send) - 1) // self.LIST_PAGE_SIZE + 1
+        try:
+            message = await author.send(
+                embed=self._render_reminder_list_page(
+                    author, to_send, 0, page_count, embed_color
+                )
+            )
+            if ctx.guild:
+                await ctx.tick()
+        except discord.Forbidden:
+            await self._send_message(ctx, "I can't DM you...")
+            return
+        if page_count > 1:
+            await self._reminder_list_pager(
+                ctx, message, author, to_send, page_count, embed_color
+            )
+
+    def _render_reminder_list_page(
+        self,
+        author: discord.User,
+        reminders,
+        page: int,
+        page_count: int,
+        embed_color: discord.Color,
+    ) -> discord.Embed:
+        """Render one page of a users reminder list. Only the reminders on that page are looked at."""
         embed = discord.Embed(
             title=f"Reminders for {author.display_name}",
-            color=await ctx.embed_color(),
+            color=embed_color,
         )
         embed.set_thumbnail(url=author.avatar_url)
+        if page_count > 1:
+            embed.set_footer(
+                text=f"Page {page + 1}/{page_count} ({len(reminders)} reminders)"
+            )
         current_time_seconds = int(current_time.time())
-        for reminder in to_send:
+        for reminder in reminders[
+            page * self.LIST_PAGE_SIZE : (page + 1) * self.LIST_PAGE_SIZE
+        ]:
             delta = reminder["FUTURE"] - current_time_seconds
             reminder_title = "ID# {} — {}".format(
                 reminder["USER_REMINDER_ID"],
@@ -92,12 +102,14 @@ class ReminderCommands(MixinMeta, ABC, metaclass=CompositeMetaClass):
                 if delta > 0
                 else "Now!",
             )
-            if "REPEAT" in reminder and reminder["REPEAT"]:
+            human_repeat = describe_repeat(reminder)
+            if human_repeat:
                 reminder_title = (
-                    f"{reminder_title.rstrip('!')}, "
-                    f"repeating every {humanize_timedelta(seconds=reminder['REPEAT'])}"
+                    f"{reminder_title.rstrip('!')}, repeating every {human_repeat}"
                 )
             reminder_text = reminder["REMINDER"]
+            if len(reminder_text) > self.LIST_TEXT_LENGTH:
+                reminder_text = reminder_text[: self.LIST_TEXT_LENGTH - 1] + "…"
             if "JUMP_LINK" in reminder:
                 reminder_text += f"\n([original message]({reminder['JUMP_LINK']}))"
             reminder_text = reminder_text or "(no reminder text or jump link)"
@@ -106,12 +118,48 @@ class ReminderCommands(MixinMeta, ABC, metaclass=CompositeMetaClass):
                 value=reminder_text,
                 inline=False,
             )
-        try:
-            await embed_splitter(embed, author)
-            if ctx.guild:
-                await ctx.tick()
-        except discord.Forbidden:
-            await self._send_message(ctx, "I can't DM you...")
+        return embed
+
+    async def _reminder_list_pager(
+        self,
+        ctx: commands.Context,
+        message: discord.Message,
+        author: discord.User,
+        reminders,
+        page_count: int,
+        embed_color: discord.Color,
+    ):
+        """Let the user flip through the pages of their reminder list with reactions.
+
+        The list is in DMs, where reactions can't be removed, so both adding and removing a reaction turn the page.
+        """
+        controls = ["\N{LEFTWARDS BLACK ARROW}", "\N{BLACK RIGHTWARDS ARROW}"]
+        start_adding_reactions(message, controls)
+        page = 0
+        while True:
+            predicate = ReactionPredicate.with_emojis(controls, message, author)
+            waiters = [
+                asyncio.ensure_future(
+                    ctx.bot.wait_for(event, check=predicate, timeout=self.LIST_TIMEOUT)
+                )
+                for event in ("reaction_add", "reaction_remove")
+            ]
+            done, pending = await asyncio.wait(
+                waiters, return_when=asyncio.FIRST_COMPLETED
+            )
+            for waiter in pending:
+                waiter.cancel()
+            if any(waiter.exception() for waiter in done):
+                return  # Timed out
+            page = (page + (1 if predicate.result else -1)) % page_count
+            try:
+                await message.edit(
+                    embed=self._render_reminder_list_page(
+                        author, reminders, page, page_count, embed_color
+                    )
+                )
+            except discord.HTTPException:
+                return
 
     @reminder.command(aliases=["add"])
     async def create(self, ctx: commands.Context, *, time_and_optional_text: str = ""):
@@ -129,83 +177,122 @@ class ReminderCommands(MixinMeta, ABC, metaclass=CompositeMetaClass):
     @modify.command()
     async def time(self, ctx: commands.Context, reminder_id: int, *, time: str):
         """Modify the time of an existing reminder."""
-        users_reminders = await self.get_user_reminders(ctx.message.author.id)
-        old_reminder = self._get_reminder(users_reminders, reminder_id)
+        old_reminder = self._get_reminder(ctx.message.author.id, reminder_id)
         if not old_reminder:
             await self._send_non_existent_msg(ctx, reminder_id)
             return
+        current_time_seconds = int(current_time.time())
         try:
             time_delta = parse_timedelta(time, minimum=timedelta(minutes=1))
-            if not time_delta:
-                await ctx.send_help()
-                return
+            if time_delta:
+                future = int(current_time_seconds + time_delta.total_seconds())
+            else:
+                # Maybe it's an absolute time, like "at 5pm" or "tomorrow"
+                reminder_time, remaining_text = process_reminder_text(time.strip())
+                if (
+                    remaining_text
+                    or not reminder_time.is_absolute
+                    or reminder_time.rule
+                    or reminder_time.repeat
+                ):
+                    await ctx.send_help()
+                    return
+                future, _ = resolve_reminder_time(
+                    reminder_time,
+                    current_time_seconds,
+                    await self.config.user(ctx.message.author).timezone(),
+                )
         except commands.BadArgument as ba:
             await self._send_message(ctx, str(ba))
             return
-        future = int(current_time.time() + time_delta.total_seconds())
-        future_text = humanize_timedelta(timedelta=time_delta)
+        future_text = humanize_timedelta(seconds=future - current_time_seconds)
 
         new_reminder = old_reminder.copy()
         new_reminder.update(FUTURE=future, FUTURE_TEXT=future_text)
-        async with self.config.reminders() as current_reminders:
-            current_reminders.remove(old_reminder)
-            current_reminders.append(new_reminder)
+        await self._save_reminder(new_reminder)
+        self._schedule_reminder(new_reminder)
         message = (
             f"Reminder with ID# **{reminder_id}** will now remind you in {future_text}"
         )
-        if "REPEAT" in new_reminder and new_reminder["REPEAT"]:
-            message += f", repeating every {humanize_timedelta(seconds=new_reminder['REPEAT'])} thereafter."
+        human_repeat = describe_repeat(new_reminder)
+        if human_repeat:
+            message += f", repeating every {human_repeat} thereafter."
         else:
             message += "."
         await self._send_message(ctx, message)
 
     @modify.command()
     async def repeat(self, ctx: commands.Context, reminder_id: int, *, time: str):
-        """Modify the repeating time of an existing reminder. Pass "0" to <time> in order to disable repeating."""
-        users_reminders = await self.get_user_reminders(ctx.message.author.id)
-        old_reminder = self._get_reminder(users_reminders, reminder_id)
+        """Modify the repeating time of an existing reminder. Pass "0" to <time> in order to disable repeating.
+
+        <time> can either be a number of days and weeks (like `2 weeks`),
+        or a calendar repeat (like `weekday at 9am`, `monday and friday`, or `1st of the month`).
+        """
+        old_reminder = self._get_reminder(ctx.message.author.id, reminder_id)
         if not old_reminder:
             await self._send_non_existent_msg(ctx, reminder_id)
             return
         if time.lower() in ["0", "stop", "none", "false", "no", "cancel", "n"]:
             new_reminder = old_reminder.copy()
-            new_reminder.update(REPEAT=None)
-            async with self.config.reminders() as current_reminders:
-                current_reminders.remove(old_reminder)
-                current_reminders.append(new_reminder)
+            new_reminder.update(REPEAT=None, RRULE=None, TIMEZONE=None)
+            await self._save_reminder(new_reminder)
             await self._send_message(
                 ctx,
                 f"Reminder with ID# **{reminder_id}** will not repeat anymore. The final reminder will be sent "
                 f"in {humanize_timedelta(seconds=int(new_reminder['FUTURE'] - current_time.time()))}.",
             )
         else:
+            new_reminder = old_reminder.copy()
             try:
                 time_delta = parse_timedelta(
                     time, minimum=timedelta(days=1), allowed_units=["weeks", "days"]
                 )
-                if not time_delta:
-                    await ctx.send_help()
-                    return
+                if time_delta:
+                    new_reminder.update(
+                        REPEAT=int(time_delta.total_seconds()),
+                        RRULE=None,
+                        TIMEZONE=None,
+                    )
+                else:
+                    # Maybe it's a calendar repeat, like "weekday at 9am"
+                    time = time.strip()
+                    if not time.lower().startswith("every"):
+                        time = f"every {time}"
+                    reminder_time, remaining_text = process_reminder_text(time)
+                    if (
+                        remaining_text
+                        or not reminder_time.rule
+                        or reminder_time.relative
+                        or reminder_time.on is not None
+                    ):
+                        await ctx.send_help()
+                        return
+                    timezone = await self.config.user(ctx.message.author).timezone()
+                    new_reminder.update(
+                        REPEAT=None,
+                        RRULE=complete_rule(
+                            reminder_time.rule,
+                            reminder_time.at,
+                            new_reminder["FUTURE"],
+                            timezone,
+                        ),
+                        TIMEZONE=timezone,
+                    )
             except commands.BadArgument as ba:
                 await self._send_message(ctx, str(ba))
                 return
-            new_reminder = old_reminder.copy()
-            new_reminder.update(REPEAT=int(time_delta.total_seconds()))
-            async with self.config.reminders() as current_reminders:
-                current_reminders.remove(old_reminder)
-                current_reminders.append(new_reminder)
+            await self._save_reminder(new_reminder)
             await self._send_message(
                 ctx,
                 f"Reminder with ID# **{reminder_id}** will now remind you "
-                f"every {humanize_timedelta(timedelta=time_delta)}, with the first reminder being sent "
+                f"every {describe_repeat(new_reminder)}, with the first reminder being sent "
                 f"in {humanize_timedelta(seconds=int(new_reminder['FUTURE'] - current_time.time()))}.",
             )
 
     @modify.command()
     async def text(self, ctx: commands.Context, reminder_id: int, *, text: str):
         """Modify the text of an existing reminder."""
-        users_reminders = await self.get_user_reminders(ctx.message.author.id)
-        old_reminder = self._get_reminder(users_reminders, reminder_id)
+        old_reminder = self._get_reminder(ctx.message.author.id, reminder_id)
         if not old_reminder:
             await self._send_non_existent_msg(ctx, reminder_id)
             return
@@ -216,14 +303,69 @@ class ReminderCommands(MixinMeta, ABC, metaclass=CompositeMetaClass):
 
         new_reminder = old_reminder.copy()
         new_reminder.update(REMINDER=text)
-        async with self.config.reminders() as current_reminders:
-            current_reminders.remove(old_reminder)
-            current_reminders.append(new_reminder)
+        await self._save_reminder(new_reminder)
         await self._send_message(
             ctx,
             f"Reminder with ID# **{reminder_id}** has been edited successfully.",
         )
 
+    @modify.command(name="catchup", aliases=["catch-up"])
+    async def catch_up(
+        self, ctx: commands.Context, reminder_id: int, policy: str.lower
+    ):
+        """Modify what a repeating reminder does when it was missed (for example, if I was offline).
+
+        <policy> can either be:
+        `once` (default) to send it once, then continue as normal
+        `all` to send it for every time it was missed in the last week, then continue as normal
+        `skip` to not send it, and wait until the next time it repeats
+        """
+        old_reminder = self._get_reminder(ctx.message.author.id, reminder_id)
+        if not old_reminder:
+            await self._send_non_existent_msg(ctx, reminder_id)
+            return
+        if policy not in CATCH_UP_POLICIES:
+            await self._send_message(
+                ctx,
+                "That is not a valid catch up policy. Choose from `once` (default), `all`, or `skip`.",
+            )
+            return
+
+        new_reminder = old_reminder.copy()
+        new_reminder.update(CATCH_UP=policy)
+        await self._save_reminder(new_reminder)
+        message = (
+            f"If reminder with ID# **{reminder_id}** is missed, "
+            f"I will now {CATCH_UP_POLICIES[policy]}."
+        )
+        if not is_repeating(new_reminder):
+            message += " This only matters once it is a repeating reminder."
+        await self._send_message(ctx, message)
+
+    @reminder.command()
+    async def timezone(self, ctx: commands.Context, *, timezone: str = ""):
+        """Set your time zone, for reminders at a specific time.
+
+        This is used for reminders like `at 5pm`, `on friday`, or `every weekday at 9am`.
+        Use a name from the tz database, like `America/New_York` or `Europe/London`.
+        Defaults to UTC. Reminders that you have already created keep the time zone they were made with.
+        """
+        if not timezone:
+            current_timezone = await self.config.user(ctx.message.author).timezone()
+            await self._send_message(
+                ctx,
+                f"Your time zone is set to **{current_timezone or DEFAULT_TIMEZONE}**.",
+            )
+            return
+        if not get_timezone(timezone):
+            await self._send_message(
+                ctx,
+                "That is not a valid time zone. Use a name from the tz database, like `America/New_York`.",
+            )
+            return
+        await self.config.user(ctx.message.author).timezone.set(timezone)
+        await self._send_message(ctx, f"Your time zone is now set to **{timezone}**.")
+
     @reminder.command(aliases=["delete", "del"])
     async def remove(self, ctx: commands.Context, index: str):
         """Delete a reminder.
@@ -249,8 +391,15 @@ class ReminderCommands(MixinMeta, ABC, metaclass=CompositeMetaClass):
         `12h30m`, `6 hours 15 minutes`, `2 weeks, 4 days, and 10 seconds`
         Accepts seconds, minutes, hours, days, and weeks.
 
+        `<time>` can also be a specific time and/or day:
+        `at 17:00`, `at 5pm`, `tomorrow`, `on friday`, `on march 3rd`, `on 2021-03-03`
+        These use your time zone, which can be set with `[p]reminder timezone`.
+
         You can also add `every <repeat_time>` to the command for repeating reminders.
         `<repeat_time>` accepts days and weeks only, but otherwise is the same as `<time>`.
+        It can also repeat on a calendar, optionally with a time of day:
+        `every day`, `every weekday`, `every weekend`, `every monday and thursday`,
+        `every 1st of the month`, `every month on the last day`
 
         Examples:
         `[p]remindme in 8min45sec to do that thing`
@@ -259,6 +408,9 @@ class ReminderCommands(MixinMeta, ABC, metaclass=CompositeMetaClass):
         `[p]remindme 8h`
         `[p]remindme every 1 week to take out the trash`
         `[p]remindme in 1 hour to drink some water every 1 day`
+        `[p]remindme at 5pm to call mom`
+        `[p]remindme on friday at 9am to pay rent`
+        `[p]remindme every weekday at 9:30am to join the standup`
         """
         await self._create_reminder(ctx, time_and_optional_text)
 
@@ -283,25 +435,29 @@ class ReminderCommands(MixinMeta, ABC, metaclass=CompositeMetaClass):
             )
             return
 
+        current_time_seconds = int(current_time.time())
         try:
-            (
-                reminder_time,
-                reminder_time_repeat,
-                reminder_text,
-            ) = self._process_reminder_text(time_and_optional_text.strip())
+            reminder_time, reminder_text = process_reminder_text(
+                time_and_optional_text.strip()
+            )
+            if not reminder_time:
+                await ctx.send_help()
+                return
+            timezone = None
+            if reminder_time.is_absolute:
+                timezone = await self.config.user(author).timezone()
+            future, rule = resolve_reminder_time(
+                reminder_time, current_time_seconds, timezone
+            )
         except commands.BadArgument as ba:
             await self._send_message(ctx, str(ba))
             return
-        if not reminder_time:
-            await ctx.send_help()
-            return
 
-        next_reminder_id = self.get_next_user_reminder_id(users_reminders)
+        next_reminder_id = self.get_next_user_reminder_id(author.id)
         repeat = (
-            int(reminder_time_repeat.total_seconds()) if reminder_time_repeat else None
+            int(reminder_time.repeat.total_seconds()) if reminder_time.repeat else None
         )
-        future = int(current_time.time() + reminder_time.total_seconds())
-        future_text = humanize_timedelta(timedelta=reminder_time)
+        future_text = humanize_timedelta(seconds=future - current_time_seconds)
 
         reminder = {
             "USER_REMINDER_ID": next_reminder_id,
@@ -311,18 +467,24 @@ class ReminderCommands(MixinMeta, ABC, metaclass=CompositeMetaClass):
             "FUTURE": future,
             "FUTURE_TEXT": future_text,
             "JUMP_LINK": ctx.message.jump_url,
+            "RRULE": rule,
+            "TIMEZONE": timezone if rule else None,
         }
-        async with self.config.reminders() as current_reminders:
-            current_reminders.append(reminder)
+        await self._save_reminder(reminder)
+        self._schedule_reminder(reminder)
         message = f"I will remind you of {'that' if reminder_text else 'this'} "
-        if repeat:
-            message += f"every {humanize_timedelta(timedelta=reminder_time_repeat)}"
+        human_repeat = describe_repeat(reminder)
+        if human_repeat:
+            message += f"every {human_repeat}"
         else:
             message += f"in {future_text}"
-        if repeat and reminder_time_repeat != reminder_time:
-            message += f", with the first reminder in {future_text}."
-        else:
-            message += "."
+        if human_repeat and future != current_time_seconds + (repeat or 0):
+            message += f", with the first reminder in {future_text}"
+        if reminder_time.is_absolute and not rule:
+            message += f", on {describe_time(future, timezone)}"
+        message += "."
+        if reminder_time.is_absolute and not timezone:
+            message += f"\nYou can set your own time zone with `{ctx.clean_prefix}reminder timezone`."
         await self._send_message(ctx, message)
 
         if (
@@ -331,105 +493,14 @@ class ReminderCommands(MixinMeta, ABC, metaclass=CompositeMetaClass):
             and ctx.channel.permissions_for(ctx.me).add_reactions
         ):
             query: discord.Message = await ctx.send(
-                f"If anyone else would like {'these reminders' if repeat else 'to be reminded'} as well, "
+                f"If anyone else would like {'these reminders' if human_repeat else 'to be reminded'} as well, "
                 "click the bell below!"
             )
-            self.me_too_reminders[query.id] = reminder
+            timeout = await self.config.guild(ctx.guild).me_too_timeout()
+            self._add_me_too_reminder(query.id, reminder, timeout)
+            # discord.py deletes the prompt in the background, so this doesn't depend on this command finishing
+            await delete(query, delay=timeout)
             await query.add_reaction(self.reminder_emoji)
-            await asyncio.sleep(30)
-            await delete(query)
-            del self.me_too_reminders[query.id]
-
-    def _process_reminder_text(self, reminder_text):
-        """Completely process the given reminder text into timedeltas, removing them from the reminder text.
-
-        Takes all "every {time_repeat}", "in {time}", and "{time}" from the beginning of the reminder_text.
-        At most one instance of "every {time_repeat}" and one instance of "in {time}" or "{time}" will be consumed.
-        If the parser runs into a timedelta (in or every) that has already been parsed, parsing stops.
-        Same process is then repeated from the end of the string.
-
-        If an "every" time is provided but no "in" time, the "every" time will be copied over to the "in" time.
-        """
-
-        reminder_time = None
-        reminder_time_repeat = None
-        # find the time delta(s) at the beginning of the text
-        (
-            reminder_time,
-            reminder_time_repeat,
-            reminder_text,
-        ) = self._process_reminder_text_from_ends(
-            reminder_time, reminder_time_repeat, reminder_text, self.timedelta_begin
-        )
-        # find the time delta(s) at the end of the text
-        (
-            reminder_time,
-            reminder_time_repeat,
-            reminder_text,
-        ) = self._process_reminder_text_from_ends(
-            reminder_time, reminder_time_repeat, reminder_text, self.timedelta_end
-        )
-        # cleanup
-        reminder_time = reminder_time or reminder_time_repeat
-        if len(reminder_text) > 1 and reminder_text[0:2] == "to":
-            reminder_text = reminder_text[2:].strip()
-        return reminder_time, reminder_time_repeat, reminder_text
-
-    def _process_reminder_text_from_ends(
-        self, reminder_time, reminder_time_repeat, reminder_text, search_regex
-    ):
-        """Repeatedly regex search and modify the reminder_text looking for all instances of timedeltas."""
-        while regex_result := search_regex.search(reminder_text):
-            repeating = regex_result[1] and regex_result[1].strip() == "every"
-            if (repeating and reminder_time_repeat) or (
-                not repeating and reminder_time
-            ):
-                break
-            parsed_timedelta = self._parse_timedelta(regex_result[2], repeating)
-            if not parsed_timedelta:
-                break
-            reminder_text = (
-                reminder_text[0 : regex_result.span()[0]]
-                + reminder_text[regex_result.span()[1] + 1 :]
-            ).strip()
-            if repeating:
-                reminder_time_repeat = parsed_timedelta
-            else:
-                reminder_time = parsed_timedelta
-        return reminder_time, reminder_time_repeat, reminder_text
-
-    @staticmethod
-    def _parse_timedelta(timedelta_string, repeating):
-        """Parse a timedelta, taking into account if it is a repeating timedelta (day minimum) or not."""
-        result = None
-        testing_text = ""
-        for chunk in timedelta_string.split():
-            if chunk == "and":
-                continue
-            if chunk.isdigit():
-                testing_text += chunk
-                continue
-            testing_text += chunk.rstrip(",")
-            if repeating:
-                try:
-                    parsed = parse_timedelta(
-                        testing_text,
-                        minimum=timedelta(days=1),
-                        allowed_units=["weeks", "days"],
-                    )
-                except commands.BadArgument as ba:
-                    orig_message = str(ba)[0].lower() + str(ba)[1:]
-                    raise BadArgument(
-                        f"For the repeating portion of this reminder, {orig_message}. "
-                        "You must only use `days` or `weeks` when dealing with repeating reminders."
-                    )
-            else:
-                parsed = parse_timedelta(testing_text, minimum=timedelta(minutes=1))
-            if parsed != result:
-                result = parsed
-            else:
-                return None
-        return result
 
     async def _delete_reminder(self, ctx: commands.Context, index: str):
         """Logic to delete reminders."""
@@ -479,7 +550,7 @@ class ReminderCommands(MixinMeta, ABC, metaclass=CompositeMetaClass):
             await ctx.send_help()
             return
 
-        reminder_to_delete = self._get_reminder(users_reminders, int_index)
+        reminder_to_delete = self._get_reminder(author.id, int_index)
         if reminder_to_delete:
             await self._do_reminder_delete(reminder_to_delete)
             await self._send_message(
@@ -494,9 +565,9 @@ class ReminderCommands(MixinMeta, ABC, metaclass=CompositeMetaClass):
             return
         if not isinstance(reminders, list):
             reminders = [reminders]
-        async with self.config.reminders() as current_reminders:
-            for reminder in reminders:
-                current_reminders.remove(reminder)
+        for reminder in reminders:
+            self.reminder_index.remove(reminder)
+            self._mark_dirty(reminder["USER_ID"])
 
     async def _send_non_existent_msg(self, ctx: commands.Context, reminder_id: int):
         """Send a message telling the user the reminder ID does not exist."""
@@ -506,13 +577,9 @@ class ReminderCommands(MixinMeta, ABC, metaclass=CompositeMetaClass):
             "Check the reminder list and verify you typed the correct ID#.",
         )
 
-    @staticmethod
-    def _get_reminder(reminder_list, reminder_id: int):
-        """Get the reminder from reminder_list with the specified reminder_id."""
-        for reminder in reminder_list:
-            if reminder["USER_REMINDER_ID"] == reminder_id:
-                return reminder
-        return None
+    def _get_reminder(self, user_id: int, reminder_id: int):
+        """Get the reminder for a user with the specified reminder_id."""
+        return self.reminder_index.get(user_id, reminder_id)
 
     @staticmethod
     async def _send_message(ctx: commands.Context, message: str):
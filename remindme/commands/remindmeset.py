@@ -1,9 +1,28 @@
+import asyncio
+import io
+import json
+import time
 from abc import ABC
+from datetime import timedelta
+from itertools import islice
+from pathlib import Path
 
+import discord
 from redbot.core import checks, commands
+from redbot.core.commands import TimedeltaConverter
+from redbot.core.data_manager import cog_data_path
+from redbot.core.utils.chat_formatting import humanize_timedelta
 
 from ..abc import CompositeMetaClass, MixinMeta
 from ..pcx_lib import SettingDisplay, checkmark
+from ..reminder_transfer import (
+    FILE_FORMATS,
+    available_formats,
+    export_reminders,
+    read_reminders,
+)
+
+IMPORT_BATCH_SIZE = 1000
 
 
 class RemindMeSetCommands(MixinMeta, ABC, metaclass=CompositeMetaClass):
@@ -24,31 +43,49 @@ class RemindMeSetCommands(MixinMeta, ABC, metaclass=CompositeMetaClass):
                 if await self.config.guild(ctx.guild).me_too()
                 else "Disabled",
             )
+            server_section.add(
+                "Me too timeout",
+                humanize_timedelta(
+                    seconds=await self.config.guild(ctx.guild).me_too_timeout()
+                ),
+            )
 
         if await ctx.bot.is_owner(ctx.author):
             global_section = SettingDisplay("Global Settings")
             global_section.add(
                 "Maximum reminders per user", await self.config.max_user_reminders()
             )
+            global_section.add(
+                "Reminder storage",
+                "SQLite" if await self.config.storage() == "sqlite" else "Config",
+            )
+            partitions = await self.config.partitions()
+            if partitions > 1:
+                owned = (
+                    sorted(self.partition_leases.owned) if self.partition_leases else []
+                )
+                global_section.add(
+                    "Delivery partitions",
+                    f"{partitions} (this process has "
+                    f"{', '.join(str(partition) for partition in owned) or 'none'})",
+                )
 
-            reminders = [
-                reminder["REPEAT"] if "REPEAT" in reminder else None
-                for reminder in await self.config.reminders()
-            ]
-            pending_reminders_message = f"{len(reminders)}"
-            if reminders:
-                repeating_reminders = [repeat for repeat in reminders if repeat]
-                if repeating_reminders:
-                    pending_reminders_message += (
-                        f" ({len(repeating_reminders)} "
-                        f"{'is' if len(repeating_reminders) == 1 else 'are'} repeating)"
-                    )
+            pending_reminders_message = f"{len(self.reminder_index)}"
+            repeating_reminders = self.reminder_index.repeating_count
+            if repeating_reminders:
+                pending_reminders_message += (
+                    f" ({repeating_reminders} "
+                    f"{'is' if repeating_reminders == 1 else 'are'} repeating)"
+                )
             stats_section = SettingDisplay("Stats")
             stats_section.add(
                 "Pending reminders",
                 pending_reminders_message,
             )
-            stats_section.add("Total reminders sent", await self.config.total_sent())
+            stats_section.add(
+                "Total reminders sent",
+                await self.config.total_sent() + self.pending_total_sent,
+            )
 
             await ctx.send(server_section.display(global_section, stats_section))
 
@@ -70,6 +107,240 @@ class RemindMeSetCommands(MixinMeta, ABC, metaclass=CompositeMetaClass):
             )
         )
 
+    @remindmeset.command()
+    @commands.guild_only()
+    async def metootimeout(
+        self,
+        ctx: commands.Context,
+        *,
+        timeout: TimedeltaConverter(
+            minimum=timedelta(seconds=5),
+            maximum=timedelta(days=1),
+            allowed_units=["hours", "minutes", "seconds"],
+            default_unit="seconds",
+        ),
+    ):
+        """Set how long others have to click the bell on a "me too" prompt before it is removed.
+
+        Accepts seconds, minutes, and hours, like `30` (seconds), `5 minutes`, or `1 hour`.
+        """
+        await self.config.guild(ctx.guild).me_too_timeout.set(
+            int(timeout.total_seconds())
+        )
+        await ctx.send(
+            checkmark(
+                f'"Me too" prompts will now be removed after {humanize_timedelta(timedelta=timeout)}.'
+            )
+        )
+
+    @remindmeset.command()
+    @checks.is_owner()
+    async def stats(self, ctx: commands.Context, output: str.lower = ""):
+        """Global: Show reminder delivery statistics since the cog was loaded.
+
+        Pass `json` to get all of the statistics (including histogram buckets) as a JSON file.
+        """
+        stats = self.stats.to_dict(len(self.reminder_heap), len(self.reminder_index))
+        if output == "json":
+            await ctx.send(
+                file=discord.File(
+                    io.BytesIO(json.dumps(stats, indent=2).encode("utf-8")),
+                    filename="remindme_stats.json",
+                )
+            )
+            return
+
+        delivery_section = SettingDisplay("Delivery")
+        delivery_section.add("Sent", stats["sent"])
+        delivery_section.add("Skipped (catch up)", stats["skipped"])
+        delivery_section.add("Retried", stats["retries"])
+        delivery_section.add(
+            "Failures",
+            ", ".join(f"{name}: {count}" for name, count in stats["failures"].items())
+            or "None",
+        )
+        delivery_section.add("Deleted (DMs closed)", stats["forbidden_deletions"])
+        delivery_section.add(
+            "Deleted (user not found)", stats["unknown_user_deletions"]
+        )
+        queue_section = SettingDisplay("Queue")
+        queue_section.add("Pending reminders", stats["pending_reminders"])
+        queue_section.add("Scheduler entries", stats["scheduler_heap_size"])
+        sections = []
+        for header, key, unit in (
+            ("Lag (seconds)", "lag_seconds", ""),
+            ("Scan time per tick", "scan_time_ms", " ms"),
+            ("Due reminders per tick", "queue_depth", ""),
+        ):
+            summary = stats[key]
+            section = SettingDisplay(header)
+            section.add("Samples", summary["samples"])
+            if summary["samples"]:
+                for percentile in ("p50", "p90", "p99", "max"):
+                    section.add(percentile, f"{round(summary[percentile], 2)}{unit}")
+            sections.append(section)
+        await ctx.send(delivery_section.display(queue_section, *sections))
+
+    @remindmeset.command(name="export")
+    @checks.is_owner()
+    async def export_command(
+        self, ctx: commands.Context, file_format: str.lower = "jsonl"
+    ):
+        """Global: Export all reminders to a file.
+
+        <file_format> can be `jsonl` (default), or `msgpack` if the msgpack package is installed.
+        The file is saved in this cog's data folder, and sent to you in DMs if it is small enough.
+        """
+        if file_format not in available_formats():
+            await ctx.send(
+                f"That is not an available file format. Choose from "
+                f"{', '.join(f'`{name}`' for name in available_formats())}."
+            )
+            return
+        path = cog_data_path(self) / f"reminders{FILE_FORMATS[file_format]}"
+        # Copied first, so that reminders can keep changing while the file is written
+        reminders = [dict(reminder) for reminder in self.reminder_index]
+
+        def write_file():
+            with path.open("wb") as fp:
+                return export_reminders(reminders, fp, file_format)
+
+        async with ctx.typing():
+            count = await asyncio.get_running_loop().run_in_executor(None, write_file)
+        message = checkmark(f"Exported {count} reminders to `{path}`.")
+        if path.stat().st_size > 8 * 1024 * 1024:
+            await ctx.send(f"{message} It is too big to send over Discord.")
+            return
+        try:
+            await ctx.author.send(file=discord.File(str(path)))
+        except discord.HTTPException:
+            await ctx.send(f"{message} I couldn't DM it to you.")
+            return
+        await ctx.send(f"{message} I have also DMed it to you.")
+
+    @remindmeset.command(name="import")
+    @checks.is_owner()
+    async def import_command(self, ctx: commands.Context, file_name: str = ""):
+        """Global: Import reminders from an attached file, or from a file in this cog's data folder.
+
+        The file format is picked from the file extension (`.jsonl` or `.msgpack`).
+        Invalid reminders and reminders that already exist are skipped.
+        Imported reminders get a new ID if theirs is already taken.
+        """
+        if ctx.message.attachments:
+            attachment = ctx.message.attachments[0]
+            suffix = Path(attachment.filename).suffix.lower()
+        elif file_name:
+            path = cog_data_path(self) / Path(file_name).name
+            suffix = path.suffix.lower()
+        else:
+            await ctx.send_help()
+            return
+        file_format = None
+        for name, extension in FILE_FORMATS.items():
+            if suffix == extension and name in available_formats():
+                file_format = name
+        if not file_format:
+            await ctx.send(
+                f"I can only import "
+                f"{', '.join(f'`{FILE_FORMATS[name]}`' for name in available_formats())} files."
+            )
+            return
+        if ctx.message.attachments:
+            # Saved under its own name, so that it can't overwrite anything else in the data folder
+            path = cog_data_path(self) / f"import-{int(time.time())}{suffix}"
+            await attachment.save(str(path))
+        elif not path.is_file():
+            await ctx.send(
+                f"There is no `{path.name}` file in `{cog_data_path(self)}`."
+            )
+            return
+
+        loop = asyncio.get_running_loop()
+        imported = duplicates = invalid = 0
+        async with ctx.typing():
+            with path.open("rb") as fp:
+                records = read_reminders(fp, file_format)
+                while True:
+                    # The file is read a batch at a time off the event loop
+                    batch = await loop.run_in_executor(
+                        None, list, islice(records, IMPORT_BATCH_SIZE)
+                    )
+                    if not batch:
+                        break
+                    counts = await self.import_reminders(batch)
+                    imported += counts[0]
+                    duplicates += counts[1]
+                    invalid += counts[2]
+        await ctx.send(
+            checkmark(
+                f"Imported {imported} reminders "
+                f"(skipped {duplicates} that already existed, and {invalid} that were invalid)."
+            )
+        )
+
+    @remindmeset.command()
+    @checks.is_owner()
+    async def storage(self, ctx: commands.Context, storage: str.lower):
+        """Global: Choose where reminders are stored.
+
+        <storage> can be `config` (default, Red's own storage) or `sqlite` (a SQLite database in this cog's data folder, which only rewrites the reminders that changed, so it copes better with lots of reminders).
+        All reminders are copied over, and the old storage is left untouched as a backup.
+        """
+        if storage not in ("config", "sqlite"):
+            await ctx.send("Reminders can be stored in `config` or `sqlite`.")
+            return
+        if storage == await self.config.storage():
+            await ctx.send(f"Reminders are already stored in `{storage}`.")
+            return
+        if await self.config.partitions() > 1 and not self._storage_is_shared(storage):
+            await ctx.send(
+                "Reminder delivery is split between processes, so reminders can't be stored "
+                "in Red's JSON backend. Set `partitions` to `1` first."
+            )
+            return
+        async with ctx.typing():
+            await self._switch_reminder_store(storage)
+        await ctx.send(
+            checkmark(
+                f"Copied {len(self.reminder_index)} reminders, they are now stored in `{storage}`."
+            )
+        )
+
+    @remindmeset.command()
+    @checks.is_owner()
+    async def partitions(
+        self, ctx: commands.Context, partitions: int, lease_file: str = ""
+    ):
+        """Global: Split reminder delivery between multiple bot processes.
+
+        Users are split into <partitions> groups by their ID, and each group's reminders are only sent by the process holding its lease. Use at least as many partitions as processes, or `1` to turn this off.
+        Every process must use the same [lease_file], a SQLite database on a disk they all share. By default it is kept in this cog's data folder.
+        Reminders must be stored somewhere every process shares: the `sqlite` storage on a shared data folder, or Config on a shared backend like Postgres (not JSON).
+        Reload this cog on every process after changing this.
+        """
+        if not 1 <= partitions <= 1024:
+            await ctx.send("The number of partitions must be between 1 and 1024.")
+            return
+        if partitions > 1 and not self._storage_is_shared(await self.config.storage()):
+            await ctx.send(
+                "Reminders are stored in Red's JSON backend, which can't be shared between processes. "
+                "Switch to the `sqlite` storage first, or use a shared backend like Postgres."
+            )
+            return
+        await self.config.partitions.set(partitions)
+        await self.config.partition_lease_file.set(lease_file or None)
+        await self._configure_partitions()
+        if partitions == 1:
+            await ctx.send(checkmark("This process will now send all reminders."))
+            return
+        await ctx.send(
+            checkmark(
+                f"Reminder delivery is now split into {partitions} partitions. "
+                f"Reload this cog on every other bot process so that they use the same settings."
+            )
+        )
+
     @remindmeset.command()
     @checks.is_owner()
     async def max(self, ctx: commands.Context, maximum: int):
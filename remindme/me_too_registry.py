@@ -0,0 +1,65 @@
+"""Registry of "me too" prompts."""
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+class MeTooRegistry:
+    """Reminders that others can sign up for by reacting to a prompt message, each expiring after a while.
+
+    Entries are kept in the order they were added, which is (nearly) the order they expire in,
+    so expiring them only ever looks at the oldest entries. Prompts with a shorter lifetime than
+    an older prompt are still checked when looked up, and the registry never grows past max_size.
+    """
+
+    def __init__(self, max_size: int = 1000):
+        """Create an empty registry."""
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, Tuple[int, dict]]" = OrderedDict()
+
+    def add(self, message_id: int, reminder, expires: int):
+        """Add a prompt, evicting the oldest prompts if the registry is full."""
+        self._entries[message_id] = (expires, reminder)
+        self._entries.move_to_end(message_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get(self, message_id: int, now: int) -> Optional[dict]:
+        """Get the reminder for a prompt, or None if there is no such prompt or it has expired."""
+        self.expire(now)
+        entry = self._entries.get(message_id)
+        if not entry or entry[0] <= now:
+            return None
+        return entry[1]
+
+    def expire(self, now: int):
+        """Remove expired prompts from the front of the registry."""
+        while self._entries:
+            expires, _ = next(iter(self._entries.values()))
+            if expires > now:
+                break
+            self._entries.popitem(last=False)
+
+    def load(self, data: Dict[str, dict], now: int):
+        """Replace the contents of this registry with prompts saved by to_dict, skipping expired ones."""
+        self._entries = OrderedDict()
+        for message_id, entry in sorted(
+            data.items(), key=lambda item: item[1]["expires"]
+        ):
+            if entry["expires"] > now:
+                self.add(int(message_id), entry["reminder"], entry["expires"])
+
+    def to_dict(self, now: int) -> Dict[str, dict]:
+        """Get all prompts that haven't expired, in a form that can be saved to Config."""
+        return {
+            str(message_id): {"expires": expires, "reminder": reminder}
+            for message_id, (expires, reminder) in self._entries.items()
+            if expires > now
+        }
+
+    def __contains__(self, message_id: int) -> bool:
+        """Check if there might be a prompt for a message. Doesn't check expiry, so this is very cheap."""
+        return message_id in self._entries
+
+    def __len__(self) -> int:
+        """Get the number of prompts (including expired ones that haven't been removed yet)."""
+        return len(self._entries)
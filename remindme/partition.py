@@ -0,0 +1,188 @@
+"""Splitting reminder delivery between multiple bot processes."""
+import os
+import socket
+import sqlite3
+import uuid
+import zlib
+from contextlib import closing
+from typing import Iterable, Set, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    partition_id INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS processes (
+    owner TEXT PRIMARY KEY,
+    expires INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    owner TEXT NOT NULL,
+    time INTEGER NOT NULL
+);
+"""
+
+
+def partition_of(user_id: int, partitions: int) -> int:
+    """Get the partition a users reminders belong to.
+
+    Discord IDs are mostly timestamp, so they are hashed first to spread users evenly.
+    """
+    return zlib.crc32(user_id.to_bytes(8, "big")) % partitions
+
+
+class PartitionLeases:
+    """Leases on reminder partitions, shared by all bot processes through a SQLite database.
+
+    Users are split into partitions by their ID, and only the process holding the lease on a
+    partition sends the reminders of its users. Every sync marks this process as alive, renews its
+    leases, takes over free or expired ones up to a fair share (among live processes), and gives back
+    any above the fair share so that newly started processes get some too. Given back partitions can't be taken over until RELEASE_SECONDS
+    later, so that sends that were already in flight finish and get written to Config first.
+
+    Processes also note which users they wrote to Config, so that the others can reload them.
+    """
+
+    LEASE_SECONDS = 60
+    RELEASE_SECONDS = 30
+    CHANGE_LOG_SECONDS = 600
+
+    def __init__(self, path: str, partitions: int):
+        """Set up leases on a number of partitions, using the SQLite database at path (created if needed)."""
+        self.path = path
+        self.partitions = partitions
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.owned: Set[int] = set()
+        self.expires = 0
+        self.last_change_seq = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, in autocommit mode so that transactions are explicit."""
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.executescript(SCHEMA)
+        return connection
+
+    @property
+    def owned_until(self) -> int:
+        """Get when this process' leases stop counting.
+
+        That is a quarter of the way before they expire, in case renewing them is late.
+        """
+        return self.expires - self.LEASE_SECONDS // 4
+
+    def owns(self, user_id: int, now: int) -> bool:
+        """Check if this process should send a users reminders."""
+        if self.partitions <= 1:
+            return True
+        return (
+            self.owns_any(now) and partition_of(user_id, self.partitions) in self.owned
+        )
+
+    def owns_any(self, now: int) -> bool:
+        """Check if this process still holds any partitions."""
+        return bool(self.owned) and now < self.owned_until
+
+    def sync(
+        self, now: int, changed_user_ids: Iterable[int]
+    ) -> Tuple[Set[int], Set[int]]:
+        """Renew and rebalance leases, and exchange the users whose reminders were written to Config.
+
+        Returns the partitions this process now owns, and the users that other processes wrote since
+        the last sync. This blocks on the database, so run it in an executor.
+        """
+        with closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "DELETE FROM leases WHERE expires <= ? OR partition_id >= ?",
+                    (now, self.partitions),
+                )
+                connection.execute("DELETE FROM processes WHERE expires <= ?", (now,))
+                connection.execute(
+                    "INSERT OR REPLACE INTO processes VALUES (?, ?)",
+                    (self.owner, now + self.LEASE_SECONDS),
+                )
+                leases = connection.execute(
+                    "SELECT partition_id, owner FROM leases"
+                ).fetchall()
+                processes = connection.execute(
+                    "SELECT COUNT(*) FROM processes"
+                ).fetchone()[0]
+                fair_share = -(-self.partitions // processes)
+                owned = sorted(
+                    partition_id
+                    for partition_id, owner in leases
+                    if owner == self.owner
+                )
+                taken = {partition_id for partition_id, _ in leases}
+                for partition_id in range(self.partitions):
+                    if len(owned) >= fair_share:
+                        break
+                    if partition_id not in taken:
+                        owned.append(partition_id)
+                owned, released = owned[:fair_share], owned[fair_share:]
+                expires = now + self.LEASE_SECONDS
+                connection.executemany(
+                    "INSERT OR REPLACE INTO leases VALUES (?, ?, ?)",
+                    [(partition_id, self.owner, expires) for partition_id in owned]
+                    + [
+                        (partition_id, "", now + self.RELEASE_SECONDS)
+                        for partition_id in released
+                    ],
+                )
+
+                connection.executemany(
+                    "INSERT INTO changes (user_id, owner, time) VALUES (?, ?, ?)",
+                    [(user_id, self.owner, now) for user_id in changed_user_ids],
+                )
+                connection.execute(
+                    "DELETE FROM changes WHERE time <= ?",
+                    (now - self.CHANGE_LOG_SECONDS,),
+                )
+                if self.last_change_seq is None:
+                    # Everything before now was loaded from Config already
+                    changes = []
+                    last_change_seq = connection.execute(
+                        "SELECT COALESCE(MAX(seq), 0) FROM changes"
+                    ).fetchone()[0]
+                else:
+                    changes = connection.execute(
+                        "SELECT seq, user_id FROM changes WHERE seq > ? AND owner != ?",
+                        (self.last_change_seq, self.owner),
+                    ).fetchall()
+                    last_change_seq = max(
+                        [self.last_change_seq] + [seq for seq, _ in changes]
+                    )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        self.owned = set(owned)
+        self.expires = expires
+        self.last_change_seq = last_change_seq
+        return self.owned, {user_id for _, user_id in changes}
+
+    def release(self, now: int):
+        """Give back all of this process' leases (when shutting down).
+
+        This blocks on the database, so run it in an executor.
+        """
+        self.owned = set()
+        self.expires = 0
+        with closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "UPDATE leases SET owner = '', expires = ? WHERE owner = ?",
+                    (now + self.RELEASE_SECONDS, self.owner),
+                )
+                connection.execute(
+                    "DELETE FROM processes WHERE owner = ?", (self.owner,)
+                )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
@@ -0,0 +1,177 @@
+"""Time zone aware reminder times and calendar recurrence."""
+import re
+from datetime import date, datetime, time, timedelta, tzinfo
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from dateutil import rrule, tz
+from discord.ext.commands import BadArgument
+from redbot.core.utils.chat_formatting import humanize_timedelta
+
+from .reminder_parse import ReminderTime, describe_rule
+
+DEFAULT_TIMEZONE = "UTC"
+MINIMUM_REPEAT_SECONDS = 86400
+# What a repeating reminder does about repeats that were missed (bot was offline, etc.)
+CATCH_UP_POLICIES = {
+    "once": "send it once, then continue as normal",
+    "all": "send it for every time it was missed in the last week, then continue as normal",
+    "skip": "not send it, and wait until the next time it repeats",
+}
+DEFAULT_CATCH_UP_POLICY = "once"
+CATCH_UP_WINDOW_SECONDS = 7 * 86400
+# tz database names only, so that gettz is never pointed at an arbitrary file
+TIMEZONE_NAME = re.compile(r"[A-Za-z0-9_+\-]+(/[A-Za-z0-9_+\-]+)*")
+
+
+def get_timezone(timezone: Optional[str]) -> Optional[tzinfo]:
+    """Get a time zone by its tz database name, or None if it doesn't exist."""
+    if not timezone:
+        timezone = DEFAULT_TIMEZONE
+    if timezone.upper() == "UTC":
+        return tz.UTC
+    if not TIMEZONE_NAME.fullmatch(timezone):
+        return None
+    return tz.gettz(timezone)
+
+
+@lru_cache(maxsize=1024)
+def compile_rule(rule: str) -> rrule.rrule:
+    """Compile an RRULE string.
+
+    Rules made by reminder_parse always specify everything down to the second and never skip periods,
+    so their occurrences don't depend on the start date. That lets one compiled rule be re-anchored
+    to any start date without reparsing it.
+    """
+    return rrule.rrulestr(rule, dtstart=datetime(2000, 1, 1))
+
+
+def next_rule_occurrence(
+    rule: str, timezone: Optional[str], after: int
+) -> Optional[int]:
+    """Get the first occurrence of a rule after the given time, in seconds since epoch.
+
+    The rule is anchored to the start of the day the search starts on, so this only ever looks at a
+    period or two of the rule, no matter how long ago the reminder was supposed to be sent.
+    """
+    after_datetime = datetime.fromtimestamp(after, get_timezone(timezone))
+    day_start = after_datetime.replace(hour=0, minute=0, second=0, microsecond=0)
+    occurrence = compile_rule(rule).replace(dtstart=day_start).after(after_datetime)
+    if not occurrence:
+        return None
+    return int(occurrence.timestamp())
+
+
+def get_catch_up_policy(reminder) -> str:
+    """Get the catch up policy of a reminder."""
+    if "CATCH_UP" in reminder and reminder["CATCH_UP"] in CATCH_UP_POLICIES:
+        return reminder["CATCH_UP"]
+    return DEFAULT_CATCH_UP_POLICY
+
+
+def next_catch_up_occurrence(reminder, now: int) -> Optional[int]:
+    """Get when a repeating reminder that was just sent (or skipped) should be sent next, following its catch up policy.
+
+    "all" moves on to the next occurrence, but no further back than CATCH_UP_WINDOW_SECONDS ago. Missed
+    occurrences are then sent one after the other as the scheduler finds them due.
+    "once" and "skip" move straight on to the next occurrence after now.
+    Either way, this is a single calculation no matter how many occurrences were missed.
+    """
+    if get_catch_up_policy(reminder) == "all":
+        return next_occurrence(
+            reminder, max(reminder["FUTURE"], now - CATCH_UP_WINDOW_SECONDS)
+        )
+    return next_occurrence(reminder, now)
+
+
+def next_occurrence(reminder, after: int) -> Optional[int]:
+    """Get when a repeating reminder should be sent next, after the given time.
+
+    Calendar reminders use their compiled rule, and interval reminders skip over all missed repeats
+    with a single calculation.
+    """
+    if "RRULE" in reminder and reminder["RRULE"]:
+        return next_rule_occurrence(reminder["RRULE"], reminder.get("TIMEZONE"), after)
+    future = reminder["FUTURE"]
+    if future > after:
+        return future
+    repeat = max(reminder["REPEAT"], MINIMUM_REPEAT_SECONDS)
+    return future + ((after - future) // repeat + 1) * repeat
+
+
+def resolve_reminder_time(
+    reminder_time: ReminderTime, now: int, timezone: Optional[str]
+) -> Tuple[int, Optional[str]]:
+    """Turn parsed time expressions into the time of the first reminder, and the complete RRULE if it repeats on a calendar."""
+    zone = get_timezone(timezone)
+    now_datetime = datetime.fromtimestamp(now, zone)
+    if not reminder_time.is_absolute:
+        return (
+            int(now + (reminder_time.relative or reminder_time.repeat).total_seconds()),
+            None,
+        )
+
+    rule = None
+    if reminder_time.rule:
+        rule = complete_rule(reminder_time.rule, reminder_time.at, now, timezone)
+        if reminder_time.relative:
+            future = int(now + reminder_time.relative.total_seconds())
+        else:
+            future = next_rule_occurrence(rule, timezone, now)
+    elif reminder_time.on is None:
+        future = next_rule_occurrence(
+            complete_rule("FREQ=DAILY", reminder_time.at, now, timezone),
+            timezone,
+            now,
+        )
+    elif isinstance(reminder_time.on, str):
+        future = next_rule_occurrence(
+            complete_rule(reminder_time.on, reminder_time.at, now, timezone),
+            timezone,
+            now,
+        )
+    else:
+        day = reminder_time.on
+        if not isinstance(day, date):
+            day = now_datetime.date() + timedelta(days=day)
+        at = reminder_time.at or now_datetime.time().replace(microsecond=0)
+        future = int(datetime.combine(day, at, tzinfo=zone).timestamp())
+
+    if future <= now:
+        raise BadArgument("That time has already passed!")
+    return future, rule
+
+
+def complete_rule(
+    partial_rule: str, at: Optional[time], timestamp: int, timezone: Optional[str]
+) -> str:
+    """Add the time of day to a partial RRULE from reminder_parse.
+
+    If no time of day is given, the time of day of the timestamp (in the time zone) is used.
+    """
+    if not at:
+        at = datetime.fromtimestamp(timestamp, get_timezone(timezone)).time()
+    return f"{partial_rule};BYHOUR={at.hour};BYMINUTE={at.minute};BYSECOND={at.second}"
+
+
+def describe_repeat(reminder) -> Optional[str]:
+    """Describe how often a reminder repeats (to follow the word "every"), or None if it doesn't repeat."""
+    if "RRULE" in reminder and reminder["RRULE"]:
+        return (
+            f"{describe_rule(reminder['RRULE'])} "
+            f"({reminder.get('TIMEZONE') or DEFAULT_TIMEZONE})"
+        )
+    if "REPEAT" in reminder and reminder["REPEAT"]:
+        return humanize_timedelta(
+            seconds=max(reminder["REPEAT"], MINIMUM_REPEAT_SECONDS)
+        )
+    return None
+
+
+def describe_time(timestamp: int, timezone: Optional[str]) -> str:
+    """Describe a point in time in the users time zone, like "Friday, March 5 at 09:00 (UTC)"."""
+    moment = datetime.fromtimestamp(timestamp, get_timezone(timezone))
+    return (
+        f"{moment:%A, %B} {moment.day} at {moment:%H:%M} "
+        f"({timezone or DEFAULT_TIMEZONE})"
+    )
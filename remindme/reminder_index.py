@@ -0,0 +1,178 @@
+"""In-memory index of reminders."""
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+def is_repeating(reminder) -> bool:
+    """Check if a reminder repeats, either on an interval or on a calendar."""
+    return bool(
+        ("REPEAT" in reminder and reminder["REPEAT"])
+        or ("RRULE" in reminder and reminder["RRULE"])
+    )
+
+
+class ReminderIndex:
+    """In-memory index of all reminders, keyed by user ID and user reminder ID.
+
+    Every per-user operation only looks at that user's reminders,
+    so it does not get slower as the total number of reminders grows.
+    """
+
+    # How a users reminders can be sorted, besides the order they were added in
+    SORT_KEYS = {
+        "time": lambda reminder: reminder["FUTURE"],
+        "id": lambda reminder: reminder["USER_REMINDER_ID"],
+    }
+
+    def __init__(self):
+        """Create an empty index."""
+        self._reminders: Dict[int, Dict[int, dict]] = {}
+        self._free_ids: Dict[int, Set[int]] = {}
+        self._highest_ids: Dict[int, int] = {}
+        self._contents: Dict[int, Counter] = {}
+        self._count = 0
+        self._repeating_count = 0
+        self._sorted: Dict[int, Dict[str, List[dict]]] = {}
+
+    @staticmethod
+    def content_key(reminder) -> Tuple:
+        """Get the key used for duplicate detection (ignores user reminder ID)."""
+        return (
+            reminder["USER_ID"],
+            reminder["REMINDER"],
+            reminder["FUTURE"],
+            reminder["FUTURE_TEXT"],
+        )
+
+    def load(self, reminders: Iterable[dict]):
+        """Replace the contents of this index with the given reminders."""
+        self._reminders = {}
+        self._free_ids = {}
+        self._highest_ids = {}
+        self._contents = {}
+        self._count = 0
+        self._repeating_count = 0
+        self._sorted = {}
+        for reminder in reminders:
+            self.add(reminder)
+
+    def get(self, user_id: int, user_reminder_id: int) -> Optional[dict]:
+        """Get a specific reminder, or None if it doesn't exist."""
+        return self._reminders.get(user_id, {}).get(user_reminder_id)
+
+    def get_user_reminders(self, user_id: int) -> List[dict]:
+        """Get all of a users reminders, in the order they were added."""
+        return list(self._reminders.get(user_id, {}).values())
+
+    def get_sorted_user_reminders(self, user_id: int, sort: str) -> List[dict]:
+        """Get all of a users reminders, sorted by one of SORT_KEYS (or "added").
+
+        Sorted lists are kept until the users reminders change, so they must not be modified.
+        """
+        if user_id not in self._reminders:
+            return []
+        users_sorted = self._sorted.setdefault(user_id, {})
+        if sort not in users_sorted:
+            users_reminders = self.get_user_reminders(user_id)
+            if sort in self.SORT_KEYS:
+                users_reminders.sort(key=self.SORT_KEYS[sort])
+            users_sorted[sort] = users_reminders
+        return users_sorted[sort]
+
+    def next_reminder_id(self, user_id: int) -> int:
+        """Get the next user reminder ID for a user.
+
+        This is the lowest ID freed by a removed reminder, or one past the highest ID in use.
+        IDs skipped by an imported reminder are not handed out, so that a large imported ID
+        doesn't need every ID below it tracked.
+        """
+        free_ids = self._free_ids.get(user_id)
+        if free_ids:
+            return min(free_ids)
+        return self._highest_ids.get(user_id, 0) + 1
+
+    def exists(self, reminder) -> bool:
+        """Check if an identical reminder already exists (ignores user reminder ID)."""
+        return (
+            self._contents.get(reminder["USER_ID"], {}).get(
+                self.content_key(reminder), 0
+            )
+            > 0
+        )
+
+    def add(self, reminder):
+        """Add a reminder, replacing any existing reminder with the same user and user reminder ID."""
+        user_id = reminder["USER_ID"]
+        user_reminder_id = reminder["USER_REMINDER_ID"]
+        users_reminders = self._reminders.setdefault(user_id, {})
+        self._sorted.pop(user_id, None)
+        old_reminder = users_reminders.get(user_reminder_id)
+        if old_reminder:
+            self._discard_content(old_reminder)
+            self._repeating_count -= is_repeating(old_reminder)
+        else:
+            self._count += 1
+            free_ids = self._free_ids.setdefault(user_id, set())
+            highest_id = self._highest_ids.get(user_id, 0)
+            if user_reminder_id > highest_id:
+                self._highest_ids[user_id] = user_reminder_id
+            else:
+                free_ids.discard(user_reminder_id)
+        users_reminders[user_reminder_id] = reminder
+        self._repeating_count += is_repeating(reminder)
+        self._contents.setdefault(user_id, Counter())[self.content_key(reminder)] += 1
+
+    def remove(self, reminder):
+        """Remove a reminder, if it exists."""
+        user_id = reminder["USER_ID"]
+        user_reminder_id = reminder["USER_REMINDER_ID"]
+        users_reminders = self._reminders.get(user_id, {})
+        old_reminder = users_reminders.pop(user_reminder_id, None)
+        if not old_reminder:
+            return
+        self._sorted.pop(user_id, None)
+        self._count -= 1
+        self._repeating_count -= is_repeating(old_reminder)
+        if not users_reminders:
+            self.remove_user(user_id)
+            return
+        self._discard_content(old_reminder)
+        self._free_ids[user_id].add(user_reminder_id)
+
+    def _discard_content(self, reminder):
+        """Forget the duplicate detection key of a reminder that is being removed or replaced."""
+        contents = self._contents[reminder["USER_ID"]]
+        content_key = self.content_key(reminder)
+        contents[content_key] -= 1
+        if contents[content_key] <= 0:
+            del contents[content_key]
+
+    def remove_user(self, user_id: int):
+        """Remove all of a users reminders."""
+        users_reminders = self._reminders.pop(user_id, {})
+        self._sorted.pop(user_id, None)
+        self._count -= len(users_reminders)
+        self._repeating_count -= sum(
+            is_repeating(reminder) for reminder in users_reminders.values()
+        )
+        self._free_ids.pop(user_id, None)
+        self._highest_ids.pop(user_id, None)
+        self._contents.pop(user_id, None)
+
+    @property
+    def repeating_count(self) -> int:
+        """Get the number of repeating reminders."""
+        return self._repeating_count
+
+    def user_ids(self) -> List[int]:
+        """Get all user IDs that have reminders."""
+        return list(self._reminders)
+
+    def __iter__(self) -> Iterator[dict]:
+        """Iterate over all reminders."""
+        for users_reminders in self._reminders.values():
+            yield from users_reminders.values()
+
+    def __len__(self) -> int:
+        """Get the total number of reminders."""
+        return self._count
@@ -0,0 +1,446 @@
+"""Parsing of reminder times and text."""
+import re
+from datetime import date, time, timedelta
+from typing import NamedTuple, Optional, Tuple, Union
+
+from discord.ext.commands import BadArgument
+from redbot.core import commands
+from redbot.core.commands import parse_timedelta
+from redbot.core.utils.chat_formatting import humanize_list
+
+_UNIT = r"(weeks?|w|days?|d|hours?|hrs|hr?|minutes?|mins?|m(?!o)|seconds?|secs?|s)"
+_AMOUNT_AND_TIME = r"\d+\s*" + _UNIT
+_OPTIONAL_IN_EVERY = r"(in\s+|every\s+)?"
+_OPTIONAL_COMMA_SPACE_AND = r"[\s,]*(and)?\s*"
+_TIMEDELTA = (
+    _OPTIONAL_IN_EVERY
+    + r"("
+    + _AMOUNT_AND_TIME
+    + r"("
+    + _OPTIONAL_COMMA_SPACE_AND
+    + _AMOUNT_AND_TIME
+    + r")*"
+    + r")"
+)
+
+_WEEKDAY = r"(?:monday|mon|tuesday|tues|tue|wednesday|wed|thursday|thurs|thur|thu|friday|fri|saturday|sat|sunday|sun)"
+_MONTH = (
+    r"(?:january|jan|february|feb|march|mar|april|apr|may|june|jun|july|jul|august|aug"
+    r"|september|sept|sep|october|oct|november|nov|december|dec)"
+)
+_ORDINAL = r"\d{1,2}(?:st|nd|rd|th)?"
+# Not followed by a unit or a colon, so that durations ("at 2 hrs") aren't taken as a time of day
+_AT = (
+    r"at\s+(?P<time>noon|midnight|\d{1,2}(?::\d{2})?(?:\s*[ap]m)?)(?!:|\s*"
+    + _UNIT
+    + r"\b)"
+)
+_ON = (
+    r"(?:(?P<relative_day>today|tomorrow)|on\s+(?:the\s+)?(?:"
+    + r"(?P<weekday>"
+    + _WEEKDAY
+    + r")|(?P<iso_date>\d{4}-\d{1,2}-\d{1,2})|(?P<month>"
+    + _MONTH
+    + r")\s+(?P<day>"
+    + _ORDINAL
+    + r")|(?P<day_first>"
+    + _ORDINAL
+    + r")(?:\s+of)?\s+(?P<month_second>"
+    + _MONTH
+    + r")))"
+)
+_EVERY_CALENDAR = (
+    r"every\s+(?:(?P<daily>day)|(?P<weekday>weekday)|(?P<weekend>weekend)|(?P<weekdays>"
+    + _WEEKDAY
+    + r"(?:[\s,]*(?:and\s+)?"
+    + _WEEKDAY
+    + r")*)|(?P<monthday>"
+    + _ORDINAL
+    + r"|last)\s+(?:day\s+)?of\s+(?:the|each|every)\s+month|month\s+on\s+the\s+(?P<monthday_second>"
+    + _ORDINAL
+    + r"|last)(?:\s+day)?)"
+)
+
+TIMEDELTA_BEGIN = re.compile(_TIMEDELTA + r"\b")
+TIMEDELTA_END = re.compile(r"\b" + _TIMEDELTA + r"$")
+AT_BEGIN = re.compile(_AT + r"\b", re.I)
+AT_END = re.compile(r"\b" + _AT + r"$", re.I)
+ON_BEGIN = re.compile(_ON + r"\b", re.I)
+ON_END = re.compile(r"\b" + _ON + r"$", re.I)
+EVERY_CALENDAR_BEGIN = re.compile(_EVERY_CALENDAR + r"\b", re.I)
+EVERY_CALENDAR_END = re.compile(r"\b" + _EVERY_CALENDAR + r"$", re.I)
+TIME_OF_DAY = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*([ap]m)?", re.I)
+DIGITS = re.compile(r"\d+")
+
+# Same units (and order) as Red's parse_timedelta
+UNIT_ORDER = ["weeks", "days", "hours", "minutes", "seconds"]
+UNIT_TOKENS = [
+    re.compile(r"(\d+?)\s?" + unit, re.I)
+    for unit in [
+        r"(weeks?|w)",
+        r"(days?|d)",
+        r"(hours?|hrs|hr?)",
+        r"(minutes?|mins?|m(?!o))",
+        r"(seconds?|secs?|s)",
+    ]
+]
+REPEAT_UNITS = ["weeks", "days"]
+MINIMUM = timedelta(minutes=1)
+REPEAT_MINIMUM = timedelta(days=1)
+
+# RRULE weekday codes, in the order Python numbers weekdays
+WEEKDAY_CODES = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+WEEKDAY_NAMES = [
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+]
+MONTH_NAMES = [
+    "January",
+    "February",
+    "March",
+    "April",
+    "May",
+    "June",
+    "July",
+    "August",
+    "September",
+    "October",
+    "November",
+    "December",
+]
+
+# Which time expressions can't be used together in the same reminder
+CONFLICTING_KINDS = {
+    "in": {"at", "on"},
+    "every": {"rule"},
+    "at": {"in"},
+    "on": {"in", "rule"},
+    "rule": {"every", "on"},
+}
+
+
+class ReminderTime(NamedTuple):
+    """All of the time expressions found in some reminder text.
+
+    relative: relative time until the (first) reminder ("in 2 hours")
+    repeat: relative time between repeats ("every 2 days")
+    at: time of day ("at 5pm")
+    on: day of the reminder; days from today ("tomorrow"), a date ("on 2021-03-01"),
+        or a partial RRULE that finds the day ("on friday", "on march 1st")
+    rule: partial RRULE (no time of day) for calendar repeats ("every weekday")
+    """
+
+    relative: Optional[timedelta] = None
+    repeat: Optional[timedelta] = None
+    at: Optional[time] = None
+    on: Union[int, date, str, None] = None
+    rule: Optional[str] = None
+
+    @property
+    def is_absolute(self) -> bool:
+        """If this depends on the users time zone."""
+        return bool(self.at or self.on is not None or self.rule)
+
+    def __bool__(self) -> bool:
+        """If any time expression was found."""
+        return bool(self.relative or self.repeat or self.is_absolute)
+
+
+def process_reminder_text(reminder_text: str) -> Tuple[ReminderTime, str]:
+    """Completely process the given reminder text into time expressions, removing them from the reminder text.
+
+    Takes all "every {time_repeat}", "in {time}", "{time}", "at {time of day}", "on {day}",
+    and "every {calendar repeat}" from the beginning of the reminder_text.
+    At most one instance of each kind of time expression will be consumed.
+    If the parser runs into a kind of time expression that has already been parsed
+    (or can't be combined with one that has), parsing stops.
+    Same process is then repeated from the end of the string.
+
+    The reminder text is only sliced once at the end, instead of being rebuilt after every match.
+    """
+    found = {}
+    start = 0
+    end = len(reminder_text)
+
+    # find the time expression(s) at the beginning of the text
+    while start < end:
+        regex_result = None
+        for begin_regex, _, consume, _ in EXPRESSIONS:
+            regex_result = begin_regex.match(reminder_text, start, end)
+            if regex_result:
+                break
+        if not regex_result or not consume(regex_result, found):
+            break
+        start = regex_result.end() + 1
+        while start < end and reminder_text[start].isspace():
+            start += 1
+
+    # find the time expression(s) at the end of the text
+    while start < end:
+        regex_result = None
+        for _, end_regex, consume, longest in EXPRESSIONS:
+            # Only look as far back as the longest possible match
+            search_start = max(start, end - longest) if longest else start
+            regex_result = end_regex.search(reminder_text, search_start, end)
+            if regex_result:
+                break
+        if not regex_result or not consume(regex_result, found):
+            break
+        end = regex_result.start()
+        while start < end and reminder_text[end - 1].isspace():
+            end -= 1
+
+    # cleanup
+    reminder_text = reminder_text[start:end]
+    if len(reminder_text) > 1 and reminder_text[0:2] == "to":
+        reminder_text = reminder_text[2:].strip()
+    return (
+        ReminderTime(
+            relative=found.get("in"),
+            repeat=found.get("every"),
+            at=found.get("at"),
+            on=found.get("on"),
+            rule=found.get("rule"),
+        ),
+        reminder_text,
+    )
+
+
+def _can_consume(kind: str, found: dict) -> bool:
+    """Check if this kind of time expression can still be added to found."""
+    return kind not in found and not CONFLICTING_KINDS[kind].intersection(found)
+
+
+def _consume_timedelta(regex_result, found: dict) -> bool:
+    """Parse a matched timedelta into found (keyed by if it is repeating or not).
+
+    Returns False if this kind of timedelta was already found, or if it couldn't be parsed.
+    """
+    repeating = bool(regex_result[1]) and regex_result[1].strip() == "every"
+    kind = "every" if repeating else "in"
+    if not _can_consume(kind, found):
+        return False
+    parsed_timedelta = parse_timedelta_tokens(regex_result[2], repeating)
+    if not parsed_timedelta:
+        return False
+    found[kind] = parsed_timedelta
+    return True
+
+
+def _consume_at(regex_result, found: dict) -> bool:
+    """Parse a matched time of day into found."""
+    if not _can_consume("at", found):
+        return False
+    parsed_time = parse_time_of_day(regex_result["time"])
+    if not parsed_time:
+        return False
+    found["at"] = parsed_time
+    return True
+
+
+def _consume_on(regex_result, found: dict) -> bool:
+    """Parse a matched day into found."""
+    if not _can_consume("on", found):
+        return False
+    if regex_result["relative_day"]:
+        found["on"] = 0 if regex_result["relative_day"].lower() == "today" else 1
+    elif regex_result["weekday"]:
+        found["on"] = f"FREQ=WEEKLY;BYDAY={_weekday_code(regex_result['weekday'])}"
+    elif regex_result["iso_date"]:
+        try:
+            found["on"] = date(*map(int, regex_result["iso_date"].split("-")))
+        except ValueError:
+            return False
+    else:
+        month = _month_number(regex_result["month"] or regex_result["month_second"])
+        day = _ordinal_number(regex_result["day"] or regex_result["day_first"])
+        try:
+            date(2000, month, day)  # Leap year, so February 29th is allowed
+        except ValueError:
+            return False
+        found["on"] = f"FREQ=YEARLY;BYMONTH={month};BYMONTHDAY={day}"
+    return True
+
+
+def _consume_every_calendar(regex_result, found: dict) -> bool:
+    """Parse a matched calendar repeat into found."""
+    if not _can_consume("rule", found):
+        return False
+    if regex_result["daily"]:
+        found["rule"] = "FREQ=DAILY"
+    elif regex_result["weekday"]:
+        found["rule"] = "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR"
+    elif regex_result["weekend"]:
+        found["rule"] = "FREQ=WEEKLY;BYDAY=SA,SU"
+    elif regex_result["weekdays"]:
+        codes = {
+            _weekday_code(weekday)
+            for weekday in re.findall(_WEEKDAY, regex_result["weekdays"], re.I)
+        }
+        found["rule"] = "FREQ=WEEKLY;BYDAY=" + ",".join(
+            code for code in WEEKDAY_CODES if code in codes
+        )
+    else:
+        monthday = regex_result["monthday"] or regex_result["monthday_second"]
+        day = -1 if monthday.lower() == "last" else _ordinal_number(monthday)
+        if not day or day > 31:
+            return False
+        found["rule"] = f"FREQ=MONTHLY;BYMONTHDAY={day}"
+    return True
+
+
+# Regexes for each kind of time expression, how to parse them, and the longest text they can match
+# (None if unbounded). Calendar repeats are bounded by listing each weekday at most once.
+EXPRESSIONS = [
+    (TIMEDELTA_BEGIN, TIMEDELTA_END, _consume_timedelta, None),
+    (AT_BEGIN, AT_END, _consume_at, 40),
+    (ON_BEGIN, ON_END, _consume_on, 60),
+    (EVERY_CALENDAR_BEGIN, EVERY_CALENDAR_END, _consume_every_calendar, 160),
+]
+
+
+def parse_time_of_day(time_string: str) -> Optional[time]:
+    """Parse a time of day, like "17:00", "5pm", or "noon"."""
+    time_string = time_string.lower()
+    if time_string == "noon":
+        return time(12)
+    if time_string == "midnight":
+        return time(0)
+    regex_result = TIME_OF_DAY.fullmatch(time_string)
+    if not regex_result:
+        return None
+    hour = int(regex_result[1])
+    minute = int(regex_result[2] or 0)
+    if regex_result[3]:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if regex_result[3] == "pm" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return time(hour, minute)
+
+
+def _weekday_code(weekday: str) -> str:
+    """Get the RRULE code for a weekday name (the first two letters are unique)."""
+    return weekday[:2].upper()
+
+
+def _month_number(month: str) -> int:
+    """Get the month number for a month name (the first three letters are unique)."""
+    return [name[:3].lower() for name in MONTH_NAMES].index(month[:3].lower()) + 1
+
+
+def _ordinal_number(ordinal: str) -> int:
+    """Get the number out of an ordinal, like "21st"."""
+    return int(DIGITS.match(ordinal)[0])
+
+
+def ordinal(number: int) -> str:
+    """Get the ordinal of a number, like "21st"."""
+    suffix = "th"
+    if number % 100 not in (11, 12, 13):
+        suffix = {1: "st", 2: "nd", 3: "rd"}.get(number % 10, "th")
+    return f"{number}{suffix}"
+
+
+def describe_rule(rule: str) -> str:
+    """Describe a complete RRULE (including the time of day) made by this module, to follow the word "every"."""
+    parts = dict(part.split("=", 1) for part in rule.split(";"))
+    time_of_day = f"{int(parts['BYHOUR']):02}:{int(parts['BYMINUTE']):02}"
+    if parts["FREQ"] == "WEEKLY":
+        if parts["BYDAY"] == "MO,TU,WE,TH,FR":
+            days = "weekday"
+        elif parts["BYDAY"] == "SA,SU":
+            days = "weekend day"
+        else:
+            days = humanize_list(
+                [
+                    WEEKDAY_NAMES[WEEKDAY_CODES.index(code)]
+                    for code in parts["BYDAY"].split(",")
+                ]
+            )
+    elif parts["FREQ"] == "MONTHLY":
+        monthday = int(parts["BYMONTHDAY"])
+        days = (
+            "month on the last day"
+            if monthday == -1
+            else f"month on the {ordinal(monthday)}"
+        )
+    elif parts["FREQ"] == "YEARLY":
+        days = f"year on {MONTH_NAMES[int(parts['BYMONTH']) - 1]} {ordinal(int(parts['BYMONTHDAY']))}"
+    else:
+        days = "day"
+    return f"{days} at {time_of_day}"
+
+
+def parse_timedelta_tokens(timedelta_string: str, repeating: bool):
+    """Parse a timedelta, taking into account if it is a repeating timedelta (day minimum) or not.
+
+    Behaves exactly like calling Red's parse_timedelta on an ever growing prefix of the chunks, but each chunk
+    is only tokenized once and the timedelta is built directly. Red's parse_timedelta is only called to raise
+    its (translated) error message when a prefix turns out to be invalid.
+    """
+    allowed_units = REPEAT_UNITS if repeating else UNIT_ORDER
+    minimum = REPEAT_MINIMUM if repeating else MINIMUM
+    params = {}
+    result = None
+    testing_text = ""
+    position = 0
+    next_rank = 0
+    for chunk in timedelta_string.split():
+        if chunk == "and":
+            continue
+        if chunk.isdigit():
+            testing_text += chunk
+            continue
+        testing_text += chunk.rstrip(",")
+        # Units must go from largest to smallest, like Red's TIME_RE
+        for rank in range(next_rank, len(UNIT_TOKENS)):
+            token = UNIT_TOKENS[rank].match(testing_text, position)
+            if token:
+                params[UNIT_ORDER[rank]] = int(token[1])
+                position = token.end()
+                next_rank = rank + 1
+        parsed = None
+        if params:
+            try:
+                parsed = timedelta(**params)
+            except OverflowError:
+                pass
+            if (
+                not parsed
+                or parsed < minimum
+                or any(unit not in allowed_units for unit in params)
+            ):
+                parsed = _red_parse_timedelta(
+                    "".join(f"{amount}{unit}" for unit, amount in params.items()),
+                    repeating,
+                )
+        if parsed != result:
+            result = parsed
+        else:
+            return None
+    return result
+
+
+def _red_parse_timedelta(timedelta_string: str, repeating: bool):
+    """Parse a timedelta with Red's parse_timedelta."""
+    if repeating:
+        try:
+            return parse_timedelta(
+                timedelta_string,
+                minimum=REPEAT_MINIMUM,
+                allowed_units=REPEAT_UNITS,
+            )
+        except commands.BadArgument as ba:
+            orig_message = str(ba)[0].lower() + str(ba)[1:]
+            raise BadArgument(
+                f"For the repeating portion of this reminder, {orig_message}. "
+                "You must only use `days` or `weeks` when dealing with repeating reminders."
+            )
+    return parse_timedelta(timedelta_string, minimum=MINIMUM)
@@ -0,0 +1,301 @@
+"""Persistent storage backends for reminders."""
+import asyncio
+import json
+import sqlite3
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List
+
+from redbot.core import Config
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reminders (
+    user_id INTEGER NOT NULL,
+    user_reminder_id INTEGER NOT NULL,
+    future INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    position INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, user_reminder_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS reminders_future ON reminders (future);
+"""
+# SQLite allows at most 999 variables per statement on older versions
+SQLITE_MAX_VARIABLES = 900
+
+
+class ReminderStore(ABC):
+    """Where reminders are kept between restarts.
+
+    The cog keeps all reminders in memory, and only uses a store to load them on startup,
+    to write the reminders of users that changed, and to reload users changed by other processes.
+    """
+
+    @abstractmethod
+    async def load_all(self) -> List[dict]:
+        """Get all reminders."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def load_users(self, user_ids: Iterable[int]) -> Dict[int, List[dict]]:
+        """Get the reminders of some users, ordered by user reminder ID."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def user_ids(self) -> List[int]:
+        """Get the IDs of all users that have reminders."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def due_reminders(self, before: int) -> List[dict]:
+        """Get all reminders due at or before a time, ordered by when they are due."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def write_users(self, users: Dict[int, List[dict]]):
+        """Replace the reminders of some users (an empty list deletes them all)."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def replace_all(self, reminders: Iterable[dict]):
+        """Replace all reminders."""
+        raise NotImplementedError()
+
+    async def close(self):
+        """Release any resources held by this store."""
+
+
+class ConfigReminderStore(ReminderStore):
+    """Reminders kept in Config, in the REMINDER custom group (user ID, user reminder ID)."""
+
+    def __init__(self, config: Config):
+        """Use the REMINDER custom group of a cogs Config."""
+        self.config = config
+
+    async def load_all(self) -> List[dict]:
+        """Get all reminders."""
+        return [
+            reminder
+            for users_reminders in (await self.config.custom("REMINDER").all()).values()
+            for reminder in users_reminders.values()
+        ]
+
+    async def load_users(self, user_ids: Iterable[int]) -> Dict[int, List[dict]]:
+        """Get the reminders of some users, ordered by user reminder ID."""
+        users = {}
+        for user_id in user_ids:
+            users_reminders = await self.config.custom("REMINDER", user_id).all()
+            users[user_id] = sorted(
+                users_reminders.values(),
+                key=lambda reminder: reminder["USER_REMINDER_ID"],
+            )
+        return users
+
+    async def user_ids(self) -> List[int]:
+        """Get the IDs of all users that have reminders."""
+        return [int(user_id) for user_id in await self.config.custom("REMINDER").all()]
+
+    async def due_reminders(self, before: int) -> List[dict]:
+        """Get all reminders due at or before a time, ordered by when they are due.
+
+        Config can't be queried, so this looks at every reminder.
+        """
+        return sorted(
+            (
+                reminder
+                for reminder in await self.load_all()
+                if reminder["FUTURE"] <= before
+            ),
+            key=lambda reminder: reminder["FUTURE"],
+        )
+
+    async def write_users(self, users: Dict[int, List[dict]]):
+        """Replace the reminders of some users (an empty list deletes them all)."""
+        for user_id, users_reminders in users.items():
+            if users_reminders:
+                await self.config.custom("REMINDER", user_id).set(
+                    {
+                        str(reminder["USER_REMINDER_ID"]): reminder
+                        for reminder in users_reminders
+                    }
+                )
+            else:
+                await self.config.custom("REMINDER", user_id).clear()
+
+    async def replace_all(self, reminders: Iterable[dict]):
+        """Replace all reminders.
+
+        Written user by user, clearing only the users that no longer have reminders,
+        so that no reminders are missing from Config part way through.
+        """
+        users = {}
+        for reminder in reminders:
+            users.setdefault(reminder["USER_ID"], []).append(reminder)
+        for user_id in await self.user_ids():
+            users.setdefault(user_id, [])
+        await self.write_users(users)
+
+
+class SQLiteReminderStore(ReminderStore):
+    """Reminders kept in a SQLite database, indexed by user and by when they are due.
+
+    Each reminder is a row, so writing a users reminders doesn't rewrite anyone else's. All database
+    access happens on one worker thread, so the bot never blocks on disk.
+    """
+
+    def __init__(self, path: str):
+        """Use the SQLite database at path (created if needed)."""
+        self.path = path
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="remindme_sqlite"
+        )
+        self._connection = None
+
+    async def _run(self, function, *args):
+        """Run a function on the database thread."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, function, *args
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get the database connection, opening it the first time."""
+        if not self._connection:
+            self._connection = sqlite3.connect(
+                self.path, isolation_level=None, check_same_thread=False
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(SQLITE_SCHEMA)
+            columns = [
+                row[1]
+                for row in self._connection.execute("PRAGMA table_info(reminders)")
+            ]
+            if "position" not in columns:
+                # Added later; older rows fall back to being ordered by user reminder ID
+                self._connection.execute(
+                    "ALTER TABLE reminders ADD COLUMN position INTEGER NOT NULL DEFAULT 0"
+                )
+        return self._connection
+
+    def _query(self, sql: str, parameters=()) -> List[dict]:
+        """Get the reminders selected by a query on the data column."""
+        return [
+            json.loads(data)
+            for (data,) in self._connect().execute(sql, parameters).fetchall()
+        ]
+
+    def _write(self, function, *args):
+        """Run a function that writes to the database in a transaction."""
+        connection = self._connect()
+        connection.execute("BEGIN")
+        try:
+            function(connection, *args)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _insert(connection: sqlite3.Connection, reminders: Iterable[dict]):
+        """Insert (or replace) reminders, remembering the order they were given in."""
+        connection.executemany(
+            "INSERT OR REPLACE INTO reminders "
+            "(user_id, user_reminder_id, future, data, position) VALUES (?, ?, ?, ?, ?)",
+            (
+                (
+                    reminder["USER_ID"],
+                    reminder["USER_REMINDER_ID"],
+                    reminder["FUTURE"],
+                    json.dumps(reminder, separators=(",", ":")),
+                    position,
+                )
+                for position, reminder in enumerate(reminders)
+            ),
+        )
+
+    def _load_users(self, user_ids: List[int]) -> Dict[int, List[dict]]:
+        users = {user_id: [] for user_id in user_ids}
+        for start in range(0, len(user_ids), SQLITE_MAX_VARIABLES):
+            chunk = user_ids[start : start + SQLITE_MAX_VARIABLES]
+            for reminder in self._query(
+                f"SELECT data FROM reminders WHERE user_id IN ({','.join('?' * len(chunk))}) "
+                f"ORDER BY user_id, user_reminder_id",
+                chunk,
+            ):
+                users[reminder["USER_ID"]].append(reminder)
+        return users
+
+    def _write_users(self, connection: sqlite3.Connection, users):
+        connection.executemany(
+            "DELETE FROM reminders WHERE user_id = ?",
+            ((user_id,) for user_id in users),
+        )
+        self._insert(
+            connection,
+            (
+                reminder
+                for users_reminders in users.values()
+                for reminder in users_reminders
+            ),
+        )
+
+    def _replace_all(self, connection: sqlite3.Connection, reminders):
+        connection.execute("DELETE FROM reminders")
+        self._insert(connection, reminders)
+
+    async def load_all(self) -> List[dict]:
+        """Get all reminders, each users in the order they were added (like Config)."""
+        return await self._run(
+            self._query,
+            "SELECT data FROM reminders ORDER BY user_id, position, user_reminder_id",
+        )
+
+    async def load_users(self, user_ids: Iterable[int]) -> Dict[int, List[dict]]:
+        """Get the reminders of some users, ordered by user reminder ID."""
+        return await self._run(self._load_users, list(user_ids))
+
+    async def user_ids(self) -> List[int]:
+        """Get the IDs of all users that have reminders."""
+
+        def query():
+            return [
+                user_id
+                for (user_id,) in self._connect().execute(
+                    "SELECT DISTINCT user_id FROM reminders"
+                )
+            ]
+
+        return await self._run(query)
+
+    async def due_reminders(self, before: int) -> List[dict]:
+        """Get all reminders due at or before a time, ordered by when they are due."""
+        return await self._run(
+            self._query,
+            "SELECT data FROM reminders WHERE future <= ? ORDER BY future",
+            (before,),
+        )
+
+    async def write_users(self, users: Dict[int, List[dict]]):
+        """Replace the reminders of some users (an empty list deletes them all), in one transaction."""
+        # Copied now, as the reminders may change while waiting for the database thread
+        users = {
+            user_id: [reminder.copy() for reminder in users_reminders]
+            for user_id, users_reminders in users.items()
+        }
+        await self._run(self._write, self._write_users, users)
+
+    async def replace_all(self, reminders: Iterable[dict]):
+        """Replace all reminders, in one transaction."""
+        await self._run(
+            self._write, self._replace_all, [reminder.copy() for reminder in reminders]
+        )
+
+    async def close(self):
+        """Close the database once everything queued has been written."""
+
+        def close_connection():
+            if self._connection:
+                self._connection.close()
+                self._connection = None
+
+        await self._run(close_connection)
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,129 @@
+"""Streaming import and export of reminders."""
+import json
+from typing import IO, Iterable, Iterator, Optional
+
+from .recurrence import (
+    CATCH_UP_POLICIES,
+    DEFAULT_CATCH_UP_POLICY,
+    compile_rule,
+    get_timezone,
+)
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+FILE_FORMATS = {"jsonl": ".jsonl", "msgpack": ".msgpack"}
+MAX_REMINDER_LENGTH = 1000
+# Far more than any user will have, but small enough that IDs stay short
+MAX_USER_REMINDER_ID = 1_000_000
+
+
+def available_formats() -> list:
+    """Get the file formats that can be used (msgpack is optional)."""
+    return [
+        file_format
+        for file_format in FILE_FORMATS
+        if file_format != "msgpack" or msgpack
+    ]
+
+
+def export_reminders(reminders: Iterable[dict], fp: IO[bytes], file_format: str) -> int:
+    """Write reminders to a binary file, one record at a time. Returns the number of reminders written."""
+    packer = msgpack.Packer() if file_format == "msgpack" else None
+    count = 0
+    for reminder in reminders:
+        if packer:
+            fp.write(packer.pack(reminder))
+        else:
+            fp.write(json.dumps(reminder, separators=(",", ":")).encode("utf-8"))
+            fp.write(b"\n")
+        count += 1
+    return count
+
+
+def read_reminders(fp: IO[bytes], file_format: str) -> Iterator[Optional[dict]]:
+    """Read reminders from a binary file, one record at a time.
+
+    Yields None for records that can't be decoded or aren't valid reminders.
+    """
+    if file_format == "msgpack":
+        records = msgpack.Unpacker(fp, raw=False)
+    else:
+        records = _read_json_lines(fp)
+    for record in records:
+        yield validate_reminder(record)
+
+
+def _read_json_lines(fp: IO[bytes]) -> Iterator:
+    """Decode each non-empty line of a JSONL file, yielding None for lines that aren't valid JSON."""
+    for line in fp:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield None
+
+
+def validate_reminder(record) -> Optional[dict]:
+    """Get a clean copy of a reminder record, or None if it isn't a valid reminder.
+
+    USER_REMINDER_ID is optional, as it is reassigned if already taken.
+    IDs above MAX_USER_REMINDER_ID are dropped, so that they are reassigned as well.
+    """
+    if not isinstance(record, dict):
+        return None
+    user_id = record.get("USER_ID")
+    future = record.get("FUTURE")
+    user_reminder_id = record.get("USER_REMINDER_ID")
+    reminder_text = record.get("REMINDER", "")
+    repeat = record.get("REPEAT")
+    rule = record.get("RRULE")
+    timezone = record.get("TIMEZONE")
+    catch_up = record.get("CATCH_UP")
+    if not _is_int(user_id) or user_id <= 0 or not _is_int(future):
+        return None
+    if user_reminder_id is not None and (
+        not _is_int(user_reminder_id) or user_reminder_id <= 0
+    ):
+        return None
+    if user_reminder_id is not None and user_reminder_id > MAX_USER_REMINDER_ID:
+        user_reminder_id = None
+    if not isinstance(reminder_text, str) or len(reminder_text) > MAX_REMINDER_LENGTH:
+        return None
+    if repeat is not None and (not _is_int(repeat) or repeat <= 0):
+        return None
+    if timezone is not None and (
+        not isinstance(timezone, str) or not get_timezone(timezone)
+    ):
+        return None
+    if rule is not None:
+        if not isinstance(rule, str):
+            return None
+        try:
+            compile_rule(rule)
+        except (ValueError, TypeError):
+            return None
+    if catch_up is not None and catch_up not in CATCH_UP_POLICIES:
+        return None
+    jump_link = record.get("JUMP_LINK")
+    future_text = record.get("FUTURE_TEXT", "")
+    return {
+        "USER_REMINDER_ID": user_reminder_id,
+        "USER_ID": user_id,
+        "REMINDER": reminder_text,
+        "REPEAT": repeat,
+        "FUTURE": future,
+        "FUTURE_TEXT": future_text if isinstance(future_text, str) else "",
+        "JUMP_LINK": jump_link if isinstance(jump_link, str) else None,
+        "RRULE": rule,
+        "TIMEZONE": timezone,
+        "CATCH_UP": catch_up or DEFAULT_CATCH_UP_POLICY,
+    }
+
+
+def _is_int(value) -> bool:
+    """Check if a value is an int (and not a bool)."""
+    return isinstance(value, int) and not isinstance(value, bool)
@@ -1,14 +1,30 @@
 """RemindMe cog for Red-DiscordBot ported and enhanced by PhasecoreX."""
 import asyncio
+import contextlib
+import heapq
 import logging
+import sqlite3
 import time as current_time
+from typing import Iterable, List, Optional, Set, Tuple
 
 import discord
 from redbot.core import Config, commands
+from redbot.core.data_manager import cog_data_path, storage_type
 from redbot.core.utils.chat_formatting import humanize_timedelta
 
 from .abc import CompositeMetaClass
 from .commands import Commands
+from .recurrence import (
+    DEFAULT_CATCH_UP_POLICY,
+    describe_repeat,
+    get_catch_up_policy,
+    next_catch_up_occurrence,
+)
+from .me_too_registry import MeTooRegistry
+from .partition import PartitionLeases, partition_of
+from .reminder_index import ReminderIndex, is_repeating
+from .reminder_store import ConfigReminderStore, ReminderStore, SQLiteReminderStore
+from .stats import DeliveryStats
 
 __author__ = "PhasecoreX"
 log = logging.getLogger("red.pcxcogs.remindme")
@@ -21,12 +37,35 @@ class RemindMe(Commands, commands.Cog, metaclass=CompositeMetaClass):
         "schema_version": 0,
         "total_sent": 0,
         "max_user_reminders": 20,
-        "reminders": [],
+        "me_too_prompts": {},
+        "partitions": 1,
+        "partition_lease_file": None,
+        "storage": "config",
     }
     default_guild_settings = {
         "me_too": False,
+        "me_too_timeout": 30,
+    }
+    default_user_settings = {
+        "timezone": None,
+    }
+    default_reminder_settings = {
+        "USER_REMINDER_ID": None,
+        "USER_ID": None,
+        "REMINDER": "",
+        "REPEAT": None,
+        "FUTURE": None,
+        "FUTURE_TEXT": "",
+        "JUMP_LINK": None,
+        "RRULE": None,
+        "TIMEZONE": None,
+        "CATCH_UP": DEFAULT_CATCH_UP_POLICY,
     }
     SEND_DELAY_SECONDS = 30
+    RETRY_DELAY_SECONDS = 5
+    SEND_CONCURRENCY = 10
+    FLUSH_DELAY_SECONDS = 5
+    PARTITION_SYNC_SECONDS = 5
 
     def __init__(self, bot):
         """Set up the cog."""
@@ -37,20 +76,46 @@ class RemindMe(Commands, commands.Cog, metaclass=CompositeMetaClass):
         )
         self.config.register_global(**self.default_global_settings)
         self.config.register_guild(**self.default_guild_settings)
+        self.config.register_user(**self.default_user_settings)
+        self.config.init_custom("REMINDER", 2)
+        self.config.register_custom("REMINDER", **self.default_reminder_settings)
         self.bg_loop_task = None
-        self.me_too_reminders = {}
+        self.reminder_index = ReminderIndex()
+        self.reminder_store: ReminderStore = ConfigReminderStore(self.config)
+        self.dirty_user_ids: Set[int] = set()
+        self.pending_total_sent = 0
+        self.flush_task = None
+        self.flush_delay = None
+        # Held while writing to the reminder store, so that flushes can't interleave with a store switch
+        self.reminder_store_lock = asyncio.Lock()
+        self.reminder_heap: List[Tuple[int, int, int]] = []
+        self.reminder_heap_changed = asyncio.Event()
+        self.me_too_reminders = MeTooRegistry()
+        self.stats = DeliveryStats()
+        self.me_too_dirty = False
+        self.partition_leases: Optional[PartitionLeases] = None
+        self.partition_task = None
+        self.partition_changes: Set[int] = set()
         self.reminder_emoji = "\N{BELL}"
 
     async def initialize(self):
         """Perform setup actions before loading cog."""
         await self._migrate_config()
+        self.reminder_store = self._open_reminder_store(await self.config.storage())
+        await self._load_reminders()
+        self.me_too_reminders.load(
+            await self.config.me_too_prompts(), int(current_time.time())
+        )
+        await self._configure_partitions()
         self._enable_bg_loop()
 
     async def _migrate_config(self):
         """Perform some configuration migrations."""
-        if not await self.config.schema_version():
+        schema_version = await self.config.schema_version()
+
+        if schema_version < 1:
             # Add/generate USER_REMINDER_ID, rename some fields
-            current_reminders = await self.config.reminders()
+            current_reminders = await self.config.get_raw("reminders", default=[])
             new_reminders = []
             user_reminder_ids = {}
             for reminder in current_reminders:
@@ -65,9 +130,146 @@ class RemindMe(Commands, commands.Cog, metaclass=CompositeMetaClass):
                 }
                 user_reminder_ids[reminder["ID"]] = user_reminder_id + 1
                 new_reminders.append(new_reminder)
-            await self.config.reminders.set(new_reminders)
+            await self.config.set_raw("reminders", value=new_reminders)
             await self.config.schema_version.set(1)
 
+        if schema_version < 2:
+            # Migrate global reminders list -> per user REMINDER custom config group
+            current_reminders = await self.config.get_raw("reminders", default=[])
+            # Merged with anything a previous, interrupted migration already wrote
+            users = await self.config.custom("REMINDER").all()
+            for reminder in current_reminders:
+                users.setdefault(str(reminder["USER_ID"]), {})[
+                    str(reminder["USER_REMINDER_ID"])
+                ] = reminder
+            # Written all at once, as each write rewrites the whole file on some backends
+            await self.config.custom("REMINDER").set(users)
+            await self.config.clear_raw("reminders")
+            await self.config.schema_version.set(2)
+
+    @staticmethod
+    def _storage_is_shared(storage: str) -> bool:
+        """Check if reminders kept in a storage setting can be shared by multiple bot processes.
+
+        Red's JSON backend keeps everything cached in each process, so processes would overwrite each others changes.
+        """
+        return storage == "sqlite" or storage_type() != "JSON"
+
+    def _open_reminder_store(self, storage: str) -> ReminderStore:
+        """Get the reminder store for a storage setting ("config" or "sqlite")."""
+        if storage == "sqlite":
+            return SQLiteReminderStore(str(cog_data_path(self) / "reminders.sqlite3"))
+        return ConfigReminderStore(self.config)
+
+    async def _load_reminders(self):
+        """Load all stored reminders into the in-memory index."""
+        self.reminder_index.load(await self.reminder_store.load_all())
+
+    async def _configure_partitions(self):
+        """Start (or stop) splitting reminder delivery with other bot processes, following the current settings."""
+        partitions = await self.config.partitions()
+        lease_file = await self.config.partition_lease_file() or str(
+            cog_data_path(self) / "partitions.sqlite3"
+        )
+        self._stop_partitions()
+        if partitions > 1 and not self._storage_is_shared(await self.config.storage()):
+            log.warning(
+                "Reminder delivery is not split between processes, "
+                "as reminders are stored in Config with the JSON backend"
+            )
+        elif partitions > 1:
+            self.partition_leases = PartitionLeases(lease_file, partitions)
+            self.partition_task = asyncio.create_task(self.partition_loop())
+
+    def _stop_partitions(self):
+        """Stop splitting reminder delivery, giving back all partitions so that other processes can take them over."""
+        if self.partition_task:
+            self.partition_task.cancel()
+            self.partition_task = None
+        if self.partition_leases:
+            release = asyncio.get_running_loop().run_in_executor(
+                None, self.partition_leases.release, int(current_time.time())
+            )
+
+            def error_handler(fut: asyncio.Future):
+                if not fut.cancelled() and fut.exception():
+                    log.warning(
+                        "Could not release reminder partitions: %s", fut.exception()
+                    )
+
+            release.add_done_callback(error_handler)
+            self.partition_leases = None
+
+    async def partition_loop(self):
+        """Partition loop.
+
+        Keeps this process' partition leases renewed. Reminders of newly owned partitions, and of users
+        that other processes changed, are reloaded from Config so that they are sent from fresh data.
+        """
+        leases = self.partition_leases
+        loop = asyncio.get_running_loop()
+        reload_user_ids: Set[int] = set()
+        while True:
+            changed_user_ids = self.partition_changes
+            self.partition_changes = set()
+            previously_owned = set(leases.owned)
+            owned_until = leases.owned_until
+            try:
+                owned, remote_changes = await loop.run_in_executor(
+                    None, leases.sync, int(current_time.time()), changed_user_ids
+                )
+            except Exception as exc:
+                if isinstance(exc, sqlite3.Error):
+                    log.warning("Could not renew reminder partition leases: %s", exc)
+                else:
+                    log.exception("Unexpected error renewing reminder partition leases")
+                self.partition_changes |= changed_user_ids
+                if not leases.owns_any(int(current_time.time())):
+                    # Due reminders are dropped while not owned, so reload everything once renewed
+                    leases.owned = set()
+            else:
+                if int(current_time.time()) >= owned_until:
+                    # The leases lapsed before being renewed, and due reminders are dropped while
+                    # not owned, so everything owned is reloaded as if newly gained
+                    previously_owned = set()
+                # Kept until reloaded, so that a failed reload is tried again on the next sync
+                reload_user_ids |= remote_changes
+                try:
+                    gained = owned - previously_owned
+                    if gained:
+                        reload_user_ids.update(
+                            user_id
+                            for user_id in await self.reminder_store.user_ids()
+                            if partition_of(user_id, leases.partitions) in gained
+                        )
+                    if reload_user_ids:
+                        await self._reload_user_reminders(reload_user_ids)
+                        reload_user_ids = set()
+                except Exception:
+                    log.exception("Could not reload reminders from the reminder store")
+                    # Not sent until their reminders are loaded
+                    leases.owned = previously_owned & owned
+            await asyncio.sleep(self.PARTITION_SYNC_SECONDS)
+
+    async def _reload_user_reminders(self, user_ids: Iterable[int]):
+        """Replace users reminders with what is stored, unless they have changes that haven't been written yet."""
+        stored = await self.reminder_store.load_users(
+            user_id for user_id in user_ids if user_id not in self.dirty_user_ids
+        )
+        for user_id in user_ids:
+            if user_id in stored and user_id not in self.dirty_user_ids:
+                self.reminder_index.remove_user(user_id)
+                for reminder in stored[user_id]:
+                    self.reminder_index.add(reminder)
+            for reminder in self.reminder_index.get_user_reminders(user_id):
+                self._schedule_reminder(reminder)
+
+    def _owns_reminder(self, reminder, current_time_seconds: int) -> bool:
+        """Check if this process should send a reminder (always, unless delivery is split between processes)."""
+        return not self.partition_leases or self.partition_leases.owns(
+            reminder["USER_ID"], current_time_seconds
+        )
+
     def _enable_bg_loop(self):
         """Set up the background loop task."""
         self.bg_loop_task = self.bot.loop.create_task(self.bg_loop())
@@ -96,11 +298,30 @@ class RemindMe(Commands, commands.Cog, metaclass=CompositeMetaClass):
         """Clean up when cog shuts down."""
         if self.bg_loop_task:
             self.bg_loop_task.cancel()
+        self._stop_partitions()
+        if self.flush_task and not self.flush_task.done():
+            # Only the wait is cut short, so that a flush already writing isn't interrupted
+            if self.flush_delay:
+                self.flush_delay.cancel()
+        elif self._has_pending_changes():
+            self.flush_task = asyncio.create_task(self._flush())
+        asyncio.create_task(
+            self._close_reminder_store(self.reminder_store, self.flush_task)
+        )
+
+    @staticmethod
+    async def _close_reminder_store(reminder_store: ReminderStore, flush_task=None):
+        """Close a reminder store, once the flush that might still be writing to it is done."""
+        if flush_task:
+            with contextlib.suppress(Exception, asyncio.CancelledError):
+                await flush_task
+        await reminder_store.close()
 
     async def red_delete_data_for_user(self, *, requester, user_id: int):
         """There's already a [p]forgetme command, so..."""
-        users_reminders = await self.get_user_reminders(user_id)
-        await self._do_reminder_delete(users_reminders)
+        self.reminder_index.remove_user(user_id)
+        self._mark_dirty(user_id)
+        await self.config.user_from_id(user_id).clear()
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(
@@ -111,149 +332,410 @@ class RemindMe(Commands, commands.Cog, metaclass=CompositeMetaClass):
         Thank you SinbadCogs!
         https://github.com/mikeshardmind/SinbadCogs/blob/v3/rolemanagement/events.py
         """
-        if not payload.guild_id or await self.bot.cog_disabled_in_guild_raw(
+        # Nearly all reactions are on other messages, so check that first (no Config or guild access)
+        if payload.message_id not in self.me_too_reminders:
+            return
+        if not payload.guild_id or str(payload.emoji) != self.reminder_emoji:
+            return
+        if await self.bot.cog_disabled_in_guild_raw(
             self.qualified_name, payload.guild_id
         ):
             return
-        if str(payload.emoji) != self.reminder_emoji:
-            return
         guild = self.bot.get_guild(payload.guild_id)
         if not guild:
             return
         member = guild.get_member(payload.user_id)
-        if member.bot:
+        if not member or member.bot:
+            return
+        reminder = self.me_too_reminders.get(
+            payload.message_id, int(current_time.time())
+        )
+        if not reminder:
             return
 
-        try:
-            reminder = self.me_too_reminders[payload.message_id]
-            users_reminders = await self.get_user_reminders(member.id)
-            reminder["USER_ID"] = member.id
-            if self._reminder_exists(users_reminders, reminder):
-                return
-            reminder["USER_REMINDER_ID"] = self.get_next_user_reminder_id(
-                users_reminders
-            )
-            async with self.config.reminders() as current_reminders:
-                current_reminders.append(reminder)
-            message = "Hello! I will also send you "
-            if reminder["REPEAT"]:
-                human_repeat = humanize_timedelta(seconds=reminder["REPEAT"])
-                message += f"those reminders every {human_repeat}"
-                if human_repeat != reminder["FUTURE_TEXT"]:
-                    message += (
-                        f", with the first reminder in {reminder['FUTURE_TEXT']}."
-                    )
-                else:
-                    message += "."
+        reminder = reminder.copy()
+        reminder["USER_ID"] = member.id
+        if self._reminder_exists(reminder):
+            return
+        reminder["USER_REMINDER_ID"] = self.get_next_user_reminder_id(member.id)
+        await self._save_reminder(reminder)
+        self._schedule_reminder(reminder)
+        message = "Hello! I will also send you "
+        human_repeat = describe_repeat(reminder)
+        if human_repeat:
+            message += f"those reminders every {human_repeat}"
+            if human_repeat != reminder["FUTURE_TEXT"]:
+                message += f", with the first reminder in {reminder['FUTURE_TEXT']}."
             else:
-                message += f"that reminder in {reminder['FUTURE_TEXT']}."
+                message += "."
+        else:
+            message += f"that reminder in {reminder['FUTURE_TEXT']}."
 
-            await member.send(message)
-        except KeyError:
-            return
+        await member.send(message)
 
     async def get_user_reminders(self, user_id: int):
         """Return all of a users reminders."""
-        result = []
-        async with self.config.reminders() as current_reminders:
-            for reminder in current_reminders:
-                if reminder["USER_ID"] == user_id:
-                    result.append(reminder)
-        return result
+        return self.reminder_index.get_user_reminders(user_id)
 
-    @staticmethod
-    def get_next_user_reminder_id(reminder_list):
-        """Get the next reminder ID for a user."""
-        next_reminder_id = 1
-        used_reminder_ids = set()
-        for reminder in reminder_list:
-            used_reminder_ids.add(reminder["USER_REMINDER_ID"])
-        while next_reminder_id in used_reminder_ids:
-            next_reminder_id += 1
-        return next_reminder_id
+    async def _save_reminder(self, reminder):
+        """Create or overwrite a single reminder, leaving all other reminders untouched."""
+        self.reminder_index.add(reminder)
+        self._mark_dirty(reminder["USER_ID"])
 
-    @staticmethod
-    def _reminder_exists(reminder_list, reminder):
-        """Check if a reminder is already in this reminder list (ignores user reminder ID)."""
-        for existing_reminder in reminder_list:
-            if (
-                existing_reminder["USER_ID"] == reminder["USER_ID"]
-                and existing_reminder["REMINDER"] == reminder["REMINDER"]
-                and existing_reminder["FUTURE"] == reminder["FUTURE"]
-                and existing_reminder["FUTURE_TEXT"] == reminder["FUTURE_TEXT"]
+    def _mark_dirty(self, user_id: int):
+        """Mark a users reminders as needing to be written to Config, and schedule a flush.
+
+        All changes made before the flush happens are written together, one write per user.
+        """
+        self.dirty_user_ids.add(user_id)
+        self._schedule_flush()
+
+    def _add_me_too_reminder(self, message_id: int, reminder, timeout: int):
+        """Let others sign up for a reminder by reacting to a prompt message, for the next timeout seconds."""
+        self.me_too_reminders.add(
+            message_id, reminder, int(current_time.time()) + timeout
+        )
+        self.me_too_dirty = True
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Schedule a flush, unless one is already pending."""
+        if not self.flush_task or self.flush_task.done():
+            self.flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        """Wait a bit so that changes can pile up, then flush them.
+
+        If the wait is cancelled (cog unload or bot shutdown), flushes immediately.
+        """
+        self.flush_delay = asyncio.ensure_future(
+            asyncio.sleep(self.FLUSH_DELAY_SECONDS)
+        )
+        with contextlib.suppress(asyncio.CancelledError):
+            await self.flush_delay
+        self.flush_delay = None
+        await self._flush()
+
+    def _has_pending_changes(self) -> bool:
+        """Check if there are changes that haven't been written to Config yet."""
+        return bool(self.dirty_user_ids or self.pending_total_sent or self.me_too_dirty)
+
+    async def _flush(self):
+        """Write all pending changes to Config, including changes made while writing.
+
+        Keeps going if cancelled part way through, so that no changes are lost on shutdown.
+        Changes that fail to be written are kept, and tried again after FLUSH_DELAY_SECONDS.
+        """
+        cancelled = failed = False
+        while self._has_pending_changes() and not failed:
+            cancelled_now, failed = await self._flush_once()
+            cancelled = cancelled or cancelled_now
+        if failed and self.bg_loop_task and not self.bg_loop_task.done():
+            # Not retried once the cog is unloading, as the store is being closed
+            self.flush_task = asyncio.create_task(self._delayed_flush())
+        if cancelled:
+            raise asyncio.CancelledError()
+
+    async def _flush_once(self) -> Tuple[bool, bool]:
+        """Write the changes pending right now, returning if any write was cancelled, and if any failed."""
+        cancelled = failed = False
+        if self.pending_total_sent:
+            total_sent = self.pending_total_sent
+            self.pending_total_sent = 0
+            try:
+                await self.config.total_sent.set(
+                    await self.config.total_sent() + total_sent
+                )
+            except asyncio.CancelledError:
+                self.pending_total_sent += total_sent
+                cancelled = True
+            except Exception:
+                self.pending_total_sent += total_sent
+                log.exception("Could not save the number of reminders sent")
+                failed = True
+        if self.me_too_dirty:
+            # Saved so that prompts keep working after a cog reload
+            self.me_too_dirty = False
+            try:
+                await self.config.me_too_prompts.set(
+                    self.me_too_reminders.to_dict(int(current_time.time()))
+                )
+            except asyncio.CancelledError:
+                self.me_too_dirty = True
+                cancelled = True
+            except Exception:
+                self.me_too_dirty = True
+                log.exception("Could not save the me too prompts")
+                failed = True
+        if self.dirty_user_ids:
+            # Taken before writing, so that changes made during the write mark users dirty again
+            user_ids = self.dirty_user_ids
+            self.dirty_user_ids = set()
+            try:
+                async with self.reminder_store_lock:
+                    await self.reminder_store.write_users(
+                        {
+                            user_id: self.reminder_index.get_user_reminders(user_id)
+                            for user_id in user_ids
+                        }
+                    )
+            except asyncio.CancelledError:
+                self.dirty_user_ids |= user_ids
+                cancelled = True
+            except Exception:
+                self.dirty_user_ids |= user_ids
+                log.exception("Could not save the reminders of %s users", len(user_ids))
+                failed = True
+            else:
+                if self.partition_leases:
+                    self.partition_changes |= user_ids
+        return cancelled, failed
+
+    async def _switch_reminder_store(self, storage: str):
+        """Move all reminders to another storage backend ("config" or "sqlite"), and keep using it.
+
+        The old backend is left as it was, as a backup.
+        """
+        # Flushes wait for the copy, then write to the new store
+        async with self.reminder_store_lock:
+            old_store = self.reminder_store
+            self.reminder_store = self._open_reminder_store(storage)
+            await self.reminder_store.replace_all(self.reminder_index)
+        await self.config.storage.set(storage)
+        await self._close_reminder_store(old_store)
+
+    async def import_reminders(self, reminders: Iterable[Optional[dict]]):
+        """Add imported reminders, skipping invalid ones (None) and ones that already exist.
+
+        Reminders whose ID is already taken get the next free ID instead.
+        Returns how many reminders were imported, skipped as duplicates, and skipped as invalid.
+        """
+        imported = duplicates = invalid = 0
+        for count, reminder in enumerate(reminders, 1):
+            if count % 1000 == 0:
+                # Let the bot do other things during big imports
+                await asyncio.sleep(0)
+            if not reminder:
+                invalid += 1
+                continue
+            if self._reminder_exists(reminder):
+                duplicates += 1
+                continue
+            if not reminder["USER_REMINDER_ID"] or self.reminder_index.get(
+                reminder["USER_ID"], reminder["USER_REMINDER_ID"]
             ):
-                return True
-        return False
+                reminder["USER_REMINDER_ID"] = self.get_next_user_reminder_id(
+                    reminder["USER_ID"]
+                )
+            self.reminder_index.add(reminder)
+            self._mark_dirty(reminder["USER_ID"])
+            self._schedule_reminder(reminder)
+            imported += 1
+        return imported, duplicates, invalid
+
+    def get_next_user_reminder_id(self, user_id: int):
+        """Get the next reminder ID for a user."""
+        return self.reminder_index.next_reminder_id(user_id)
+
+    def _reminder_exists(self, reminder):
+        """Check if a reminder already exists for this user (ignores user reminder ID)."""
+        return self.reminder_index.exists(reminder)
+
+    def _schedule_reminder(self, reminder):
+        """Add a reminder to the scheduler, waking the background loop if it is now the next one due."""
+        entry = (
+            reminder["FUTURE"],
+            reminder["USER_ID"],
+            reminder["USER_REMINDER_ID"],
+        )
+        heapq.heappush(self.reminder_heap, entry)
+        if self.reminder_heap[0] is entry:
+            self.reminder_heap_changed.set()
+
+    def _build_reminder_heap(self):
+        """Build the scheduler heap from all reminders."""
+        self.reminder_heap = [
+            (reminder["FUTURE"], reminder["USER_ID"], reminder["USER_REMINDER_ID"])
+            for reminder in self.reminder_index
+        ]
+        heapq.heapify(self.reminder_heap)
 
     async def bg_loop(self):
-        """Background loop."""
+        """Background loop.
+
+        Sleeps until the next reminder is due, or until an earlier reminder is scheduled.
+        """
         await self.bot.wait_until_ready()
+        self._build_reminder_heap()
         while True:
-            await self.check_reminders()
-            await asyncio.sleep(5)
+            self.reminder_heap_changed.clear()
+            timeout = None
+            if self.reminder_heap:
+                timeout = self.reminder_heap[0][0] - current_time.time()
+                if timeout <= 0:
+                    await self.check_reminders()
+                    continue
+            try:
+                await asyncio.wait_for(
+                    self.reminder_heap_changed.wait(), timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                pass
 
     async def check_reminders(self):
-        """Send reminders that have expired."""
+        """Send reminders that have expired.
+
+        Scheduler entries are never removed when a reminder is modified or deleted.
+        Instead, an entry is ignored if its reminder no longer exists or is not due yet.
+        """
+        scan_start = current_time.perf_counter()
+        current_time_seconds = int(current_time.time())
+        due = set()
+        while self.reminder_heap and self.reminder_heap[0][0] <= current_time_seconds:
+            _, user_id, user_reminder_id = heapq.heappop(self.reminder_heap)
+            due.add((user_id, user_reminder_id))
         to_remove = []
-        for reminder in await self.config.reminders():
-            current_time_seconds = int(current_time.time())
-            if reminder["FUTURE"] <= current_time_seconds:
-                user = self.bot.get_user(reminder["USER_ID"])
-                if user is None:
-                    # Can't see the user (no shared servers): delete reminder
-                    to_remove.append(reminder)
-                    continue
+        to_retry = []
+        deliveries = []
+        for user_id, user_reminder_id in due:
+            reminder = self.reminder_index.get(user_id, user_reminder_id)
+            if not reminder or reminder["FUTURE"] > current_time_seconds:
+                continue
+            if not self._owns_reminder(reminder, current_time_seconds):
+                # Another process sends this one. If this process takes over its partition,
+                # the reminder is reloaded and scheduled again.
+                continue
+            if (
+                is_repeating(reminder)
+                and get_catch_up_policy(reminder) == "skip"
+                and current_time_seconds - reminder["FUTURE"] > self.SEND_DELAY_SECONDS
+            ):
+                # Missed it, and the user only wants the next one
+                self.stats.skipped += 1
+                to_remove.append(reminder)
+                continue
+            user = self.bot.get_user(reminder["USER_ID"])
+            if user is None:
+                # Can't see the user (no shared servers): delete reminder
+                self.stats.unknown_user_deletions += 1
+                to_remove.append(reminder)
+                continue
+            deliveries.append((reminder, user))
+        self.stats.record_tick(current_time.perf_counter() - scan_start, len(due))
 
-                delay = current_time_seconds - reminder["FUTURE"]
-                embed = discord.Embed(
-                    title=f":bell:{' (Delayed)' if delay > self.SEND_DELAY_SECONDS else ''} Reminder! :bell:",
-                    color=await self.bot.get_embed_color(user),
-                )
-                if delay > self.SEND_DELAY_SECONDS:
-                    embed.set_footer(
-                        text=f"This was supposed to send {humanize_timedelta(seconds=delay)} ago.\n"
-                        "I might be having network or server issues, or perhaps I just started up.\n"
-                        "Sorry about that!"
+        if deliveries:
+            # Reminders are only sent in DMs, so they all share the same embed color
+            embed_color = await self.bot.get_embed_color(deliveries[0][1])
+            semaphore = asyncio.Semaphore(self.SEND_CONCURRENCY)
+            results = await asyncio.gather(
+                *(
+                    self._send_reminder(
+                        semaphore, reminder, user, embed_color, current_time_seconds
                     )
-                embed_name = f"From {reminder['FUTURE_TEXT']} ago:"
-                if "REPEAT" in reminder and reminder["REPEAT"]:
-                    embed_name = f"Repeating reminder every {humanize_timedelta(seconds=max(reminder['REPEAT'], 86400))}:"
-                reminder_text = reminder["REMINDER"]
-                if "JUMP_LINK" in reminder:
-                    reminder_text += f"\n\n[original message]({reminder['JUMP_LINK']})"
-                embed.add_field(
-                    name=embed_name,
-                    value=reminder_text,
+                    for reminder, user in deliveries
                 )
-
-                try:
-                    await user.send(embed=embed)
-                except (discord.Forbidden, discord.NotFound):
-                    # Can't send DM's to user: delete reminder
-                    to_remove.append(reminder)
-                except discord.HTTPException:
-                    # Something weird happened: retry next time
-                    pass
+            )
+            total_sent = 0
+            for (reminder, _), result in zip(deliveries, results):
+                if result is None:
+                    to_retry.append(reminder)
                 else:
-                    total_sent = await self.config.total_sent()
-                    await self.config.total_sent.set(total_sent + 1)
                     to_remove.append(reminder)
-        if to_remove:
-            async with self.config.reminders() as current_reminders:
-                for reminder in to_remove:
-                    try:
-                        new_reminder = None
-                        if "REPEAT" in reminder and reminder["REPEAT"]:
-                            new_reminder = reminder.copy()
-                            if new_reminder["REPEAT"] < 86400:
-                                new_reminder["REPEAT"] = 86400
-                            while new_reminder["FUTURE"] <= int(current_time.time()):
-                                new_reminder["FUTURE"] += new_reminder["REPEAT"]
-                            new_reminder["FUTURE_TEXT"] = humanize_timedelta(
-                                seconds=new_reminder["REPEAT"]
-                            )
-                        current_reminders.remove(reminder)
-                        if new_reminder:
-                            current_reminders.append(new_reminder)
-                    except ValueError:
-                        pass
+                    if result:
+                        total_sent += 1
+            if total_sent:
+                self.pending_total_sent += total_sent
+                self._schedule_flush()
+
+        self._remove_sent_reminders(to_remove, current_time_seconds)
+        for reminder in to_retry:
+            heapq.heappush(
+                self.reminder_heap,
+                (
+                    current_time_seconds + self.RETRY_DELAY_SECONDS,
+                    reminder["USER_ID"],
+                    reminder["USER_REMINDER_ID"],
+                ),
+            )
+
+    async def _send_reminder(
+        self,
+        semaphore: asyncio.Semaphore,
+        reminder,
+        user: discord.User,
+        embed_color: discord.Color,
+        current_time_seconds: int,
+    ):
+        """Send a single reminder to a user.
+
+        Returns True if sent, False if the user can't be sent DMs, or None if sending should be retried.
+        Rate limit buckets are handled by discord.py, the semaphore only bounds how many sends are in flight.
+        """
+        delay = current_time_seconds - reminder["FUTURE"]
+        embed = discord.Embed(
+            title=f":bell:{' (Delayed)' if delay > self.SEND_DELAY_SECONDS else ''} Reminder! :bell:",
+            color=embed_color,
+        )
+        if delay > self.SEND_DELAY_SECONDS:
+            embed.set_footer(
+                text=f"This was supposed to send {humanize_timedelta(seconds=delay)} ago.\n"
+                "I might be having network or server issues, or perhaps I just started up.\n"
+                "Sorry about that!"
+            )
+        embed_name = f"From {reminder['FUTURE_TEXT']} ago:"
+        human_repeat = describe_repeat(reminder)
+        if human_repeat:
+            embed_name = f"Repeating reminder every {human_repeat}:"
+        reminder_text = reminder["REMINDER"]
+        if "JUMP_LINK" in reminder:
+            reminder_text += f"\n\n[original message]({reminder['JUMP_LINK']})"
+        embed.add_field(
+            name=embed_name,
+            value=reminder_text,
+        )
+
+        async with semaphore:
+            try:
+                await user.send(embed=embed)
+            except (discord.Forbidden, discord.NotFound) as exc:
+                # Can't send DM's to user: delete reminder
+                self.stats.record_failure(exc, deleted=True)
+                return False
+            except discord.HTTPException as exc:
+                # Something weird happened: retry in a bit
+                self.stats.record_failure(exc, deleted=False)
+                return None
+        self.stats.record_sent(current_time.time() - reminder["FUTURE"])
+        return True
+
+    def _remove_sent_reminders(self, reminders, current_time_seconds: int):
+        """Remove (or reschedule, if repeating) reminders that have been sent."""
+        for reminder in reminders:
+            if (
+                self.reminder_index.get(
+                    reminder["USER_ID"], reminder["USER_REMINDER_ID"]
+                )
+                is not reminder
+            ):
+                continue  # Reminder was modified or deleted while we were sending
+            next_future = None
+            if is_repeating(reminder):
+                next_future = next_catch_up_occurrence(reminder, current_time_seconds)
+            if next_future:
+                new_reminder = reminder.copy()
+                if new_reminder.get("REPEAT") and new_reminder["REPEAT"] < 86400:
+                    new_reminder["REPEAT"] = 86400
+                new_reminder["FUTURE"] = next_future
+                if new_reminder.get("REPEAT"):
+                    new_reminder["FUTURE_TEXT"] = humanize_timedelta(
+                        seconds=new_reminder["REPEAT"]
+                    )
+                elif next_future > current_time_seconds:
+                    new_reminder["FUTURE_TEXT"] = humanize_timedelta(
+                        seconds=next_future - current_time_seconds
+                    )
+                self.reminder_index.add(new_reminder)
+                self._schedule_reminder(new_reminder)
+            else:
+                self.reminder_index.remove(reminder)
+            self._mark_dirty(reminder["USER_ID"])
@@ -0,0 +1,111 @@
+"""Delivery statistics for RemindMe."""
+import time
+from collections import Counter, deque
+from typing import Deque, Dict, Optional
+
+
+class RollingHistogram:
+    """The most recent samples of some measurement, summarized on demand.
+
+    Recording a sample is O(1); percentiles and bucket counts are only calculated when asked for.
+    """
+
+    def __init__(self, buckets, max_samples: int = 1000):
+        """Create an empty histogram with the given (ascending) bucket upper bounds."""
+        self.buckets = list(buckets)
+        self._samples: Deque[float] = deque(maxlen=max_samples)
+        self.total_samples = 0
+
+    def record(self, value: float):
+        """Record a sample, dropping the oldest one if full."""
+        self._samples.append(value)
+        self.total_samples += 1
+
+    def percentile(self, percent: float, sorted_samples=None) -> Optional[float]:
+        """Get a percentile (0-100) of the recent samples, or None if there are none."""
+        if sorted_samples is None:
+            sorted_samples = sorted(self._samples)
+        if not sorted_samples:
+            return None
+        index = round(percent / 100 * (len(sorted_samples) - 1))
+        return sorted_samples[index]
+
+    def summary(self) -> Dict:
+        """Summarize the recent samples."""
+        sorted_samples = sorted(self._samples)
+        bucket_counts = Counter()
+        for sample in sorted_samples:
+            for bucket in self.buckets:
+                if sample <= bucket:
+                    bucket_counts[f"<={bucket}"] += 1
+                    break
+            else:
+                bucket_counts[f">{self.buckets[-1]}"] += 1
+        return {
+            "samples": len(sorted_samples),
+            "total_samples": self.total_samples,
+            "min": sorted_samples[0] if sorted_samples else None,
+            "mean": sum(sorted_samples) / len(sorted_samples)
+            if sorted_samples
+            else None,
+            "p50": self.percentile(50, sorted_samples),
+            "p90": self.percentile(90, sorted_samples),
+            "p99": self.percentile(99, sorted_samples),
+            "max": sorted_samples[-1] if sorted_samples else None,
+            "buckets": dict(bucket_counts),
+        }
+
+
+class DeliveryStats:
+    """Statistics about reminder delivery since the cog was loaded."""
+
+    def __init__(self):
+        """Start with no statistics."""
+        self.started = time.time()
+        # Seconds between when a reminder was supposed to be sent and when it actually was
+        self.lag = RollingHistogram([1, 5, 30, 60, 300, 3600, 86400])
+        # Milliseconds spent finding the due reminders in each scheduler tick
+        self.scan_time = RollingHistogram([0.1, 1, 10, 100, 1000])
+        # Number of due reminders found in each scheduler tick
+        self.queue_depth = RollingHistogram([1, 10, 100, 1000, 10000])
+        self.sent = 0
+        self.skipped = 0
+        self.retries = 0
+        self.failures: Counter = Counter()
+        self.forbidden_deletions = 0
+        self.unknown_user_deletions = 0
+
+    def record_tick(self, scan_seconds: float, due: int):
+        """Record a scheduler tick that found some reminders due."""
+        self.scan_time.record(scan_seconds * 1000)
+        self.queue_depth.record(due)
+
+    def record_sent(self, lag_seconds: float):
+        """Record a reminder that was sent."""
+        self.sent += 1
+        self.lag.record(lag_seconds)
+
+    def record_failure(self, exception: Exception, *, deleted: bool):
+        """Record a reminder that failed to send, and if it was deleted because of it."""
+        self.failures[type(exception).__name__] += 1
+        if deleted:
+            self.forbidden_deletions += 1
+        else:
+            self.retries += 1
+
+    def to_dict(self, heap_size: int, pending_reminders: int) -> Dict:
+        """Get all statistics, in a form that can be dumped as JSON."""
+        return {
+            "uptime_seconds": int(time.time() - self.started),
+            "pending_reminders": pending_reminders,
+            "scheduler_heap_size": heap_size,
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "retries": self.retries,
+            "failures": dict(self.failures),
+            "forbidden_deletions": self.forbidden_deletions,
+            "unknown_user_deletions": self.unknown_user_deletions,
+            "lag_seconds": self.lag.summary(),
+            "scan_time_ms": self.scan_time.summary(),
+            "queue_depth": self.queue_depth.summary(),
+        }